@@ -10,21 +10,29 @@ https://github.com/Limych/ha-beward
 #  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
+import random
 import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
+from http import HTTPStatus
 from pathlib import Path
-from time import sleep
 from typing import TYPE_CHECKING, Any, Final
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping
-    from datetime import datetime
+    from collections.abc import Awaitable, Callable, Mapping
 
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.device_registry import DeviceInfo
     from homeassistant.helpers.typing import ConfigType
 
-import beward
+    from .history import BewardEventRecord
+
+import aiohttp
+import async_timeout
 import homeassistant.helpers.config_validation as cv
 import homeassistant.util.dt as dt_util
 import voluptuous as vol
@@ -34,6 +42,7 @@ from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
 from homeassistant.const import (
     ATTR_ATTRIBUTION,
     CONF_BINARY_SENSORS,
+    CONF_DEVICES,
     CONF_HOST,
     CONF_NAME,
     CONF_PASSWORD,
@@ -41,34 +50,126 @@ from homeassistant.const import (
     CONF_SENSORS,
     CONF_USERNAME,
 )
+from homeassistant.core import callback
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.dispatcher import dispatcher_send
-from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.helpers.dispatcher import async_dispatcher_send, dispatcher_send
+from homeassistant.helpers.storage import STORAGE_DIR, Store
 from homeassistant.util import slugify
 
+from .alarms import BewardAlarmListener
+from .client import BewardClient
+from .clip import BewardClipRecorder
 from .const import (
     ALARMS_TO_EVENTS,
     ATTRIBUTION,
     BINARY_SENSORS,
     CAMERAS,
     CONF_CAMERAS,
+    CONF_CLIP_POST_ROLL,
+    CONF_CLIP_PRE_ROLL,
+    CONF_EXECUTOR_WORKERS,
     CONF_FFMPEG_ARGUMENTS,
+    CONF_FRAME_BUFFER_DURATION,
+    CONF_FRAME_BUFFER_MAX_FRAMES,
+    CONF_FRAME_BUFFER_MAX_SIZE,
+    CONF_HISTORY_MAX_AGE,
+    CONF_HISTORY_MAX_COUNT,
+    CONF_HISTORY_MAX_SIZE,
+    CONF_MJPEG_MODE,
+    CONF_MOSAIC,
+    CONF_MOSAIC_COLUMNS,
+    CONF_MOSAIC_INTERVAL,
+    CONF_MOSAIC_TILE_HEIGHT,
+    CONF_MOSAIC_TILE_WIDTH,
+    CONF_MOTION_MIN_ON_TIME,
+    CONF_MOTION_OFF_DELAY,
+    CONF_RECORD_CLIPS,
     CONF_RTSP_PORT,
+    CONF_RTSP_RELAY,
+    CONF_SETUP_CONCURRENCY,
+    CONF_SETUP_TIMEOUT,
+    CONF_SNAPSHOT_DEDUP,
+    CONF_SNAPSHOT_FRESH_TTL,
+    CONF_SNAPSHOT_MAX_STALE,
+    CONF_SNAPSHOT_RATE,
+    CONF_SNAPSHOT_REFRESH_CONCURRENCY,
+    CONF_SNAPSHOT_SOURCE,
     CONF_STREAM,
+    CONF_TOTAL_SNAPSHOT_RATE,
+    DEFAULT_CLIP_POST_ROLL,
+    DEFAULT_CLIP_PRE_ROLL,
+    DEFAULT_EXECUTOR_WORKERS,
+    DEFAULT_FRAME_BUFFER_DURATION,
+    DEFAULT_FRAME_BUFFER_MAX_FRAMES,
+    DEFAULT_FRAME_BUFFER_MAX_SIZE,
+    DEFAULT_HISTORY_MAX_AGE,
+    DEFAULT_HISTORY_MAX_COUNT,
+    DEFAULT_HISTORY_MAX_SIZE,
+    DEFAULT_MJPEG_MODE,
+    DEFAULT_MOSAIC,
+    DEFAULT_MOSAIC_COLUMNS,
+    DEFAULT_MOSAIC_INTERVAL,
+    DEFAULT_MOSAIC_TILE_HEIGHT,
+    DEFAULT_MOSAIC_TILE_WIDTH,
+    DEFAULT_MOTION_MIN_ON_TIME,
+    DEFAULT_MOTION_OFF_DELAY,
     DEFAULT_PORT,
+    DEFAULT_RECORD_CLIPS,
+    DEFAULT_RTSP_RELAY,
+    DEFAULT_SETUP_CONCURRENCY,
+    DEFAULT_SETUP_TIMEOUT,
+    DEFAULT_SNAPSHOT_DEDUP,
+    DEFAULT_SNAPSHOT_FRESH_TTL,
+    DEFAULT_SNAPSHOT_MAX_STALE,
+    DEFAULT_SNAPSHOT_RATE,
+    DEFAULT_SNAPSHOT_REFRESH_CONCURRENCY,
+    DEFAULT_SNAPSHOT_SOURCE,
     DEFAULT_STREAM,
+    DEFAULT_TOTAL_SNAPSHOT_RATE,
     DOMAIN,
+    DOMAIN_PIPELINE,
     DOMAIN_YAML,
+    DOMAIN_YAML_SETUP,
+    EVENT_HISTORY,
+    EVENT_PIPELINE,
+    MJPEG_MODES,
     PLATFORMS,
     SENSORS,
+    SETUP_RETRIES,
+    SIGNAL_DEVICE_ADDED,
+    SNAPSHOT_DEDUP_NONE,
+    SNAPSHOT_DEDUP_SIMILAR,
+    SNAPSHOT_DEDUPS,
+    SNAPSHOT_SOURCE_STREAM,
+    SNAPSHOT_SOURCES,
     STARTUP_MESSAGE,
     SUPPORT_LIB_URL,
     UNDO_UPDATE_LISTENER,
     BewardDeviceEvent,
 )
+from .debounce import BewardEventDebouncer
+from .entity import entry_device_configs
+from .executor import async_get_executor
+from .history import BewardEventHistory
+from .metadata import BewardDeviceMetadata, BewardMetadataCache
+from .pipeline import BewardEventPipeline, async_get_pipeline
+from .rtsp import BewardRtspRelay
+from .stream import BewardFrameBuffer, BewardStreamReader
+from .thumbnail import BewardThumbnailCache, perceptual_hash
 
 _LOGGER: Final = logging.getLogger(__name__)
 
+_MAX_KEYFRAME_AGE: Final = 5  # seconds
+_EVENT_FRAME_TOLERANCE: Final = timedelta(seconds=2)
+_SIMILAR_IMAGE_DISTANCE: Final = 3  # bits of perceptual hash
+_CLIP_BUFFER_SIZE: Final = 16 * 1024 * 1024  # bytes
+
+_RETRY_MIN_DELAY: Final = 30  # seconds
+_RETRY_MAX_DELAY: Final = 600  # seconds
+
+_STORAGE_VERSION: Final = 1
+_SAVE_DELAY: Final = 10  # seconds
+
 DEVICE_SCHEMA: Final = vol.Schema(
     {
         vol.Required(CONF_HOST): cv.string,
@@ -78,7 +179,59 @@ DEVICE_SCHEMA: Final = vol.Schema(
         vol.Optional(CONF_PORT, default=DEFAULT_PORT): int,
         vol.Optional(CONF_RTSP_PORT): int,
         vol.Optional(CONF_STREAM, default=DEFAULT_STREAM): int,
+        vol.Optional(CONF_RTSP_RELAY, default=DEFAULT_RTSP_RELAY): cv.boolean,
         vol.Optional(CONF_FFMPEG_ARGUMENTS, default=DEFAULT_ARGUMENTS): cv.string,
+        vol.Optional(CONF_MJPEG_MODE, default=DEFAULT_MJPEG_MODE): vol.In(MJPEG_MODES),
+        vol.Optional(CONF_SNAPSHOT_SOURCE, default=DEFAULT_SNAPSHOT_SOURCE): vol.In(
+            SNAPSHOT_SOURCES
+        ),
+        vol.Optional(
+            CONF_FRAME_BUFFER_DURATION, default=DEFAULT_FRAME_BUFFER_DURATION
+        ): cv.positive_float,
+        vol.Optional(
+            CONF_FRAME_BUFFER_MAX_FRAMES, default=DEFAULT_FRAME_BUFFER_MAX_FRAMES
+        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(
+            CONF_FRAME_BUFFER_MAX_SIZE, default=DEFAULT_FRAME_BUFFER_MAX_SIZE
+        ): cv.positive_float,
+        vol.Optional(
+            CONF_HISTORY_MAX_AGE, default=DEFAULT_HISTORY_MAX_AGE
+        ): cv.positive_float,
+        vol.Optional(
+            CONF_HISTORY_MAX_COUNT, default=DEFAULT_HISTORY_MAX_COUNT
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_HISTORY_MAX_SIZE, default=DEFAULT_HISTORY_MAX_SIZE
+        ): cv.positive_float,
+        vol.Optional(CONF_RECORD_CLIPS, default=DEFAULT_RECORD_CLIPS): cv.boolean,
+        vol.Optional(
+            CONF_CLIP_PRE_ROLL, default=DEFAULT_CLIP_PRE_ROLL
+        ): cv.positive_float,
+        vol.Optional(
+            CONF_CLIP_POST_ROLL, default=DEFAULT_CLIP_POST_ROLL
+        ): cv.positive_float,
+        vol.Optional(
+            CONF_MOTION_MIN_ON_TIME, default=DEFAULT_MOTION_MIN_ON_TIME
+        ): cv.positive_float,
+        vol.Optional(
+            CONF_MOTION_OFF_DELAY, default=DEFAULT_MOTION_OFF_DELAY
+        ): cv.positive_float,
+        vol.Optional(
+            CONF_SNAPSHOT_FRESH_TTL, default=DEFAULT_SNAPSHOT_FRESH_TTL
+        ): cv.positive_float,
+        vol.Optional(
+            CONF_SNAPSHOT_MAX_STALE, default=DEFAULT_SNAPSHOT_MAX_STALE
+        ): cv.positive_float,
+        vol.Optional(
+            CONF_SNAPSHOT_REFRESH_CONCURRENCY,
+            default=DEFAULT_SNAPSHOT_REFRESH_CONCURRENCY,
+        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(
+            CONF_SNAPSHOT_RATE, default=DEFAULT_SNAPSHOT_RATE
+        ): cv.positive_float,
+        vol.Optional(CONF_SNAPSHOT_DEDUP, default=DEFAULT_SNAPSHOT_DEDUP): vol.In(
+            SNAPSHOT_DEDUPS
+        ),
         vol.Optional(CONF_CAMERAS, default=list(CAMERAS)): vol.All(
             cv.ensure_list, [vol.In(CAMERAS)]
         ),
@@ -89,8 +242,46 @@ DEVICE_SCHEMA: Final = vol.Schema(
     }
 )
 
+DEVICES_SCHEMA: Final = vol.All(cv.ensure_list, [DEVICE_SCHEMA])
+
+SETUP_SCHEMA: Final = vol.Schema(
+    {
+        vol.Optional(
+            CONF_SETUP_CONCURRENCY, default=DEFAULT_SETUP_CONCURRENCY
+        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(
+            CONF_SETUP_TIMEOUT, default=DEFAULT_SETUP_TIMEOUT
+        ): cv.positive_float,
+        vol.Optional(
+            CONF_EXECUTOR_WORKERS, default=DEFAULT_EXECUTOR_WORKERS
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_TOTAL_SNAPSHOT_RATE, default=DEFAULT_TOTAL_SNAPSHOT_RATE
+        ): cv.positive_float,
+        vol.Optional(CONF_MOSAIC, default=DEFAULT_MOSAIC): cv.boolean,
+        vol.Optional(
+            CONF_MOSAIC_COLUMNS, default=DEFAULT_MOSAIC_COLUMNS
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_MOSAIC_TILE_WIDTH, default=DEFAULT_MOSAIC_TILE_WIDTH
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_MOSAIC_TILE_HEIGHT, default=DEFAULT_MOSAIC_TILE_HEIGHT
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_MOSAIC_INTERVAL, default=DEFAULT_MOSAIC_INTERVAL
+        ): cv.positive_float,
+    }
+)
+
 CONFIG_SCHEMA: Final = vol.Schema(
-    {DOMAIN: vol.All(cv.ensure_list, [DEVICE_SCHEMA])}, extra=vol.ALLOW_EXTRA
+    {
+        DOMAIN: vol.Any(
+            SETUP_SCHEMA.extend({vol.Required(CONF_DEVICES): DEVICES_SCHEMA}),
+            DEVICES_SCHEMA,
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
 )
 
 
@@ -101,13 +292,21 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         _LOGGER.info(STARTUP_MESSAGE)
         hass.data[DOMAIN] = {}
 
-    if DOMAIN not in config:
-        return True
-
     if DOMAIN not in hass.config.media_dirs:
         hass.config.media_dirs[DOMAIN] = hass.config.path(STORAGE_DIR, DOMAIN)
 
-    hass.data[DOMAIN_YAML] = config[DOMAIN]
+    if DOMAIN not in config:
+        return True
+
+    if isinstance(config[DOMAIN], dict):
+        async_get_executor(hass, config[DOMAIN][CONF_EXECUTOR_WORKERS])
+        hass.data[DOMAIN_YAML] = config[DOMAIN][CONF_DEVICES]
+        hass.data[DOMAIN_YAML_SETUP] = {
+            key: value for key, value in config[DOMAIN].items() if key != CONF_DEVICES
+        }
+    else:
+        hass.data[DOMAIN_YAML] = config[DOMAIN]
+        hass.data[DOMAIN_YAML_SETUP] = SETUP_SCHEMA({})
     hass.async_create_task(
         hass.config_entries.flow.async_init(
             DOMAIN, context={"source": SOURCE_IMPORT}, data={}
@@ -130,54 +329,271 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     undo_listener = entry.add_update_listener(async_update_listener)
     hass.data[DOMAIN][entry.entry_id][UNDO_UPDATE_LISTENER] = undo_listener
 
-    if entry.source == SOURCE_IMPORT:
-        config = hass.data[DOMAIN_YAML]
-
-        for index, device_config in enumerate(config):
-            hass.data[DOMAIN][entry.entry_id][index] = await _async_setup_device(
-                hass, entry, device_config, index=index
-            )
-
-    else:
-        config = entry.data.copy()
-        config.update(entry.options)
+    # Snapshot rate limit of YAML config applies to devices of all entries
+    pipeline = async_get_pipeline(
+        hass,
+        hass.data.get(DOMAIN_YAML_SETUP, {}).get(
+            CONF_TOTAL_SNAPSHOT_RATE, DEFAULT_TOTAL_SNAPSHOT_RATE
+        ),
+    )
+    hass.data[DOMAIN][entry.entry_id][EVENT_PIPELINE] = pipeline
+    history = BewardEventHistory(
+        hass,
+        hass.config.media_dirs.get(DOMAIN, hass.config.path(STORAGE_DIR, DOMAIN)),
+    )
+    await history.async_start()
+    try:
+        metadata = BewardMetadataCache(hass, entry.entry_id)
+        await metadata.async_load()
+
+        setup_device = partial(
+            _async_setup_device,
+            hass,
+            entry,
+            pipeline=pipeline,
+            history=history,
+            metadata=metadata,
+            revalidate_limiter=asyncio.Semaphore(
+                hass.data.get(DOMAIN_YAML_SETUP, {}).get(
+                    CONF_SETUP_CONCURRENCY, DEFAULT_SETUP_CONCURRENCY
+                )
+            ),
+        )
 
-        hass.data[DOMAIN][entry.entry_id][0] = await _async_setup_device(
-            hass, entry, config
+        hass.data[DOMAIN][entry.entry_id][SETUP_RETRIES] = await _async_setup_devices(
+            hass, entry, setup_device
         )
+    except BaseException:
+        # Failed entry is not unloaded, so nothing else would close the history
+        await history.async_stop()
+        del hass.data[DOMAIN][entry.entry_id][EVENT_PIPELINE]
+        await _async_release_pipeline(hass)
+        raise
+
+    hass.data[DOMAIN][entry.entry_id][EVENT_HISTORY] = history
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return len(hass.data[DOMAIN]) > 0
 
 
-async def _async_setup_device(
-    hass: HomeAssistant, entry: ConfigEntry, device_config: ConfigType, index: int = 0
+async def _async_setup_devices(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    setup_device: Callable[..., Awaitable[BewardController]],
+) -> list[asyncio.Task]:
+    """
+    Set up devices of entry concurrently.
+
+    Devices which can't be set up are retried in background, so the entry is
+    never reloaded because of them. Return retry tasks.
+    """
+    configs = entry_device_configs(hass, entry)
+    setup_options = (
+        hass.data[DOMAIN_YAML_SETUP]
+        if entry.source == SOURCE_IMPORT
+        else {
+            CONF_SETUP_CONCURRENCY: DEFAULT_SETUP_CONCURRENCY,
+            CONF_SETUP_TIMEOUT: DEFAULT_SETUP_TIMEOUT,
+        }
+    )
+    limiter = asyncio.Semaphore(setup_options[CONF_SETUP_CONCURRENCY])
+    timeout = setup_options[CONF_SETUP_TIMEOUT]
+
+    async def async_setup_index(index: int, device_config: ConfigType) -> bool:
+        async with limiter:
+            try:
+                controller = await setup_device(
+                    device_config, setup_timeout=timeout, index=index
+                )
+            except ConfigEntryNotReady as exc:
+                _LOGGER.debug("Setup of device #%d failed: %s", index + 1, exc)
+                return False
+
+        hass.data[DOMAIN][entry.entry_id][index] = controller
+        return True
+
+    async def async_retry(index: int, device_config: ConfigType) -> None:
+        delay = _RETRY_MIN_DELAY
+        while True:
+            await asyncio.sleep(random.uniform(delay / 2, delay))  # noqa: S311
+            if await async_setup_index(index, device_config):
+                async_dispatcher_send(
+                    hass, SIGNAL_DEVICE_ADDED.format(entry.entry_id), index
+                )
+                return
+
+            delay = min(delay * 2, _RETRY_MAX_DELAY)
+
+    results = await asyncio.gather(
+        *(async_setup_index(index, x) for index, x in enumerate(configs)),
+        return_exceptions=True,
+    )
+    if errors := [x for x in results if isinstance(x, BaseException)]:
+        # Failed entry is not unloaded, so nothing else would stop the devices
+        for index, result in enumerate(results):
+            if result is True:
+                await hass.data[DOMAIN][entry.entry_id].pop(index).async_shutdown()
+        raise errors[0]
+
+    retries = []
+    for index, device_config in enumerate(configs):
+        if results[index]:
+            continue
+
+        _LOGGER.warning(
+            "Device %s is unavailable, setup will be retried in background",
+            device_config.get(CONF_NAME) or device_config.get(CONF_HOST),
+        )
+        retries.append(
+            entry.async_create_background_task(
+                hass,
+                async_retry(index, device_config),
+                f"{DOMAIN} setup retry {index}",
+            )
+        )
+
+    return retries
+
+
+async def _async_setup_device(  # noqa: PLR0913
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    device_config: ConfigType,
+    *,
+    pipeline: BewardEventPipeline,
+    history: BewardEventHistory,
+    metadata: BewardMetadataCache,
+    revalidate_limiter: asyncio.Semaphore,
+    setup_timeout: float,
+    index: int = 0,
 ) -> BewardController:
-    """Set up one device."""
+    """
+    Set up one device.
+
+    Devices with cached metadata are set up without any requests to them and
+    are revalidated in background.
+    """
     device_ip = device_config.get(CONF_HOST)
     name = device_config.get(CONF_NAME)
     username = device_config.get(CONF_USERNAME)
     unique_id = entry.entry_id + "_" + str(index + 1)
 
-    _LOGGER.debug("Connecting to device %s", device_ip)
+    if cached := metadata.get(index, device_config):
+        _LOGGER.debug("Using cached metadata of device %s", device_ip)
+        device = await async_get_executor(hass).async_run(
+            cached.create_device, device_config
+        )
+        entry.async_create_background_task(
+            hass,
+            _async_revalidate_device(
+                hass,
+                entry,
+                device_config,
+                metadata=metadata,
+                limiter=revalidate_limiter,
+                setup_timeout=setup_timeout,
+                index=index,
+            ),
+            f"{DOMAIN} revalidate {index}",
+        )
+
+    else:
+        _LOGGER.debug("Connecting to device %s", device_ip)
+
+        try:
+            async with async_timeout.timeout(setup_timeout):
+                device, cached = await _async_probe_device(hass, device_config)
+        except TimeoutError as exc:
+            msg = f"Timed out connecting to Beward device as {username}@{device_ip}"
+            raise ConfigEntryNotReady(msg) from exc
+
+        metadata.async_set(index, device_config, cached)
+
+    sys_info = cached.system_info
+    device_id = sys_info.get("DeviceID", device.host)
+
+    if name is None:
+        name = f"Beward {sys_info.get('DeviceID', unique_id)}"
 
+    controller = BewardController(
+        hass,
+        device_id,
+        device,
+        name,
+        pipeline=pipeline,
+        history=history,
+        config=device_config,
+        system_info=sys_info,
+    )
     try:
+        await controller.async_start()
+    except BaseException:
+        await controller.async_shutdown()
+        raise
+    _LOGGER.info(
+        'Connected to Beward device "%s" as %s@%s',
+        controller.name,
+        username,
+        device_ip,
+    )
+
+    return controller
+
+
+async def _async_revalidate_device(  # noqa: PLR0913
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    device_config: ConfigType,
+    *,
+    metadata: BewardMetadataCache,
+    limiter: asyncio.Semaphore,
+    setup_timeout: float,
+    index: int,
+) -> None:
+    """Query device metadata and reload the entry if it differs from cache."""
+    device_ip = device_config.get(CONF_HOST)
 
-        def get_device() -> BewardGeneric:
-            return beward.Beward.factory(
+    async with limiter:
+        try:
+            async with async_timeout.timeout(setup_timeout):
+                _, actual = await _async_probe_device(hass, device_config)
+        except (ConfigEntryNotReady, TimeoutError) as exc:
+            _LOGGER.debug("Revalidation of device %s failed: %s", device_ip, exc)
+            return
+
+    if metadata.async_set(index, device_config, actual):
+        _LOGGER.info("Metadata of device %s changed, reloading entry", device_ip)
+        # Reloaded entry must find the new metadata, or it would reload again
+        await metadata.async_save()
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+
+
+async def _async_probe_device(
+    hass: HomeAssistant, device_config: ConfigType
+) -> tuple[BewardGeneric, BewardDeviceMetadata]:
+    """Connect to device and return it with its metadata."""
+    device_ip = device_config.get(CONF_HOST)
+    username = device_config.get(CONF_USERNAME)
+
+    try:
+        # Device type is unknown until system info is received
+        generic = await async_get_executor(hass).async_run(
+            partial(
+                BewardGeneric,
                 device_ip,
                 username,
                 device_config.get(CONF_PASSWORD),
                 port=device_config.get(CONF_PORT, DEFAULT_PORT),
-                rtsp_port=device_config.get(CONF_RTSP_PORT),
-                stream=device_config.get(CONF_STREAM, DEFAULT_STREAM),
             )
+        )
+        metadata = await BewardDeviceMetadata.async_from_client(
+            BewardClient(hass, generic), device_config.get(CONF_RTSP_PORT)
+        )
 
-        device = await hass.async_add_executor_job(get_device)
     except ValueError as exc:
         _LOGGER.exception("")
-        if exc == 'Unknown device "None"':
+        if str(exc) == 'Unknown device "None"':
             msg = (
                 "Device recognition error.<br />"
                 "Please try restarting Home Assistant&nbsp;— it usually helps."
@@ -195,33 +611,20 @@ async def _async_setup_device(
         )
         raise ConfigEntryNotReady from exc
 
-    if device is None or not await hass.async_add_executor_job(
-        lambda: device.available
-    ):
-        if device is None:
-            err_msg = (
-                f"Authorization rejected by Beward device for {username}@{device_ip}"
-            )
+    except (TimeoutError, aiohttp.ClientError) as exc:
+        if (
+            isinstance(exc, aiohttp.ClientResponseError)
+            and exc.status == HTTPStatus.UNAUTHORIZED
+        ):
+            msg = f"Authorization rejected by Beward device for {username}@{device_ip}"
         else:
-            err_msg = f"Could not connect to Beward device as {username}@{device_ip}"
-        _LOGGER.error(err_msg)
-        raise ConfigEntryNotReady
+            msg = f"Could not connect to Beward device as {username}@{device_ip}"
+        raise ConfigEntryNotReady(msg) from exc
 
-    sys_info = await hass.async_add_executor_job(lambda: device.system_info)
-    device_id = sys_info.get("DeviceID", device.host)
-
-    if name is None:
-        name = f"Beward {sys_info.get('DeviceID', unique_id)}"
-
-    controller = BewardController(hass, device_id, device, name)
-    _LOGGER.info(
-        'Connected to Beward device "%s" as %s@%s',
-        controller.name,
-        username,
-        device_ip,
+    device = await async_get_executor(hass).async_run(
+        metadata.create_device, device_config
     )
-
-    return controller
+    return device, metadata
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -231,55 +634,256 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         cfg = hass.data[DOMAIN][entry.entry_id]  # type: dict
         cfg[UNDO_UPDATE_LISTENER]()
         del cfg[UNDO_UPDATE_LISTENER]
+        retries = cfg.pop(SETUP_RETRIES, [])
+        for task in retries:
+            task.cancel()
+        await asyncio.gather(*retries, return_exceptions=True)
 
-        for device in cfg.values():  # type: BewardController
-            del device
+        pipeline = cfg.pop(EVENT_PIPELINE)
+        history = cfg.pop(EVENT_HISTORY)
+
+        for controller in cfg.values():  # type: BewardController
+            pipeline.async_discard(controller)
+            await controller.async_shutdown()
+
+        await history.async_stop()
 
         del hass.data[DOMAIN][entry.entry_id]
+        await _async_release_pipeline(hass)
 
     return unloaded
 
 
+async def _async_release_pipeline(hass: HomeAssistant) -> None:
+    """Stop shared event pipeline when no config entry uses it."""
+    if any(EVENT_PIPELINE in cfg for cfg in hass.data[DOMAIN].values()):
+        return
+
+    if (pipeline := hass.data.pop(DOMAIN_PIPELINE, None)) is not None:
+        await pipeline.async_stop()
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     await async_unload_entry(hass, entry)
     await async_setup_entry(hass, entry)
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove cached data and persisted state of devices of removed entry."""
+    metadata = BewardMetadataCache(hass, entry.entry_id)
+    await metadata.async_load()
+    for device_id in metadata.device_ids():
+        await _state_store(hass, device_id).async_remove()
+    await metadata.async_remove()
+
+
+def _state_store(hass: HomeAssistant, device_id: str | None) -> Store:
+    """Return store of persisted state of device."""
+    return Store(hass, _STORAGE_VERSION, f"{DOMAIN}.{slugify(device_id)}")
+
+
+@dataclass(frozen=True, slots=True)
+class BewardEventUpdate:
+    """Change of device event state."""
+
+    event: str
+    state: bool
+    timestamp: datetime | None
+
+
+@dataclass(frozen=True, slots=True)
+class BewardMediaUpdate:
+    """New media captured for device event."""
+
+    event: str
+    image_path: str | None = None
+    clip_path: str | None = None
+
+
 class BewardController:
     """Beward device controller."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         hass: HomeAssistant,
         unique_id: str | None,
         device: BewardGeneric,
         name: str,
+        *,
+        pipeline: BewardEventPipeline | None = None,
+        history: BewardEventHistory | None = None,
+        config: ConfigType | None = None,
+        system_info: dict[str, str] | None = None,
     ) -> None:
         """Initialize configured device."""
         self.hass = hass
         self.name = name
         self._device = device
+        self.client = BewardClient(hass, device)
         self._unique_id = unique_id
+        self._pipeline = pipeline
+        self._history = history
+        self._config = config or {}
+        self._system_info = system_info or {}
+
+        self._rtsp_relay: BewardRtspRelay | None = None
+        self._rtsp_relay_lock = asyncio.Lock()
+        self._stream_reader: BewardStreamReader | None = None
+        self._clip_recorder: BewardClipRecorder | None = None
 
         self._available = True
         self.event_timestamp: dict[str, datetime] = {}
         self.event_state: dict[str, bool] = {}
+        self.event_clip: dict[str, str] = {}
+        self._event_images: dict[str, tuple[str, bytes]] = {}
+        self._saved_hashes: dict[str, tuple[str, int | None]] = {}
+        self._thumbnails = BewardThumbnailCache(hass)
+        self._frame: bytes | None = None
+        self._frame_time = datetime.min.replace(tzinfo=dt_util.UTC)
+        self._frame_task: asyncio.Task | None = None
+        self._frame_task_not_before = self._frame_time
+        self._fresh_ttl = timedelta(
+            seconds=self._config.get(
+                CONF_SNAPSHOT_FRESH_TTL, DEFAULT_SNAPSHOT_FRESH_TTL
+            )
+        )
+        self._max_stale = timedelta(
+            seconds=self._config.get(
+                CONF_SNAPSHOT_MAX_STALE, DEFAULT_SNAPSHOT_MAX_STALE
+            )
+        )
+        self._store = _state_store(hass, unique_id)
+
+        self._alarm_listener = BewardAlarmListener(
+            self.client, ALARMS_TO_EVENTS.keys(), self._async_alarms_handler
+        )
+
+        self._debouncers: dict[str, BewardEventDebouncer] = {}
+        min_on_time = self._config.get(
+            CONF_MOTION_MIN_ON_TIME, DEFAULT_MOTION_MIN_ON_TIME
+        )
+        off_delay = self._config.get(CONF_MOTION_OFF_DELAY, DEFAULT_MOTION_OFF_DELAY)
+        if min_on_time or off_delay:
+            self._debouncers[BewardDeviceEvent.MOTION] = BewardEventDebouncer(
+                hass,
+                min_on_time,
+                off_delay,
+                partial(self._async_handle_event, BewardDeviceEvent.MOTION),
+            )
+
+    async def async_start(self) -> None:
+        """Start background activities of the device."""
+        await self._async_load_state()
+        self._alarm_listener.async_start()
 
-        # Register callback to handle device alarms.
-        self._device.add_alarms_handler(self._alarms_handler)
-        self._device.listen_alarms(alarms=ALARMS_TO_EVENTS.keys())
+        if not isinstance(self._device, BewardCamera):
+            return
 
-    def __del__(self) -> None:
-        """Destructor."""
-        # Remove device alarms handler.
-        self._device.remove_alarms_handler(self._alarms_handler)
-        sleep(0.1)
+        if self._history is not None:
+            self._history.set_retention(
+                self.unique_id,
+                self._config.get(CONF_HISTORY_MAX_AGE, DEFAULT_HISTORY_MAX_AGE),
+                self._config.get(CONF_HISTORY_MAX_COUNT, DEFAULT_HISTORY_MAX_COUNT),
+                self._config.get(CONF_HISTORY_MAX_SIZE, DEFAULT_HISTORY_MAX_SIZE),
+            )
+
+        for event in (BewardDeviceEvent.MOTION, BewardDeviceEvent.DING):
+            record = None
+            if self._history is not None:
+                record = await self.hass.async_add_executor_job(
+                    self._history.latest, self.unique_id, event
+                )
+            if event in self.event_timestamp:
+                continue
+
+            # Migrate timestamps of events captured before state was persisted
+            if record is not None:
+                self.event_timestamp[event] = record.timestamp
+            elif timestamp := await self.hass.async_add_executor_job(
+                self._get_legacy_image_mtime, event
+            ):
+                self.event_timestamp[event] = timestamp
+
+        frame_buffer = None
+        if buffer_duration := self._config.get(
+            CONF_FRAME_BUFFER_DURATION, DEFAULT_FRAME_BUFFER_DURATION
+        ):
+            frame_buffer = BewardFrameBuffer(
+                buffer_duration,
+                self._config.get(
+                    CONF_FRAME_BUFFER_MAX_FRAMES, DEFAULT_FRAME_BUFFER_MAX_FRAMES
+                ),
+                int(
+                    self._config.get(
+                        CONF_FRAME_BUFFER_MAX_SIZE, DEFAULT_FRAME_BUFFER_MAX_SIZE
+                    )
+                    * 1024
+                    * 1024
+                ),
+            )
+
+        clip_recorder = None
+        if self._config.get(CONF_RECORD_CLIPS, DEFAULT_RECORD_CLIPS):
+            # Expose clips left from the previous run
+            for event in (BewardDeviceEvent.MOTION, BewardDeviceEvent.DING):
+                clip_path = Path(self.history_clip_path(event))
+                if await self.hass.async_add_executor_job(clip_path.is_file):
+                    self.event_clip[event] = str(clip_path)
+
+            clip_recorder = BewardClipRecorder(
+                self.name,
+                self._config.get(CONF_CLIP_PRE_ROLL, DEFAULT_CLIP_PRE_ROLL),
+                self._config.get(CONF_CLIP_POST_ROLL, DEFAULT_CLIP_POST_ROLL),
+                _CLIP_BUFFER_SIZE,
+                clip_path=self.history_clip_path,
+                on_saved=self._clip_saved,
+            )
+
+        if (
+            frame_buffer is not None
+            or clip_recorder is not None
+            or self._config.get(CONF_SNAPSHOT_SOURCE, DEFAULT_SNAPSHOT_SOURCE)
+            == SNAPSHOT_SOURCE_STREAM
+        ) and (stream_url := await self.async_get_stream_source()):
+            self._clip_recorder = clip_recorder
+            self._stream_reader = BewardStreamReader(
+                self.hass,
+                self.name,
+                frame_buffer=frame_buffer,
+                clip_recorder=clip_recorder,
+            )
+            self._stream_reader.async_start(stream_url)
+
+    async def async_shutdown(self) -> None:
+        """Release resources of the device."""
+        await self._alarm_listener.async_stop()
+        for debouncer in self._debouncers.values():
+            # Event must not stay on until the next start
+            debouncer.async_flush()
+        await self._store.async_save(self._data_to_save())
+
+        if self._stream_reader is not None:
+            await self._stream_reader.async_stop()
+            self._stream_reader = None
+            self._clip_recorder = None
+
+        if self._rtsp_relay is not None:
+            await self._rtsp_relay.async_stop()
+            self._rtsp_relay = None
 
     def service_signal(self, service: str) -> str:
         """Encode service and identifier into signal."""
         return f"{DOMAIN}_{service}_{slugify(self.unique_id)}"
 
+    def event_signal(self, event: str) -> str:
+        """Return signal of event state changes. It carries BewardEventUpdate."""
+        return self.service_signal(f"event_{event}")
+
+    def media_signal(self, event: str) -> str:
+        """Return signal of new event media. It carries BewardMediaUpdate."""
+        return self.service_signal(f"media_{event}")
+
     @property
     def unique_id(self) -> str | None:
         """Return a device unique ID."""
@@ -295,6 +899,157 @@ class BewardController:
         """Return True if device is available."""
         return self._available
 
+    @property
+    def snapshot_rate(self) -> float:
+        """Return limit of event snapshots per minute, 0 for no limit."""
+        return self._config.get(CONF_SNAPSHOT_RATE, DEFAULT_SNAPSHOT_RATE)
+
+    @property
+    def suppressed_transitions(self) -> dict[str, int]:
+        """Return number of event state changes suppressed by debouncing."""
+        return {event: x.suppressed for event, x in self._debouncers.items()}
+
+    async def async_get_stream_source(self) -> str | None:
+        """Return URL of RTSP stream for local consumers."""
+        if not isinstance(self._device, BewardCamera):
+            return None
+
+        stream_url = await async_get_executor(self.hass).async_run(
+            lambda: self._device.rtsp_live_video_url
+        )
+        if not stream_url or not self._config.get(CONF_RTSP_RELAY, DEFAULT_RTSP_RELAY):
+            return stream_url
+
+        # All local consumers share one RTSP session to the device
+        async with self._rtsp_relay_lock:
+            if self._rtsp_relay is None:
+                relay = BewardRtspRelay(self.hass, stream_url, self.name)
+                await relay.async_start()
+                self._rtsp_relay = relay
+                _LOGGER.info('Stream of "%s" is relayed via %s', self.name, relay.url)
+
+        return self._rtsp_relay.url
+
+    async def async_get_stream_image(
+        self, max_age: float = _MAX_KEYFRAME_AGE
+    ) -> tuple[datetime, bytes] | None:
+        """Return capture time and JPEG of recent keyframe if stream is source."""
+        # Reader may be started for frame buffer or clips only
+        if (
+            self._stream_reader is None
+            or self._config.get(CONF_SNAPSHOT_SOURCE, DEFAULT_SNAPSHOT_SOURCE)
+            != SNAPSHOT_SOURCE_STREAM
+        ):
+            return None
+
+        return await self.hass.async_add_executor_job(self._stream_reader.jpeg, max_age)
+
+    async def async_get_live_image(
+        self, refresh_limiter: asyncio.Semaphore | None = None
+    ) -> bytes | None:
+        """
+        Return recent camera image shared by all consumers of device.
+
+        Image is served from cache while it's fresh. Outdated image is served
+        for max_stale more seconds while a new one is fetched in background,
+        limited by refresh_limiter. Concurrent callers share one device fetch.
+        """
+        if self._frame is not None:
+            age = dt_util.utcnow() - self._frame_time
+            if age < self._fresh_ttl:
+                return self._frame
+
+            # Serve stale image right away and refresh it in background
+            if age < self._fresh_ttl + self._max_stale:
+                self._async_start_frame_fetch(refresh_limiter)
+                return self._frame
+
+        image = await asyncio.shield(self._async_start_frame_fetch())
+        return image if image is not None else self._frame
+
+    async def async_scale_image(
+        self, image: bytes | None, width: int | None, height: int | None
+    ) -> bytes | None:
+        """Return JPEG image downscaled to requested size."""
+        if image is None:
+            return None
+
+        return await self._thumbnails.async_scale(image, width, height)
+
+    @callback
+    def async_refresh_live_image(
+        self, refresh_limiter: asyncio.Semaphore | None = None
+    ) -> bytes | None:
+        """Return cached camera image and refresh it in background if outdated."""
+        if not isinstance(self._device, BewardCamera):
+            return None
+
+        if (
+            self._frame is None
+            or dt_util.utcnow() - self._frame_time >= self._fresh_ttl
+        ):
+            self._async_start_frame_fetch(refresh_limiter)
+        return self._frame
+
+    async def _async_get_event_frame(self, timestamp: datetime) -> bytes | None:
+        """Return camera image taken not before event, fetching it if needed."""
+        not_before = timestamp - _EVENT_FRAME_TOLERANCE
+        if self._frame is not None and self._frame_time >= not_before:
+            return self._frame
+
+        return await asyncio.shield(
+            self._async_start_frame_fetch(not_before=not_before)
+        )
+
+    @callback
+    def _async_start_frame_fetch(
+        self,
+        refresh_limiter: asyncio.Semaphore | None = None,
+        not_before: datetime | None = None,
+    ) -> asyncio.Task:
+        """Start camera image fetch unless a suitable one is already in flight."""
+        task = self._frame_task
+        if (
+            task is None
+            or task.done()
+            or (not_before is not None and self._frame_task_not_before < not_before)
+        ):
+            if not_before is None:
+                # Keyframe of the stream may be taken before the fetch
+                not_before = dt_util.utcnow() - timedelta(seconds=_MAX_KEYFRAME_AGE)
+            self._frame_task_not_before = not_before
+            task = self.hass.async_create_task(
+                self._async_fetch_frame(refresh_limiter, not_before)
+            )
+            self._frame_task = task
+        return task
+
+    async def _async_fetch_frame(
+        self,
+        refresh_limiter: asyncio.Semaphore | None,
+        not_before: datetime,
+    ) -> bytes | None:
+        """Fetch camera image taken not before given time and cache it."""
+        if refresh_limiter is not None:
+            async with refresh_limiter:
+                return await self._async_fetch_frame(None, not_before)
+
+        taken = dt_util.utcnow()
+        max_age = min((taken - not_before).total_seconds(), _MAX_KEYFRAME_AGE)
+        if stream_image := await self.async_get_stream_image(max_age):
+            taken, image = stream_image
+        else:
+            try:
+                image = await self.client.async_live_image()
+            except (TimeoutError, aiohttp.ClientError) as exc:
+                _LOGGER.debug("Error getting image from %s: %s", self.name, exc)
+                return None
+
+        if image is not None and taken >= self._frame_time:
+            self._frame = image
+            self._frame_time = taken
+        return image
+
     @property
     def device_info(self) -> DeviceInfo | None:
         """Return the device info."""
@@ -302,7 +1057,7 @@ class BewardController:
             "identifiers": {(DOMAIN, self.unique_id)},
             "name": self.name,
             "manufacturer": "Beward",
-            "model": self.device.system_info.get("DeviceModel"),
+            "model": self._system_info.get("DeviceModel"),
         }
 
     @property
@@ -312,8 +1067,22 @@ class BewardController:
             ATTR_ATTRIBUTION: ATTRIBUTION,
         }
 
+    def last_event(self, event: str) -> BewardEventRecord | None:
+        """Return the most recent indexed record of event."""
+        if self._history is None:
+            return None
+
+        return self._history.cached_latest(self.unique_id, event)
+
+    def last_image_path(self, event: str) -> str:
+        """Return the path to the most recent image of event."""
+        if record := self.last_event(event):
+            return record.path
+
+        return self.history_image_path(event)
+
     def history_image_path(self, event: str) -> str:
-        """Return the path to saved image."""
+        """Return the path to legacy saved image."""
         file_name = slugify(f"{self.name} last {event}") + ".jpg"
         return self.hass.config.path(
             self.hass.config.media_dirs.get(
@@ -322,15 +1091,192 @@ class BewardController:
             file_name,
         )
 
+    def history_clip_path(self, event: str) -> str:
+        """Return the path to saved clip."""
+        return str(Path(self.history_image_path(event)).with_suffix(".mp4"))
+
+    def _clip_saved(self, event: str, clip_path: str) -> None:
+        """Handle new event clip saved by recorder."""
+        self.event_clip[event] = clip_path
+        dispatcher_send(
+            self.hass,
+            self.media_signal(event),
+            BewardMediaUpdate(event, clip_path=clip_path),
+        )
+
     def set_event_state(self, timestamp: datetime, event: str, state: bool) -> None:  # noqa: FBT001
         """Call Beward to refresh information."""
         _LOGGER.debug("Updating Beward component")
         if state:
             self.event_timestamp[event] = timestamp
+            self.hass.loop.call_soon_threadsafe(self._async_schedule_save)
         self.event_state[event] = state
 
-    def _cache_image(self, event: str, image: bytes | None) -> None:
-        """Save image for event to cache."""
+    async def _async_load_state(self) -> None:
+        """
+        Restore persisted event timestamps.
+
+        Event states aren't restored: events which were on at shutdown may be
+        long over, so all events start off until the device reports them.
+        """
+        data = await self._store.async_load()
+        if not data:
+            return
+
+        for event, value in data.get("event_timestamp", {}).items():
+            if timestamp := dt_util.parse_datetime(value):
+                self.event_timestamp.setdefault(event, timestamp)
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Schedule saving of event timestamps."""
+        self._store.async_delay_save(self._data_to_save, _SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return data of the device to persist."""
+        return {
+            "event_timestamp": {
+                event: timestamp.isoformat()
+                for event, timestamp in self.event_timestamp.items()
+            },
+        }
+
+    def _get_legacy_image_mtime(self, event: str) -> datetime | None:
+        """Return modification time of legacy image file or None."""
+        try:
+            return dt_util.utc_from_timestamp(
+                Path(self.history_image_path(event)).stat().st_mtime
+            )
+        except OSError:
+            return None
+
+    async def async_capture_event_image(
+        self, event: str, timestamp: datetime, received: datetime | None = None
+    ) -> None:
+        """
+        Fetch a snapshot from the device and save it as event image.
+
+        Timestamp is reported by the device and may differ from the clock of
+        Home Assistant which frames are stamped by. So frames are matched by
+        the time the event was received at, or by timestamp if it's unknown.
+        """
+        _LOGGER.debug(
+            'Capture "%s" snapshot of %s at %s', event, self.name, timestamp.isoformat()
+        )
+
+        image = self._get_buffered_image(received or timestamp)
+        if image is None:
+            image = await self._async_get_event_frame(received or timestamp)
+        if image is None:
+            _LOGGER.warning('No "%s" snapshot received from %s', event, self.name)
+            return
+
+        duplicate = await self.hass.async_add_executor_job(
+            self._is_duplicate_image, event, image
+        )
+        if self._history is not None:
+            record = None
+            if duplicate:
+                record = await self.hass.async_add_executor_job(
+                    self._history.add_reference, self.unique_id, event, timestamp
+                )
+            if record is None:
+                duplicate = False
+                record = await self.hass.async_add_executor_job(
+                    self._history.add, self.unique_id, event, timestamp, image
+                )
+            image_path = record.path
+        else:
+            # Legacy single image per event, used by controllers without history
+            if not duplicate:
+                await self.hass.async_add_executor_job(self._cache_image, event, image)
+            image_path = self.history_image_path(event)
+
+        # Duplicate isn't saved, so the path still refers to the previous image
+        cached = self._event_images.get(event)
+        if not duplicate:
+            self._event_images[event] = (image_path, image)
+        elif cached is not None and cached[0] != image_path:
+            del self._event_images[event]
+        async_dispatcher_send(
+            self.hass,
+            self.media_signal(event),
+            BewardMediaUpdate(event, image_path=image_path),
+        )
+
+    async def async_event_image(self, event: str, image_path: str) -> bytes | None:
+        """
+        Return saved image of event.
+
+        The latest image of every event is kept in memory, so it is served
+        without disk I/O. Image of another path is read from file once and then
+        kept instead.
+        """
+        cached = self._event_images.get(event)
+        if cached is not None and cached[0] == image_path:
+            return cached[1]
+
+        try:
+            image = await self.hass.async_add_executor_job(Path(image_path).read_bytes)
+        except OSError:
+            _LOGGER.warning(
+                'Could not read "%s" image of %s from file: %s',
+                event,
+                self.name,
+                image_path,
+            )
+            return None
+
+        # Newer image could be captured while file was read
+        if self._event_images.get(event) is cached:
+            self._event_images[event] = (image_path, image)
+        return image
+
+    def _is_duplicate_image(self, event: str, image: bytes) -> bool:
+        """Return True if image doesn't differ from the last saved image of event."""
+        mode = self._config.get(CONF_SNAPSHOT_DEDUP, DEFAULT_SNAPSHOT_DEDUP)
+        if mode == SNAPSHOT_DEDUP_NONE:
+            return False
+
+        sha256 = hashlib.sha256(image).hexdigest()
+        phash = None
+        if mode == SNAPSHOT_DEDUP_SIMILAR:
+            try:
+                phash = perceptual_hash(image)
+            except (OSError, ValueError) as exc:
+                _LOGGER.debug("Can't decode snapshot of %s: %s", self.name, exc)
+
+        saved = self._saved_hashes.get(event)
+        if saved is None and (record := self.last_event(event)) is not None:
+            saved = (record.sha256, None)
+
+        if saved is not None and (
+            saved[0] == sha256
+            or (
+                phash is not None
+                and saved[1] is not None
+                and (phash ^ saved[1]).bit_count() <= _SIMILAR_IMAGE_DISTANCE
+            )
+        ):
+            _LOGGER.debug('"%s" snapshot of %s is not changed', event, self.name)
+            return True
+
+        self._saved_hashes[event] = (sha256, phash)
+        return False
+
+    def _get_buffered_image(self, timestamp: datetime) -> bytes | None:
+        """Return buffered frame nearest to timestamp."""
+        if self._stream_reader is None or self._stream_reader.frame_buffer is None:
+            return None
+
+        frame = self._stream_reader.frame_buffer.nearest(
+            timestamp, _EVENT_FRAME_TOLERANCE
+        )
+        return frame[1] if frame else None
+
+    def _cache_image(self, event: str, image: bytes) -> None:
+        """Save image for event to legacy cache file. Used only without history."""
         image_path = Path(self.history_image_path(event))
         image_dir = image_path.parent
         tmp_path = Path()
@@ -366,9 +1312,9 @@ class BewardController:
                     # follow-on errors in the cleanup
                     _LOGGER.exception("Image replacement cleanup failed")
 
-    def _alarms_handler(
+    @callback
+    def _async_alarms_handler(
         self,
-        device: BewardGeneric,
         timestamp: datetime,
         alarm: str,
         state: bool,  # noqa: FBT001
@@ -380,24 +1326,57 @@ class BewardController:
             'Handle alarm "%s". State %s at %s', alarm, state, timestamp.isoformat()
         )
 
-        if alarm in ALARMS_TO_EVENTS and device == self._device:
-            event = ALARMS_TO_EVENTS[alarm]
+        if alarm not in ALARMS_TO_EVENTS:
+            return
 
-            if event == BewardDeviceEvent.ONLINE:
-                if self._available != state:
-                    _LOGGER.warning(
-                        'Device "%s" is %s',
-                        self.name,
-                        "reconnected" if state else "unavailable",
-                    )
+        event = ALARMS_TO_EVENTS[alarm]
+        if (debouncer := self._debouncers.get(event)) is not None:
+            debouncer.async_update(state, timestamp)
+        else:
+            self._async_handle_event(event, state, timestamp)
 
-                self._available = state
+    @callback
+    def _async_handle_event(
+        self,
+        event: str,
+        state: bool,  # noqa: FBT001
+        timestamp: datetime,
+    ) -> None:
+        """Apply event state change and notify entities."""
+        if event == BewardDeviceEvent.ONLINE:
+            if self._available != state:
+                _LOGGER.warning(
+                    'Device "%s" is %s',
+                    self.name,
+                    "reconnected" if state else "unavailable",
+                )
+
+            self._available = state
+
+        else:
+            self.event_state[event] = state
+            if state:
+                self.event_timestamp[event] = timestamp
+                self._async_schedule_save()
+
+        # Notify entities first, snapshot capture must not delay state changes
+        async_dispatcher_send(
+            self.hass,
+            self.event_signal(event),
+            BewardEventUpdate(event, state, self.event_timestamp.get(event)),
+        )
 
+        if (
+            event != BewardDeviceEvent.ONLINE
+            and state
+            and isinstance(self._device, BewardCamera)
+        ):
+            if self._pipeline is not None:
+                self._pipeline.async_enqueue(self, event, timestamp)
             else:
-                self.event_state[event] = state
-                if state:
-                    self.event_timestamp[event] = timestamp
-                    if isinstance(self._device, BewardCamera):
-                        self._cache_image(event, self._device.live_image)
+                self.hass.async_create_task(
+                    self.async_capture_event_image(event, timestamp, dt_util.utcnow())
+                )
 
-            dispatcher_send(self.hass, self.service_signal("update"))
+            if self._clip_recorder is not None:
+                self._clip_recorder.trigger(event)
@@ -0,0 +1,175 @@
+"""
+Alarm stream listener for Beward devices.
+
+For more details about this component, please refer to
+https://github.com/Limych/ha-beward
+"""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from datetime import datetime
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from .client import BewardClient
+
+import aiohttp
+import homeassistant.util.dt as dt_util
+from homeassistant.core import callback
+
+from beward.const import ALARM_ONLINE
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+_CONNECT_TIMEOUT: Final = 3  # seconds
+_IDLE_TIMEOUT: Final = 60  # seconds
+_RETRY_MIN_DELAY: Final = 3  # seconds
+_RETRY_MAX_DELAY: Final = 60  # seconds
+
+
+def parse_alarm(line: str) -> tuple[datetime, str, bool] | None:
+    """Parse line of alarm stream to timestamp, alarm and state."""
+    fields = line.split(";")
+    if len(fields) < 4:  # noqa: PLR2004
+        return None
+
+    date, time, alarm, state = fields[:4]
+    try:
+        timestamp = datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M:%S")  # noqa: DTZ007
+    except ValueError:
+        return None
+
+    return (
+        timestamp.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE),
+        alarm,
+        state != "0",
+    )
+
+
+class BewardAlarmListener:
+    """
+    Listen to alarm stream of device on the event loop.
+
+    Stream lines are parsed as they arrive and passed to handler in the event
+    loop. When stream is silent for too long, device is probed to detect
+    half-open connections. Stream is reopened when it ends or stalls; device is
+    reported offline only if it doesn't respond, and reconnection is retried
+    with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        client: BewardClient,
+        alarms: Iterable[str],
+        handler: Callable[[datetime, str, bool], None],
+        channel: int = 0,
+    ) -> None:
+        """Initialize the listener."""
+        self.client = client
+        self._params = {"channel": channel, "parameter": ";".join(set(alarms))}
+        self._handler = handler
+        self._online = False
+        self._task: asyncio.Task | None = None
+
+    @property
+    def online(self) -> bool:
+        """Return True if alarm stream is open."""
+        return self._online
+
+    @callback
+    def async_start(self) -> None:
+        """Start listening."""
+        if self._task is None:
+            self._task = self.client.hass.async_create_background_task(
+                self._async_run(), f"beward alarms {self.client.device.host}"
+            )
+
+    async def async_stop(self) -> None:
+        """Stop listening."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _async_run(self) -> None:
+        """Reopen alarm stream until stopped."""
+        loop = asyncio.get_running_loop()
+        delay = _RETRY_MIN_DELAY
+        while True:
+            opened = loop.time()
+            try:
+                await self._async_listen()
+            except (TimeoutError, aiohttp.ClientError) as exc:
+                _LOGGER.debug(
+                    "Alarm stream of %s failed: %s", self.client.device.host, exc
+                )
+            except Exception:
+                # E.g. ValueError on line exceeding the stream buffer
+                _LOGGER.exception(
+                    "Unexpected error in alarm stream of %s", self.client.device.host
+                )
+            else:
+                # Stream was open, so device is reachable. Throttle reconnects
+                # only if device keeps closing the stream right away.
+                delay = _RETRY_MIN_DELAY
+                if loop.time() - opened < _RETRY_MIN_DELAY:
+                    await asyncio.sleep(_RETRY_MIN_DELAY)
+                continue
+
+            self._set_online(state=False)
+            await asyncio.sleep(random.uniform(delay / 2, delay))  # noqa: S311
+            delay = min(delay * 2, _RETRY_MAX_DELAY)
+
+    async def _async_listen(self) -> None:
+        """Read alarm stream until it ends."""
+        async with self.client.session.get(
+            self.client.url("alarmchangestate"),
+            params={**self.client.device.params, **self._params},
+            auth=self.client.auth,
+            timeout=aiohttp.ClientTimeout(
+                total=None, connect=_CONNECT_TIMEOUT, sock_read=_IDLE_TIMEOUT
+            ),
+        ) as response:
+            if response.status != HTTPStatus.OK:
+                msg = f"Unexpected response status {response.status}"
+                raise aiohttp.ClientError(msg)
+
+            self._set_online(state=True)
+
+            try:
+                async for raw_line in response.content:
+                    line = raw_line.decode(errors="replace").strip()
+                    if not line:
+                        continue
+
+                    _LOGGER.debug("Alarm: %s", line)
+                    if (alarm := parse_alarm(line)) is not None:
+                        try:
+                            self._handler(*alarm)
+                        except Exception:
+                            _LOGGER.exception("Error handling alarm: %s", line)
+
+            except TimeoutError as exc:
+                _LOGGER.debug("Alarm stream of %s is idle", self.client.device.host)
+                # Silent stream of responding device is just reopened
+                if not await self.client.async_is_online():
+                    msg = "Device does not respond"
+                    raise aiohttp.ClientError(msg) from exc
+
+    @callback
+    def _set_online(self, *, state: bool) -> None:
+        """Report change of device connection state."""
+        if self._online != state:
+            self._online = state
+            self._handler(dt_util.now(), ALARM_ONLINE, state)
@@ -9,14 +9,14 @@ import logging
 from typing import TYPE_CHECKING, Final
 
 if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from homeassistant.helpers.typing import ConfigType
 
-    from . import BewardController
+    from . import BewardController, BewardEventUpdate
 
 import beward
 from homeassistant.components.binary_sensor import ENTITY_ID_FORMAT, BinarySensorEntity
-from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
 from homeassistant.const import CONF_BINARY_SENSORS
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import Entity, generate_entity_id
@@ -25,11 +25,9 @@ from .const import (
     BINARY_SENSORS,
     CAT_CAMERA,
     CAT_DOORBELL,
-    DOMAIN,
-    DOMAIN_YAML,
     BewardDeviceEvent,
 )
-from .entity import BewardEntity
+from .entity import BewardEntity, async_setup_device_entities
 
 _LOGGER: Final = logging.getLogger(__name__)
 
@@ -40,26 +38,15 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> bool:
     """Set up a binary sensors for a Beward device."""
-    entities = []
-
-    if entry.source == SOURCE_IMPORT:
-        config = hass.data[DOMAIN_YAML]
-        for index, device_config in enumerate(config):
-            controller = hass.data[DOMAIN][entry.entry_id][index]  # type: BewardController
-            entities.extend(_setup_entities(controller, device_config))
-
-    else:
-        config = entry.data.copy()
-        config.update(entry.options)
-        controller = hass.data[DOMAIN][entry.entry_id][0]  # type: BewardController
-        entities.extend(_setup_entities(controller, config))
-
-    if entities:
-        async_add_entities(entities, update_before_add=True)
+    await async_setup_device_entities(
+        hass, entry, async_add_entities, _async_setup_entities
+    )
     return True
 
 
-def _setup_entities(controller: BewardController, config: ConfigType) -> list[Entity]:
+async def _async_setup_entities(
+    controller: BewardController, config: ConfigType
+) -> list[Entity]:
     """Set up entities for device."""
     category = None
     if isinstance(controller.device, beward.BewardDoorbell):
@@ -82,6 +69,7 @@ class BewardBinarySensor(BewardEntity, BinarySensorEntity):
         super().__init__(controller)
 
         self._sensor_type = sensor_type
+        self._events = (sensor_type,)
 
         self._attr_unique_id = f"{self._controller.unique_id}-{sensor_type}"
         self._attr_name = f"{self._controller.name} {BINARY_SENSORS[sensor_type][0]}"
@@ -102,6 +90,13 @@ class BewardBinarySensor(BewardEntity, BinarySensorEntity):
         """Get the latest data and updates the state."""
         self._update_callback(update_ha_state=False)
 
+    @callback
+    def _async_event_callback(self, update: BewardEventUpdate) -> None:
+        """Update the state from event payload."""
+        if update.event == self._sensor_type:
+            self._attr_is_on = update.state
+        self.async_write_ha_state()
+
     @callback
     def _update_callback(self, update_ha_state: bool = True) -> None:  # noqa: FBT001, FBT002
         """Get the latest data and updates the state if necessary."""
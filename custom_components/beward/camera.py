@@ -10,52 +10,76 @@ https://github.com/Limych/ha-beward
 #  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
 from __future__ import annotations
 
-import datetime
+import asyncio
 import logging
 from asyncio import run_coroutine_threadsafe
-from typing import TYPE_CHECKING, Final
+from functools import partial
+from http import HTTPStatus
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.device_registry import DeviceInfo
     from homeassistant.helpers.entity import Entity
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from homeassistant.helpers.typing import ConfigType
 
-    from . import BewardController
+    from . import BewardController, BewardMediaUpdate
 
 import aiohttp
 import async_timeout
 import beward
-from aiohttp import web
-from haffmpeg.camera import CameraMjpeg
+from aiohttp import hdrs, web
 from homeassistant.components.camera import Camera as CameraEntity
 from homeassistant.components.camera import CameraEntityFeature
 from homeassistant.components.ffmpeg import DATA_FFMPEG, FFmpegManager
 from homeassistant.components.local_file.camera import LocalFile
-from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
+from homeassistant.config_entries import SOURCE_IMPORT
+from homeassistant.core import callback
 from homeassistant.helpers.aiohttp_client import (
     async_aiohttp_proxy_stream,
     async_get_clientsession,
 )
-from homeassistant.util import dt as dt_util
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import (
+    ATTR_CLIP,
     CAMERA_LIVE,
     CAMERA_NAME_LIVE,
+    CAMERA_NAME_MOSAIC,
     CAMERAS,
     CAT_CAMERA,
     CAT_DOORBELL,
     CONF_CAMERAS,
     CONF_FFMPEG_ARGUMENTS,
+    CONF_MJPEG_MODE,
+    CONF_MOSAIC,
+    CONF_MOSAIC_COLUMNS,
+    CONF_MOSAIC_INTERVAL,
+    CONF_MOSAIC_TILE_HEIGHT,
+    CONF_MOSAIC_TILE_WIDTH,
+    CONF_SNAPSHOT_REFRESH_CONCURRENCY,
+    DEFAULT_MJPEG_MODE,
+    DEFAULT_SNAPSHOT_REFRESH_CONCURRENCY,
     DOMAIN,
-    DOMAIN_YAML,
+    DOMAIN_YAML_SETUP,
+    MJPEG_MODE_PASSTHROUGH,
+)
+from .entity import (
+    BewardEntity,
+    async_setup_device_entities,
+    entry_device_configs,
 )
-from .entity import BewardEntity
+from .mjpeg import BewardMjpegBroadcaster
+from .mosaic import BewardMosaic
+from .thumbnail import BewardThumbnailCache
 
 _LOGGER: Final = logging.getLogger(__name__)
 
-_UPDATE_INTERVAL_LIVE: Final = datetime.timedelta(seconds=1)
 _SESSION_TIMEOUT: Final = 10  # seconds
 
 
@@ -65,27 +89,41 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> bool:
     """Set up a cameras for a Beward device."""
-    entities = []
-
-    if entry.source == SOURCE_IMPORT:
-        config = hass.data[DOMAIN_YAML]
-        for index, device_config in enumerate(config):
-            controller = hass.data[DOMAIN][entry.entry_id][index]
-            entities.extend(await _async_setup_entities(controller, device_config))
+    refresh_limiter = _refresh_limiter(entry_device_configs(hass, entry))
+    await async_setup_device_entities(
+        hass,
+        entry,
+        async_add_entities,
+        partial(_async_setup_entities, refresh_limiter=refresh_limiter),
+    )
+
+    if entry.source == SOURCE_IMPORT and hass.data[DOMAIN_YAML_SETUP][CONF_MOSAIC]:
+        async_add_entities(
+            [BewardMosaicCamera(entry, hass.data[DOMAIN_YAML_SETUP], refresh_limiter)]
+        )
+    return True
 
-    else:
-        config = entry.data.copy()
-        config.update(entry.options)
-        controller = hass.data[DOMAIN][entry.entry_id][0]
-        entities.extend(await _async_setup_entities(controller, config))
 
-    if entities:
-        async_add_entities(entities, update_before_add=True)
-    return True
+def _refresh_limiter(configs: list[ConfigType]) -> asyncio.Semaphore:
+    """Return limiter of background snapshot refreshes for config entry."""
+    return asyncio.Semaphore(
+        max(
+            (
+                cfg.get(
+                    CONF_SNAPSHOT_REFRESH_CONCURRENCY,
+                    DEFAULT_SNAPSHOT_REFRESH_CONCURRENCY,
+                )
+                for cfg in configs
+            ),
+            default=DEFAULT_SNAPSHOT_REFRESH_CONCURRENCY,
+        )
+    )
 
 
 async def _async_setup_entities(
-    controller: BewardController, config: ConfigType
+    controller: BewardController,
+    config: ConfigType,
+    refresh_limiter: asyncio.Semaphore,
 ) -> list[Entity]:
     """Set up entities for device."""
     category = None
@@ -98,10 +136,7 @@ async def _async_setup_entities(
     for camera_type in config.get(CONF_CAMERAS, list(CAMERAS)):
         if category in CAMERAS[camera_type][1]:
             if camera_type == CAMERA_LIVE:
-                await controller.hass.async_add_executor_job(
-                    controller.device.obtain_uris
-                )
-                entities.append(BewardLiveCamera(controller, config))
+                entities.append(BewardLiveCamera(controller, config, refresh_limiter))
 
             else:
                 entities.append(BewardFileCamera(controller, camera_type))
@@ -112,24 +147,39 @@ async def _async_setup_entities(
 class BewardLiveCamera(BewardEntity, CameraEntity):
     """The camera on a Beward device."""
 
-    def __init__(self, controller: BewardController, config: ConfigType) -> None:
+    def __init__(
+        self,
+        controller: BewardController,
+        config: ConfigType,
+        refresh_limiter: asyncio.Semaphore,
+    ) -> None:
         """Initialize the camera on a Beward device."""
         super().__init__(controller)
 
-        self._url = controller.device.live_image_url
         self._stream_url = controller.device.rtsp_live_video_url
-        self._last_image = None
-        self._last_update = datetime.datetime.min
+        self._refresh_limiter = refresh_limiter
 
-        self._ffmpeg_input = "-rtsp_transport tcp -i " + self._stream_url
         self._ffmpeg_arguments = config.get(CONF_FFMPEG_ARGUMENTS)
+        self._mjpeg_broadcaster: BewardMjpegBroadcaster | None = None
+
+        self._mjpeg_url = None
+        if config.get(CONF_MJPEG_MODE, DEFAULT_MJPEG_MODE) == MJPEG_MODE_PASSTHROUGH:
+            device = controller.device
+            self._mjpeg_url = device.get_url(
+                "video",
+                extra_params={"channel": 0},
+                username=device.username,
+                password=device.password,
+            )
 
         self._attr_unique_id = f"{self._controller.unique_id}-live"
         self._attr_name = CAMERA_NAME_LIVE.format(controller.name)
 
     async def stream_source(self) -> str | None:
         """Return the stream source."""
-        return self._stream_url
+        if not self._stream_url:
+            return None
+        return await self._controller.async_get_stream_source()
 
     @property
     def supported_features(self) -> int | None:
@@ -140,67 +190,166 @@ class BewardLiveCamera(BewardEntity, CameraEntity):
 
     def camera_image(
         self,
-        width: int | None = None,  # noqa: ARG002
-        height: int | None = None,  # noqa: ARG002
+        width: int | None = None,
+        height: int | None = None,
     ) -> bytes | None:
         """Return camera image."""
         return run_coroutine_threadsafe(
-            self.async_camera_image(), self.hass.loop
+            self.async_camera_image(width, height), self.hass.loop
         ).result()
 
     async def async_camera_image(
         self,
-        width: int | None = None,  # noqa: ARG002
-        height: int | None = None,  # noqa: ARG002
+        width: int | None = None,
+        height: int | None = None,
     ) -> bytes | None:
         """Pull a still image from the camera."""
-        now = dt_util.now()
-
-        if self._last_image and now - self._last_update < _UPDATE_INTERVAL_LIVE:
-            return self._last_image
-
-        try:
-            websession = async_get_clientsession(self.hass)
-            with async_timeout.timeout(_SESSION_TIMEOUT):
-                response = await websession.get(self._url)
-
-        except TimeoutError:
-            _LOGGER.exception("Camera image timed out")
-            return self._last_image
-
-        except aiohttp.ClientError:
-            _LOGGER.exception("Error getting camera image")
-            return self._last_image
-
-        else:
-            self._last_image = await response.read()
-            self._last_update = now
-            return self._last_image
+        # Frame cache of controller is shared with event snapshots
+        image = await self._controller.async_get_live_image(self._refresh_limiter)
+        return await self._controller.async_scale_image(image, width, height)
 
     async def handle_async_mjpeg_stream(
         self, request: web.Request
     ) -> web.StreamResponse | None:
         """Generate an HTTP MJPEG stream from the camera."""
+        if self._mjpeg_url:
+            response = await self._async_mjpeg_passthrough(request)
+            if response is not None:
+                return response
+
         if not self._stream_url:
             return None
 
-        ffmpeg_manager: FFmpegManager = self.hass.data[DATA_FFMPEG]
+        # All viewers share one ffmpeg process
+        if self._mjpeg_broadcaster is None:
+            stream_source = await self.stream_source()
+            # Another viewer could create broadcaster while source was resolved
+            if self._mjpeg_broadcaster is None:
+                ffmpeg_manager: FFmpegManager = self.hass.data[DATA_FFMPEG]
+                self._mjpeg_broadcaster = BewardMjpegBroadcaster(
+                    self.hass,
+                    ffmpeg_manager,
+                    "-rtsp_transport tcp -i " + stream_source,
+                    extra_cmd=self._ffmpeg_arguments,
+                )
 
-        # pylint: disable=no-value-for-parameter
-        stream = CameraMjpeg(ffmpeg_manager.binary)
+        return await self._mjpeg_broadcaster.async_handle(request)
 
-        await stream.open_camera(self._ffmpeg_input, extra_cmd=self._ffmpeg_arguments)
+    async def _async_mjpeg_passthrough(
+        self, request: web.Request
+    ) -> web.StreamResponse | None:
+        """Proxy native MJPEG stream of the device if it has one."""
+        websession = async_get_clientsession(self.hass)
+        try:
+            async with async_timeout.timeout(_SESSION_TIMEOUT):
+                stream = await websession.get(self._mjpeg_url)
+
+        except (TimeoutError, aiohttp.ClientError):
+            _LOGGER.debug("Error getting native MJPEG stream, fallback to ffmpeg")
+            return None
+
+        content_type = stream.headers.get(hdrs.CONTENT_TYPE, "")
+        if stream.status != HTTPStatus.OK or not content_type.startswith("multipart/"):
+            stream.close()
+            self._mjpeg_url = None
+            _LOGGER.info(
+                "%s does not support native MJPEG stream, fallback to ffmpeg",
+                self._controller.name,
+            )
+            return None
 
         try:
-            stream_reader = await stream.get_reader()
             return await async_aiohttp_proxy_stream(
-                self.hass,
-                request,
-                stream_reader,
-                ffmpeg_manager.ffmpeg_stream_content_type,
+                self.hass, request, stream.content, content_type
             )
         finally:
-            await stream.close()
+            stream.close()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Disconnect from update signal and stop shared MJPEG stream."""
+        await super().async_will_remove_from_hass()
+
+        if self._mjpeg_broadcaster is not None:
+            await self._mjpeg_broadcaster.async_stop()
+
+
+class BewardMosaicCamera(CameraEntity):
+    """Grid of live images of devices of all config entries."""
+
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        config: ConfigType,
+        refresh_limiter: asyncio.Semaphore,
+    ) -> None:
+        """Initialize the camera."""
+        super().__init__()
+
+        self._config = config
+        self._mosaic: BewardMosaic | None = None
+        self._interval = config[CONF_MOSAIC_INTERVAL]
+        self._refresh_limiter = refresh_limiter
+        self._thumbnails: BewardThumbnailCache | None = None
+
+        self._image: bytes | None = None
+        self._updated = 0.0
+        self._update_task: asyncio.Task | None = None
+
+        self._attr_unique_id = f"{entry.entry_id}-mosaic"
+        self._attr_name = CAMERA_NAME_MOSAIC
+
+    async def async_camera_image(
+        self,
+        width: int | None = None,
+        height: int | None = None,
+    ) -> bytes | None:
+        """Return mosaic, rebuilding it at most once per interval."""
+        if (
+            self._image is None
+            or self.hass.loop.time() - self._updated >= self._interval
+        ):
+            if self._update_task is None or self._update_task.done():
+                self._update_task = self.hass.async_create_task(
+                    self._async_update_image()
+                )
+            await asyncio.shield(self._update_task)
+
+        if self._image is None:
+            return None
+
+        if self._thumbnails is None:
+            self._thumbnails = BewardThumbnailCache(self.hass)
+        return await self._thumbnails.async_scale(self._image, width, height)
+
+    async def _async_update_image(self) -> None:
+        """Redraw mosaic from cached images of devices."""
+        # Every device of loaded entries has its tile, even if it's not connected yet
+        controllers: list[BewardController | None] = [
+            cfg.get(index)
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+            if (cfg := self.hass.data[DOMAIN].get(entry.entry_id)) is not None
+            for index in range(len(entry_device_configs(self.hass, entry)))
+        ]
+        if self._mosaic is None or self._mosaic.count != len(controllers):
+            self._mosaic = BewardMosaic(
+                len(controllers),
+                self._config[CONF_MOSAIC_COLUMNS],
+                self._config[CONF_MOSAIC_TILE_WIDTH],
+                self._config[CONF_MOSAIC_TILE_HEIGHT],
+            )
+
+        images = [
+            controller.async_refresh_live_image(self._refresh_limiter)
+            if controller is not None
+            else None
+            for controller in controllers
+        ]
+        self._image = await self.hass.async_add_executor_job(
+            self._mosaic.update, images
+        )
+        self._updated = self.hass.loop.time()
 
 
 class BewardFileCamera(LocalFile):
@@ -210,13 +359,54 @@ class BewardFileCamera(LocalFile):
         """Initialize."""
         super().__init__(
             CAMERAS[camera_type][0].format(controller.name),
-            controller.history_image_path(CAMERAS[camera_type][2]),
+            controller.last_image_path(CAMERAS[camera_type][2]),
         )
 
         self._controller = controller
+        self._event = CAMERAS[camera_type][2]
+        self._clip_path = controller.event_clip.get(self._event)
 
         self._attr_unique_id = f"{self._controller.unique_id}-file-{camera_type}"
 
+    async def async_added_to_hass(self) -> None:
+        """Register callbacks."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                self._controller.media_signal(self._event),
+                self._async_media_callback,
+            )
+        )
+
+    @callback
+    def _async_media_callback(self, update: BewardMediaUpdate) -> None:
+        """Switch to the most recent event media."""
+        if update.image_path is not None:
+            self._file_path = update.image_path
+        if update.clip_path is not None:
+            self._clip_path = update.clip_path
+        self.async_write_ha_state()
+
+    async def async_camera_image(
+        self,
+        width: int | None = None,
+        height: int | None = None,
+    ) -> bytes | None:
+        """Return image of the last event."""
+        image = await self._controller.async_event_image(self._event, self._file_path)
+        return await self._controller.async_scale_image(image, width, height)
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        """Return the camera state attributes."""
+        attrs = dict(super().extra_state_attributes or {})
+        if self._clip_path:
+            attrs[ATTR_CLIP] = (
+                f"media-source://media_source/{DOMAIN}/{Path(self._clip_path).name}"
+            )
+        return attrs
+
     @property
     def device_info(self) -> DeviceInfo | None:
         """Return the device info."""
@@ -0,0 +1,162 @@
+"""
+Asyncio client for CGI API of Beward devices.
+
+For more details about this component, please refer to
+https://github.com/Limych/ha-beward
+"""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from homeassistant.core import Event, HomeAssistant
+
+    from beward import BewardGeneric
+
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import callback
+
+from beward import BewardCamera
+
+from .const import DOMAIN_HTTP_SESSION
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+# One connection to every device is held by alarm stream
+_LIMIT_PER_HOST: Final = 3
+_KEEPALIVE_TIMEOUT: Final = 30  # seconds
+_TIMEOUT: Final = aiohttp.ClientTimeout(total=10, connect=3)
+
+_DEFAULT_RTSP_PORT: Final = 554
+_IMAGE_CONTENT_TYPES: Final = ("image/jpeg", "image/png")
+
+
+@callback
+def async_get_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """
+    Return HTTP session shared by all Beward devices.
+
+    Session keeps connections alive and limits number of them to every device.
+    """
+    session = hass.data.get(DOMAIN_HTTP_SESSION)
+    if session is None:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=_LIMIT_PER_HOST,
+                keepalive_timeout=_KEEPALIVE_TIMEOUT,
+            ),
+            timeout=_TIMEOUT,
+        )
+        hass.data[DOMAIN_HTTP_SESSION] = session
+
+        async def _async_close_session(event: Event) -> None:  # noqa: ARG001
+            hass.data.pop(DOMAIN_HTTP_SESSION, None)
+            await session.close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_session)
+
+    return session
+
+
+class BewardClient:
+    """
+    Asyncio counterpart of device methods of Beward library.
+
+    Requests are made without executor threads through the shared HTTP session.
+    Errors are raised as aiohttp.ClientError or TimeoutError.
+    """
+
+    def __init__(self, hass: HomeAssistant, device: BewardGeneric) -> None:
+        """Initialize the client."""
+        self.hass = hass
+        self.device = device
+
+    @property
+    def auth(self) -> aiohttp.BasicAuth:
+        """Return credentials of device."""
+        return aiohttp.BasicAuth(self.device.username, self.device.password or "")
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return HTTP session."""
+        return async_get_session(self.hass)
+
+    def url(self, function: str) -> str:
+        """Return URL of device function without credentials."""
+        return f"http://{self.device.host}:{self.device.port}/cgi-bin/{function}_cgi"
+
+    async def async_query(
+        self, function: str, extra_params: dict | None = None
+    ) -> tuple[bytes, str]:
+        """Query device function and return response body and content type."""
+        url = self.url(function)
+        params = self.device.params.copy()
+        if extra_params:
+            params.update(extra_params)
+
+        _LOGGER.debug("Querying %s", url)
+        async with self.session.get(url, params=params, auth=self.auth) as response:
+            response.raise_for_status()
+            return await response.read(), response.content_type
+
+    async def async_get_info(self, function: str) -> dict[str, str]:
+        """Get info from device."""
+        data, _ = await self.async_query(function, {"action": "get"})
+
+        info = {}
+        for line in data.decode(errors="replace").splitlines():
+            key, sep, val = line.partition("=")
+            if sep:
+                info[key] = val
+        return info
+
+    async def async_system_info(self) -> dict[str, str]:
+        """Get system info from device."""
+        return await self.async_get_info("systeminfo")
+
+    async def async_is_online(self) -> bool:
+        """Return True if device responds to requests."""
+        try:
+            await self.async_query("systeminfo")
+        except (TimeoutError, aiohttp.ClientError):
+            return False
+
+        return True
+
+    async def async_rtsp_port(self) -> int:
+        """Get RTSP port of device."""
+        try:
+            info = await self.async_get_info("rtsp")
+        except (TimeoutError, aiohttp.ClientError) as exc:
+            _LOGGER.debug("Can't get RTSP port of %s: %s", self.device.host, exc)
+            return _DEFAULT_RTSP_PORT
+
+        try:
+            return int(info.get("RtspPort", _DEFAULT_RTSP_PORT))
+        except ValueError:
+            return _DEFAULT_RTSP_PORT
+
+    async def async_obtain_uris(self) -> None:
+        """Resolve live image and RTSP URIs of camera."""
+        if not isinstance(self.device, BewardCamera):
+            return
+
+        if not self.device.rtsp_port:
+            self.device.rtsp_port = await self.async_rtsp_port()
+        # No requests are made as RTSP port is already known
+        self.device.obtain_uris()
+
+    async def async_live_image(self) -> bytes | None:
+        """Return bytes of camera image."""
+        data, content_type = await self.async_query("images", {"channel": 0})
+        if content_type not in _IMAGE_CONTENT_TYPES:
+            return None
+
+        return data
@@ -0,0 +1,236 @@
+"""
+Event clip recording for Beward cameras.
+
+For more details about this component, please refer to
+https://github.com/Limych/ha-beward
+"""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import contextlib
+import logging
+import tempfile
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from fractions import Fraction
+
+import av
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+_MAX_CLIP_DURATION: Final = 60  # seconds
+
+
+@dataclass(slots=True)
+class _ClipPacket:
+    """Copy of compressed video packet."""
+
+    data: bytes
+    pts: int
+    dts: int
+    duration: int
+    is_keyframe: bool
+    arrived: float
+
+
+@dataclass(slots=True)
+class _Clip:
+    """Clip being recorded."""
+
+    event: str
+    started: float
+    ends: float
+    packets: list[_ClipPacket] = field(default_factory=list)
+
+
+class BewardClipRecorder:
+    """
+    Record event clips from RTSP packets without transcoding.
+
+    Compressed packets are kept in a rolling pre-record buffer which always
+    starts with a keyframe. On event, the buffer contents and packets received
+    during post-roll time are remuxed to MP4 file by stream copy. Repeated
+    event extends the clip being recorded instead of starting a new one.
+
+    All methods except trigger() are called from the stream reader thread.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        name: str,
+        pre_roll: float,
+        post_roll: float,
+        max_size: int,
+        *,
+        clip_path: Callable[[str], str],
+        on_saved: Callable[[str, str], None],
+    ) -> None:
+        """Initialize the recorder."""
+        self.name = name
+        self.pre_roll = pre_roll
+        self.post_roll = post_roll
+        self.max_size = max_size
+        self._clip_path = clip_path
+        self._on_saved = on_saved
+
+        self._stream: av.video.stream.VideoStream | None = None
+        self._time_base: Fraction | None = None
+        self._gops: deque[list[_ClipPacket]] = deque()
+        self._size = 0
+        self._clips: list[_Clip] = []
+        self._lock = threading.Lock()
+
+    def attach(self, stream: av.video.stream.VideoStream) -> None:
+        """Start buffering packets of new input stream."""
+        self._stream = stream
+        self._time_base = stream.time_base
+
+    def detach(self) -> None:
+        """Save pending clips and drop the buffer on input stream close."""
+        with self._lock:
+            clips = self._clips
+            self._clips = []
+            self._gops.clear()
+            self._size = 0
+
+        for clip in clips:
+            self._save(clip)
+        self._stream = None
+
+    def trigger(self, event: str) -> None:
+        """Start recording of event clip. Can be called from any thread."""
+        now = time.monotonic()
+        with self._lock:
+            if self._stream is None:
+                _LOGGER.debug(
+                    'No stream of %s to record "%s" clip from', self.name, event
+                )
+                return
+
+            for clip in self._clips:
+                if clip.event == event:
+                    clip.ends = min(
+                        now + self.post_roll, clip.started + _MAX_CLIP_DURATION
+                    )
+                    return
+
+            self._clips.append(
+                _Clip(
+                    event,
+                    now,
+                    now + self.post_roll,
+                    [packet for gop in self._gops for packet in gop],
+                )
+            )
+
+    def add_packet(self, packet: av.Packet) -> None:
+        """Add packet of the input stream."""
+        if packet.pts is None or packet.size == 0:
+            return
+
+        now = time.monotonic()
+        item = _ClipPacket(
+            bytes(packet),
+            packet.pts,
+            packet.dts if packet.dts is not None else packet.pts,
+            packet.duration or 0,
+            packet.is_keyframe,
+            now,
+        )
+
+        with self._lock:
+            self._buffer(item)
+
+            finished = []
+            for clip in self._clips:
+                if clip.packets or item.is_keyframe:
+                    clip.packets.append(item)
+                if now >= clip.ends:
+                    finished.append(clip)
+            for clip in finished:
+                self._clips.remove(clip)
+
+        for clip in finished:
+            self._save(clip)
+
+    def _buffer(self, item: _ClipPacket) -> None:
+        """Add packet to pre-record buffer and drop outdated GOPs."""
+        if item.is_keyframe:
+            self._gops.append([item])
+        elif self._gops:
+            self._gops[-1].append(item)
+        else:
+            # Clip can't start without keyframe
+            return
+        self._size += len(item.data)
+
+        cutoff = item.arrived - self.pre_roll
+        while len(self._gops) > 1 and (
+            self._gops[1][0].arrived <= cutoff or self._size > self.max_size
+        ):
+            self._size -= sum(len(x.data) for x in self._gops.popleft())
+
+    def _save(self, clip: _Clip) -> None:
+        """Remux clip packets to MP4 file."""
+        packets = clip.packets
+        if not packets or self._stream is None:
+            return
+
+        clip_path = Path(self._clip_path(clip.event))
+        clip_dir = clip_path.parent
+        clip_dir.mkdir(parents=True, mode=0o755, exist_ok=True)
+
+        _LOGGER.debug("Save %s clip to %s", clip.event, clip_path)
+
+        tmp_path = Path()
+        try:
+            with tempfile.NamedTemporaryFile(
+                dir=clip_dir, suffix=".mp4", delete=False
+            ) as fdesc:
+                tmp_path = Path(fdesc.name)
+
+            self._remux(packets, tmp_path)
+            tmp_path.chmod(0o644)
+            tmp_path.replace(clip_path)
+
+        except (av.error.FFmpegError, OSError):
+            _LOGGER.exception("Saving clip file failed: %s", clip_path)
+            return
+
+        finally:
+            if tmp_path.is_file():
+                try:
+                    tmp_path.unlink()
+
+                except OSError:
+                    _LOGGER.exception("Clip replacement cleanup failed")
+
+        self._on_saved(clip.event, str(clip_path))
+
+    def _remux(self, packets: list[_ClipPacket], path: Path) -> None:
+        """Write packets to MP4 container by stream copy."""
+        start = packets[0].dts
+        with av.open(str(path), "w", format="mp4") as output:
+            stream = output.add_stream(template=self._stream)
+
+            for item in packets:
+                packet = av.Packet(item.data)
+                packet.pts = item.pts - start
+                packet.dts = item.dts - start
+                packet.time_base = self._time_base
+                # Packet duration and flags are read-only in PyAV before 11.0
+                with contextlib.suppress(AttributeError):
+                    packet.duration = item.duration
+                    packet.is_keyframe = item.is_keyframe
+                packet.stream = stream
+                output.mux(packet)
@@ -34,10 +34,52 @@ from .const import (  # pylint: disable=unused-import
     BINARY_SENSORS,
     CAMERAS,
     CONF_CAMERAS,
+    CONF_CLIP_POST_ROLL,
+    CONF_CLIP_PRE_ROLL,
+    CONF_FRAME_BUFFER_DURATION,
+    CONF_FRAME_BUFFER_MAX_FRAMES,
+    CONF_FRAME_BUFFER_MAX_SIZE,
+    CONF_HISTORY_MAX_AGE,
+    CONF_HISTORY_MAX_COUNT,
+    CONF_HISTORY_MAX_SIZE,
+    CONF_MJPEG_MODE,
+    CONF_MOTION_MIN_ON_TIME,
+    CONF_MOTION_OFF_DELAY,
+    CONF_RECORD_CLIPS,
+    CONF_RTSP_RELAY,
+    CONF_SNAPSHOT_DEDUP,
+    CONF_SNAPSHOT_FRESH_TTL,
+    CONF_SNAPSHOT_MAX_STALE,
+    CONF_SNAPSHOT_RATE,
+    CONF_SNAPSHOT_REFRESH_CONCURRENCY,
+    CONF_SNAPSHOT_SOURCE,
+    DEFAULT_CLIP_POST_ROLL,
+    DEFAULT_CLIP_PRE_ROLL,
+    DEFAULT_FRAME_BUFFER_DURATION,
+    DEFAULT_FRAME_BUFFER_MAX_FRAMES,
+    DEFAULT_FRAME_BUFFER_MAX_SIZE,
+    DEFAULT_HISTORY_MAX_AGE,
+    DEFAULT_HISTORY_MAX_COUNT,
+    DEFAULT_HISTORY_MAX_SIZE,
+    DEFAULT_MJPEG_MODE,
+    DEFAULT_MOTION_MIN_ON_TIME,
+    DEFAULT_MOTION_OFF_DELAY,
     DEFAULT_PORT,
+    DEFAULT_RECORD_CLIPS,
+    DEFAULT_RTSP_RELAY,
+    DEFAULT_SNAPSHOT_DEDUP,
+    DEFAULT_SNAPSHOT_FRESH_TTL,
+    DEFAULT_SNAPSHOT_MAX_STALE,
+    DEFAULT_SNAPSHOT_RATE,
+    DEFAULT_SNAPSHOT_REFRESH_CONCURRENCY,
+    DEFAULT_SNAPSHOT_SOURCE,
     DOMAIN,
+    MJPEG_MODES,
     SENSORS,
+    SNAPSHOT_DEDUPS,
+    SNAPSHOT_SOURCES,
 )
+from .executor import async_get_executor
 
 
 class BewardFlowHandler(ConfigFlow, domain=DOMAIN):
@@ -119,7 +161,7 @@ class BewardFlowHandler(ConfigFlow, domain=DOMAIN):
                 )
                 return device.available
 
-            return await self.hass.async_add_executor_job(test_device)
+            return await async_get_executor(self.hass).async_run(test_device)
         except Exception:  # noqa: S110, BLE001
             pass
         return False
@@ -174,6 +216,118 @@ class BewardOptionsFlowHandler(OptionsFlow):
                     vol.Optional(
                         CONF_SENSORS, default=self.options.get(CONF_SENSORS, [])
                     ): cv.multi_select(SENSORS),
+                    vol.Optional(
+                        CONF_RTSP_RELAY,
+                        default=self.options.get(CONF_RTSP_RELAY, DEFAULT_RTSP_RELAY),
+                    ): bool,
+                    vol.Optional(
+                        CONF_MJPEG_MODE,
+                        default=self.options.get(CONF_MJPEG_MODE, DEFAULT_MJPEG_MODE),
+                    ): vol.In(MJPEG_MODES),
+                    vol.Optional(
+                        CONF_SNAPSHOT_SOURCE,
+                        default=self.options.get(
+                            CONF_SNAPSHOT_SOURCE, DEFAULT_SNAPSHOT_SOURCE
+                        ),
+                    ): vol.In(SNAPSHOT_SOURCES),
+                    vol.Optional(
+                        CONF_SNAPSHOT_FRESH_TTL,
+                        default=self.options.get(
+                            CONF_SNAPSHOT_FRESH_TTL, DEFAULT_SNAPSHOT_FRESH_TTL
+                        ),
+                    ): cv.positive_float,
+                    vol.Optional(
+                        CONF_SNAPSHOT_MAX_STALE,
+                        default=self.options.get(
+                            CONF_SNAPSHOT_MAX_STALE, DEFAULT_SNAPSHOT_MAX_STALE
+                        ),
+                    ): cv.positive_float,
+                    vol.Optional(
+                        CONF_SNAPSHOT_REFRESH_CONCURRENCY,
+                        default=self.options.get(
+                            CONF_SNAPSHOT_REFRESH_CONCURRENCY,
+                            DEFAULT_SNAPSHOT_REFRESH_CONCURRENCY,
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_SNAPSHOT_RATE,
+                        default=self.options.get(
+                            CONF_SNAPSHOT_RATE, DEFAULT_SNAPSHOT_RATE
+                        ),
+                    ): cv.positive_float,
+                    vol.Optional(
+                        CONF_SNAPSHOT_DEDUP,
+                        default=self.options.get(
+                            CONF_SNAPSHOT_DEDUP, DEFAULT_SNAPSHOT_DEDUP
+                        ),
+                    ): vol.In(SNAPSHOT_DEDUPS),
+                    vol.Optional(
+                        CONF_FRAME_BUFFER_DURATION,
+                        default=self.options.get(
+                            CONF_FRAME_BUFFER_DURATION, DEFAULT_FRAME_BUFFER_DURATION
+                        ),
+                    ): cv.positive_float,
+                    vol.Optional(
+                        CONF_FRAME_BUFFER_MAX_FRAMES,
+                        default=self.options.get(
+                            CONF_FRAME_BUFFER_MAX_FRAMES,
+                            DEFAULT_FRAME_BUFFER_MAX_FRAMES,
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_FRAME_BUFFER_MAX_SIZE,
+                        default=self.options.get(
+                            CONF_FRAME_BUFFER_MAX_SIZE, DEFAULT_FRAME_BUFFER_MAX_SIZE
+                        ),
+                    ): cv.positive_float,
+                    vol.Optional(
+                        CONF_HISTORY_MAX_AGE,
+                        default=self.options.get(
+                            CONF_HISTORY_MAX_AGE, DEFAULT_HISTORY_MAX_AGE
+                        ),
+                    ): cv.positive_float,
+                    vol.Optional(
+                        CONF_HISTORY_MAX_COUNT,
+                        default=self.options.get(
+                            CONF_HISTORY_MAX_COUNT, DEFAULT_HISTORY_MAX_COUNT
+                        ),
+                    ): cv.positive_int,
+                    vol.Optional(
+                        CONF_HISTORY_MAX_SIZE,
+                        default=self.options.get(
+                            CONF_HISTORY_MAX_SIZE, DEFAULT_HISTORY_MAX_SIZE
+                        ),
+                    ): cv.positive_float,
+                    vol.Optional(
+                        CONF_RECORD_CLIPS,
+                        default=self.options.get(
+                            CONF_RECORD_CLIPS, DEFAULT_RECORD_CLIPS
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_CLIP_PRE_ROLL,
+                        default=self.options.get(
+                            CONF_CLIP_PRE_ROLL, DEFAULT_CLIP_PRE_ROLL
+                        ),
+                    ): cv.positive_float,
+                    vol.Optional(
+                        CONF_CLIP_POST_ROLL,
+                        default=self.options.get(
+                            CONF_CLIP_POST_ROLL, DEFAULT_CLIP_POST_ROLL
+                        ),
+                    ): cv.positive_float,
+                    vol.Optional(
+                        CONF_MOTION_MIN_ON_TIME,
+                        default=self.options.get(
+                            CONF_MOTION_MIN_ON_TIME, DEFAULT_MOTION_MIN_ON_TIME
+                        ),
+                    ): cv.positive_float,
+                    vol.Optional(
+                        CONF_MOTION_OFF_DELAY,
+                        default=self.options.get(
+                            CONF_MOTION_OFF_DELAY, DEFAULT_MOTION_OFF_DELAY
+                        ),
+                    ): cv.positive_float,
                 }
             ),
         )
@@ -27,6 +27,10 @@ ATTRIBUTION: Final = "Data provided by Beward device."
 ISSUE_URL: Final = "https://github.com/Limych/ha-beward/issues"
 SUPPORT_LIB_URL: Final = "https://github.com/Limych/py-beward/issues/new/choose"
 DOMAIN_YAML: Final = f"{DOMAIN}_yaml"
+DOMAIN_HTTP_SESSION: Final = f"{DOMAIN}_http_session"
+DOMAIN_YAML_SETUP: Final = f"{DOMAIN}_yaml_setup"
+DOMAIN_EXECUTOR: Final = f"{DOMAIN}_executor"
+DOMAIN_PIPELINE: Final = f"{DOMAIN}_pipeline"
 
 STARTUP_MESSAGE: Final = f"""
 -------------------------------------------------------------------
@@ -48,14 +52,96 @@ PLATFORMS: Final = [CAMERA, BINARY_SENSOR, SENSOR]
 CONF_EVENTS: Final = "events"
 CONF_RTSP_PORT: Final = "rtsp_port"
 CONF_STREAM: Final = "stream"
+CONF_RTSP_RELAY: Final = "rtsp_relay"
 CONF_FFMPEG_ARGUMENTS: Final = "ffmpeg_arguments"
 CONF_CAMERAS: Final = "cameras"
+CONF_SETUP_CONCURRENCY: Final = "setup_concurrency"
+CONF_SETUP_TIMEOUT: Final = "setup_timeout"
+CONF_EXECUTOR_WORKERS: Final = "executor_workers"
+CONF_MJPEG_MODE: Final = "mjpeg_mode"
+CONF_SNAPSHOT_SOURCE: Final = "snapshot_source"
+CONF_FRAME_BUFFER_DURATION: Final = "frame_buffer_duration"
+CONF_FRAME_BUFFER_MAX_FRAMES: Final = "frame_buffer_max_frames"
+CONF_FRAME_BUFFER_MAX_SIZE: Final = "frame_buffer_max_size"
+CONF_HISTORY_MAX_AGE: Final = "history_max_age"
+CONF_HISTORY_MAX_COUNT: Final = "history_max_count"
+CONF_HISTORY_MAX_SIZE: Final = "history_max_size"
+CONF_RECORD_CLIPS: Final = "record_clips"
+CONF_CLIP_PRE_ROLL: Final = "clip_pre_roll"
+CONF_CLIP_POST_ROLL: Final = "clip_post_roll"
+CONF_MOTION_MIN_ON_TIME: Final = "motion_min_on_time"
+CONF_MOTION_OFF_DELAY: Final = "motion_off_delay"
+CONF_SNAPSHOT_FRESH_TTL: Final = "snapshot_fresh_ttl"
+CONF_SNAPSHOT_MAX_STALE: Final = "snapshot_max_stale"
+CONF_SNAPSHOT_REFRESH_CONCURRENCY: Final = "snapshot_refresh_concurrency"
+CONF_SNAPSHOT_RATE: Final = "snapshot_rate"
+CONF_TOTAL_SNAPSHOT_RATE: Final = "total_snapshot_rate"
+CONF_SNAPSHOT_DEDUP: Final = "snapshot_dedup"
+CONF_MOSAIC: Final = "mosaic"
+CONF_MOSAIC_COLUMNS: Final = "mosaic_columns"
+CONF_MOSAIC_TILE_WIDTH: Final = "mosaic_tile_width"
+CONF_MOSAIC_TILE_HEIGHT: Final = "mosaic_tile_height"
+CONF_MOSAIC_INTERVAL: Final = "mosaic_interval"
+
+ATTR_CLIP: Final = "clip"
 
 UNDO_UPDATE_LISTENER: Final = "undo_update_listener"
+EVENT_PIPELINE: Final = "event_pipeline"
+EVENT_HISTORY: Final = "event_history"
+SETUP_RETRIES: Final = "setup_retries"
+
+SIGNAL_DEVICE_ADDED: Final = f"{DOMAIN}_device_added_{{}}"
+
+MJPEG_MODE_FFMPEG: Final = "ffmpeg"
+MJPEG_MODE_PASSTHROUGH: Final = "passthrough"
+MJPEG_MODES: Final = [MJPEG_MODE_FFMPEG, MJPEG_MODE_PASSTHROUGH]
+
+SNAPSHOT_SOURCE_CGI: Final = "cgi"
+SNAPSHOT_SOURCE_STREAM: Final = "stream"
+SNAPSHOT_SOURCES: Final = [SNAPSHOT_SOURCE_CGI, SNAPSHOT_SOURCE_STREAM]
+
+SNAPSHOT_DEDUP_NONE: Final = "none"
+SNAPSHOT_DEDUP_EXACT: Final = "exact"
+SNAPSHOT_DEDUP_SIMILAR: Final = "similar"
+SNAPSHOT_DEDUPS: Final = [
+    SNAPSHOT_DEDUP_NONE,
+    SNAPSHOT_DEDUP_EXACT,
+    SNAPSHOT_DEDUP_SIMILAR,
+]
 
 # Defaults
 DEFAULT_PORT: Final = 80
 DEFAULT_STREAM: Final = 0
+DEFAULT_MJPEG_MODE: Final = MJPEG_MODE_FFMPEG
+DEFAULT_RTSP_RELAY: Final = False
+DEFAULT_SNAPSHOT_SOURCE: Final = SNAPSHOT_SOURCE_CGI
+DEFAULT_FRAME_BUFFER_DURATION: Final = 0  # seconds
+DEFAULT_FRAME_BUFFER_MAX_FRAMES: Final = 25
+DEFAULT_FRAME_BUFFER_MAX_SIZE: Final = 8  # MiB
+DEFAULT_HISTORY_MAX_AGE: Final = 30  # days
+DEFAULT_HISTORY_MAX_COUNT: Final = 1000
+DEFAULT_HISTORY_MAX_SIZE: Final = 500  # MiB
+DEFAULT_RECORD_CLIPS: Final = False
+DEFAULT_CLIP_PRE_ROLL: Final = 5  # seconds
+DEFAULT_CLIP_POST_ROLL: Final = 10  # seconds
+DEFAULT_MOTION_MIN_ON_TIME: Final = 0  # seconds
+DEFAULT_MOTION_OFF_DELAY: Final = 0  # seconds
+DEFAULT_SNAPSHOT_FRESH_TTL: Final = 1.0  # seconds
+DEFAULT_SNAPSHOT_MAX_STALE: Final = 0.0  # seconds
+DEFAULT_SNAPSHOT_REFRESH_CONCURRENCY: Final = 2
+DEFAULT_SNAPSHOT_RATE: Final = 0  # per minute
+DEFAULT_TOTAL_SNAPSHOT_RATE: Final = 0  # per minute
+DEFAULT_SNAPSHOT_DEDUP: Final = SNAPSHOT_DEDUP_EXACT
+DEFAULT_SETUP_CONCURRENCY: Final = 4
+DEFAULT_SETUP_TIMEOUT: Final = 30  # seconds
+DEFAULT_EXECUTOR_WORKERS: Final = 4
+DEFAULT_PIPELINE_WORKERS: Final = 2
+DEFAULT_PIPELINE_QUEUE_SIZE: Final = 16
+DEFAULT_MOSAIC: Final = False
+DEFAULT_MOSAIC_COLUMNS: Final = 0  # auto
+DEFAULT_MOSAIC_TILE_WIDTH: Final = 320
+DEFAULT_MOSAIC_TILE_HEIGHT: Final = 180
+DEFAULT_MOSAIC_INTERVAL: Final = 2.0  # seconds
 
 
 # Events
@@ -94,6 +180,7 @@ CAMERA_LAST_DING: Final = "last_ding"
 CAMERA_NAME_LIVE: Final = "{} Live"
 CAMERA_NAME_LAST_MOTION: Final = "{} Last Motion"
 CAMERA_NAME_LAST_DING: Final = "{} Last Ding"
+CAMERA_NAME_MOSAIC: Final = "Beward Mosaic"
 
 SENSOR_LAST_ACTIVITY: Final = "last_activity"
 SENSOR_LAST_MOTION: Final = "last_motion"
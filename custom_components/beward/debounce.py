@@ -0,0 +1,104 @@
+"""
+Debouncing of Beward device events.
+
+For more details about this component, please refer to
+https://github.com/Limych/ha-beward
+"""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+
+class BewardEventDebouncer:
+    """
+    Hysteresis of event state.
+
+    Event is reported off only when it was on for at least min_on_time and then
+    stays off for off_delay. Flaps within this time are merged into one event,
+    so neither the off nor the following on are reported. Suppressed state
+    changes are counted.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        min_on_time: float,
+        off_delay: float,
+        action: Callable[[bool, datetime], None],
+    ) -> None:
+        """Initialize the debouncer."""
+        self.hass = hass
+        self.min_on_time = min_on_time
+        self.off_delay = off_delay
+        self._action = action
+
+        self.state = False
+        self.suppressed = 0
+        self._on_since = 0.0
+        self._off_timestamp: datetime | None = None
+        self._cancel_off: Callable[[], None] | None = None
+
+    @callback
+    def async_update(self, state: bool, timestamp: datetime) -> None:  # noqa: FBT001
+        """Handle raw event state."""
+        if state:
+            if self._cancel_off is not None:
+                # Flap: pending off and this on are merged into current event
+                self._cancel_off()
+                self._cancel_off = None
+                self.suppressed += 2
+            elif self.state:
+                self.suppressed += 1
+            else:
+                self.state = True
+                self._on_since = self.hass.loop.time()
+                self._action(True, timestamp)  # noqa: FBT003
+            return
+
+        if not self.state or self._cancel_off is not None:
+            self.suppressed += 1
+            return
+
+        delay = max(
+            self.off_delay,
+            self._on_since + self.min_on_time - self.hass.loop.time(),
+        )
+        if delay <= 0:
+            self._report_off(timestamp)
+            return
+
+        self._off_timestamp = timestamp
+        self._cancel_off = async_call_later(self.hass, delay, self._async_delayed_off)
+
+    @callback
+    def _async_delayed_off(self, now: datetime) -> None:  # noqa: ARG002
+        """Report off state after delay."""
+        self._cancel_off = None
+        self._report_off(self._off_timestamp)
+
+    @callback
+    def _report_off(self, timestamp: datetime) -> None:
+        """Report off state."""
+        self.state = False
+        self._action(False, timestamp)  # noqa: FBT003
+
+    @callback
+    def async_flush(self) -> None:
+        """Report pending off state right away."""
+        if self._cancel_off is not None:
+            self._cancel_off()
+            self._cancel_off = None
+            self._report_off(self._off_timestamp)
@@ -0,0 +1,40 @@
+"""Diagnostics support for Beward devices."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, EVENT_PIPELINE
+from .executor import async_get_executor
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    cfg = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "executor": async_get_executor(hass).metrics,
+        "pipeline": {
+            "dropped": cfg[EVENT_PIPELINE].dropped,
+            "coalesced": cfg[EVENT_PIPELINE].coalesced,
+            "skipped": cfg[EVENT_PIPELINE].skipped,
+        },
+        "devices": [
+            {
+                "available": controller.available,
+                "suppressed_transitions": controller.suppressed_transitions,
+            }
+            for key, controller in cfg.items()
+            if isinstance(key, int)
+        ],
+    }
@@ -15,22 +15,75 @@ from abc import ABC
 from typing import TYPE_CHECKING, Any, Final
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping
+    from collections.abc import Awaitable, Callable, Mapping
 
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
     from homeassistant.helpers.device_registry import DeviceInfo
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+    from homeassistant.helpers.typing import ConfigType
 
-    from . import BewardController
+    from . import BewardController, BewardEventUpdate
 
-from homeassistant.const import EVENT_HOMEASSISTANT_START
-from homeassistant.core import Event, callback
+from homeassistant.config_entries import SOURCE_IMPORT
+from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import Entity
 
+from .const import DOMAIN, DOMAIN_YAML, SIGNAL_DEVICE_ADDED, BewardDeviceEvent
+
 _LOGGER: Final = logging.getLogger(__name__)
 
 
+def entry_device_configs(hass: HomeAssistant, entry: ConfigEntry) -> list[ConfigType]:
+    """Return configs of all devices of config entry."""
+    if entry.source == SOURCE_IMPORT:
+        return hass.data[DOMAIN_YAML]
+
+    config = entry.data.copy()
+    config.update(entry.options)
+    return [config]
+
+
+async def async_setup_device_entities(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    setup_entities: Callable[[BewardController, ConfigType], Awaitable[list[Entity]]],
+) -> None:
+    """Set up entities of connected devices and of devices connected later."""
+    configs = entry_device_configs(hass, entry)
+    added = set()
+
+    async def async_add_device(index: int) -> None:
+        if index in added:
+            return
+        added.add(index)
+
+        controller: BewardController = hass.data[DOMAIN][entry.entry_id][index]
+        if entities := await setup_entities(controller, configs[index]):
+            async_add_entities(entities, update_before_add=True)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICE_ADDED.format(entry.entry_id), async_add_device
+        )
+    )
+
+    for index in range(len(configs)):
+        if index in hass.data[DOMAIN][entry.entry_id]:
+            await async_add_device(index)
+
+
 class BewardEntity(Entity, ABC):
-    """Beward entity."""
+    """
+    Beward entity.
+
+    Entity is subscribed to state changes of device events listed in _events
+    only. Availability changes are delivered to every entity.
+    """
+
+    _events: tuple[str, ...] = ()
 
     def __init__(self, controller: BewardController) -> None:
         """Initialize a Beward entity."""
@@ -40,7 +93,6 @@ class BewardEntity(Entity, ABC):
         self._controller = controller
 
         self._state = None
-        self._unsub_dispatcher = None
 
         self._attr_should_poll = False
 
@@ -64,21 +116,19 @@ class BewardEntity(Entity, ABC):
         """Get the latest data and updates the state if necessary."""
         # pylint: disable=unnecessary-pass
 
+    @callback
+    def _async_event_callback(self, update: BewardEventUpdate) -> None:
+        """Handle state change of device event."""
+        if update.event == BewardDeviceEvent.ONLINE:
+            self.async_write_ha_state()
+
     async def async_added_to_hass(self) -> None:
         """Register callbacks."""
-
-        @callback
-        def sensor_startup(event: Event) -> None:  # noqa: ARG001
-            """Update sensor state on startup."""
-            self._unsub_dispatcher = async_dispatcher_connect(
-                self.hass,
-                self._controller.service_signal("update"),
-                self._update_callback,
+        for event in {BewardDeviceEvent.ONLINE, *self._events}:
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass,
+                    self._controller.event_signal(event),
+                    self._async_event_callback,
+                )
             )
-
-        self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_START, sensor_startup)
-
-    async def async_will_remove_from_hass(self) -> None:
-        """Disconnect from update signal."""
-        if self._unsub_dispatcher is not None:
-            self._unsub_dispatcher()
@@ -0,0 +1,152 @@
+"""
+Thread pool for blocking calls of Beward library.
+
+For more details about this component, please refer to
+https://github.com/Limych/ha-beward
+"""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Final, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from homeassistant.core import Event, HomeAssistant
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import callback
+
+from .const import DEFAULT_EXECUTOR_WORKERS, DOMAIN, DOMAIN_EXECUTOR
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+_DEFAULT_TIMEOUT: Final = 30  # seconds
+
+_T = TypeVar("_T")
+
+
+@callback
+def async_get_executor(
+    hass: HomeAssistant, workers: int | None = None
+) -> BewardExecutor:
+    """Return executor shared by all Beward devices, creating it if needed."""
+    executor = hass.data.get(DOMAIN_EXECUTOR)
+    if executor is None:
+        executor = BewardExecutor(workers or DEFAULT_EXECUTOR_WORKERS)
+        hass.data[DOMAIN_EXECUTOR] = executor
+
+        @callback
+        def _async_shutdown(event: Event) -> None:  # noqa: ARG001
+            hass.data.pop(DOMAIN_EXECUTOR, None)
+            executor.shutdown()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_shutdown)
+
+    elif workers is not None and workers != executor.workers:
+        # Pool can't be resized while calls are waiting in its queue
+        _LOGGER.warning(
+            "Executor of %s already has %d workers, %d workers are used after restart",
+            DOMAIN,
+            executor.workers,
+            workers,
+        )
+
+    return executor
+
+
+class BewardExecutor:
+    """
+    Bounded thread pool for blocking device I/O.
+
+    Slow devices can occupy only threads of this pool, so they don't delay
+    jobs of other integrations in the default executor of Home Assistant.
+    Calls which time out or are cancelled before start are never run; calls
+    already running can't be interrupted and their results are dropped.
+    """
+
+    def __init__(self, workers: int) -> None:
+        """Initialize the executor."""
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix=DOMAIN)
+        self._lock = threading.Lock()
+
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    @property
+    def metrics(self) -> dict[str, int]:
+        """Return queue depth and call counters."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self.queued,
+                "running": self.running,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+            }
+
+    async def async_run(
+        self,
+        func: Callable[..., _T],
+        *args: Any,
+        call_timeout: float | None = _DEFAULT_TIMEOUT,
+    ) -> _T:
+        """Run blocking function in the pool and wait for its result."""
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            if self.queued > self.workers:
+                _LOGGER.debug("%d blocking calls are waiting for a thread", self.queued)
+
+        future = self._pool.submit(self._call, func, args)
+        try:
+            async with asyncio.timeout(call_timeout):
+                return await asyncio.wrap_future(future)
+
+        except TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            raise
+
+        finally:
+            # Cancelled before start, so it was not run at all
+            if future.cancelled():
+                with self._lock:
+                    self.queued -= 1
+
+    def _call(self, func: Callable[..., _T], args: tuple) -> _T:
+        """Run function in worker thread and count it."""
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            result = func(*args)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        else:
+            with self._lock:
+                self.completed += 1
+            return result
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def shutdown(self, *, wait: bool = False) -> None:
+        """Drop queued calls and stop worker threads, optionally waiting for them."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,392 @@
+"""
+Event history store for Beward devices.
+
+For more details about this component, please refer to
+https://github.com/Limych/ha-beward
+"""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant
+
+import homeassistant.util.dt as dt_util
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import slugify
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+_DB_NAME: Final = "history.db"
+_EVICTION_INTERVAL: Final = timedelta(minutes=10)
+
+_SCHEMA: Final = (
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY,
+        device TEXT NOT NULL,
+        event TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        path TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        sha256 TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS events_device_event_timestamp
+        ON events (device, event, timestamp)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS events_device_timestamp
+        ON events (device, timestamp)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS events_path
+        ON events (path)
+    """,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class BewardEventRecord:
+    """Indexed event image."""
+
+    device: str
+    event: str
+    timestamp: datetime
+    path: str
+    size: int
+    sha256: str
+
+
+@dataclass(slots=True)
+class BewardRetention:
+    """Retention limits of device history. Zero means no limit."""
+
+    max_age: timedelta
+    max_count: int
+    max_size: int
+
+
+class BewardEventHistory:
+    """
+    On-disk history of event images.
+
+    Images are stored as separate files under the media directory and are
+    indexed in SQLite database by device, event and timestamp. Records of
+    unchanged images may share one file, which is deleted with the last of
+    them. The latest record of every device event is also kept in memory.
+    Old records are evicted in background by age, count and disk usage limits
+    of each device.
+
+    All methods except async_* ones do blocking I/O and must be run in executor.
+    """
+
+    def __init__(self, hass: HomeAssistant, root_dir: str) -> None:
+        """Initialize the history store."""
+        self.hass = hass
+        self.root_dir = Path(root_dir)
+
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._latest: dict[tuple[str, str], BewardEventRecord | None] = {}
+        self._retention: dict[str, BewardRetention] = {}
+        self._unsub_eviction = None
+
+    async def async_start(self) -> None:
+        """Open the database and start background eviction."""
+        await self.hass.async_add_executor_job(self._open)
+
+        self._unsub_eviction = async_track_time_interval(
+            self.hass, self._async_evict, _EVICTION_INTERVAL
+        )
+        self._async_evict()
+
+    async def async_stop(self) -> None:
+        """Stop background eviction and close the database."""
+        if self._unsub_eviction is not None:
+            self._unsub_eviction()
+            self._unsub_eviction = None
+
+        await self.hass.async_add_executor_job(self._close)
+
+    @callback
+    def set_retention(
+        self, device: str, max_age: float, max_count: int, max_size: float
+    ) -> None:
+        """Set retention limits of device history (days, events and MiB)."""
+        self._retention[device] = BewardRetention(
+            timedelta(days=max_age), max_count, int(max_size * 1024 * 1024)
+        )
+
+    def _open(self) -> None:
+        """Open the database."""
+        self.root_dir.mkdir(parents=True, mode=0o755, exist_ok=True)
+
+        with self._lock:
+            self._db = sqlite3.connect(
+                self.root_dir / _DB_NAME, check_same_thread=False
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            with self._db:
+                for statement in _SCHEMA:
+                    self._db.execute(statement)
+
+    def _close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the database connection or raise error if it's closed."""
+        if self._db is None:
+            msg = "Event history is closed"
+            raise sqlite3.ProgrammingError(msg)
+        return self._db
+
+    def _record(self, row: tuple) -> BewardEventRecord:
+        """Convert database row to record."""
+        device, event, timestamp, path, size, sha256 = row
+        return BewardEventRecord(
+            device,
+            event,
+            dt_util.utc_from_timestamp(timestamp),
+            str(self.root_dir / path),
+            size,
+            sha256,
+        )
+
+    def add(
+        self, device: str, event: str, timestamp: datetime, image: bytes
+    ) -> BewardEventRecord:
+        """Save event image and add it to the index."""
+        self._connection()  # Don't leave orphaned image behind
+        timestamp = dt_util.as_utc(timestamp)
+        rel_path = Path(
+            slugify(device),
+            event,
+            timestamp.strftime("%Y%m%d-%H%M%S-%f") + ".jpg",
+        )
+        image_path = self.root_dir / rel_path
+        image_dir = image_path.parent
+        image_dir.mkdir(parents=True, mode=0o755, exist_ok=True)
+
+        _LOGGER.debug("Save camera photo to %s", image_path)
+
+        # Modern versions of Python tempfile create this file with mode 0o600
+        with tempfile.NamedTemporaryFile(
+            mode="wb", dir=image_dir, delete=False
+        ) as fdesc:
+            fdesc.write(image)
+        tmp_path = Path(fdesc.name)
+        try:
+            tmp_path.chmod(0o644)
+            tmp_path.replace(image_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        record = BewardEventRecord(
+            device,
+            event,
+            timestamp,
+            str(image_path),
+            len(image),
+            hashlib.sha256(image).hexdigest(),
+        )
+        self._insert(record, rel_path)
+        return record
+
+    def add_reference(
+        self, device: str, event: str, timestamp: datetime
+    ) -> BewardEventRecord | None:
+        """
+        Add event to the index reusing image of the latest record.
+
+        Reference takes no disk space, so its size is zero. Returns None if
+        there is no image to reuse.
+        """
+        latest = self.latest(device, event)
+        if latest is None or not Path(latest.path).is_file():
+            return None
+
+        record = BewardEventRecord(
+            device,
+            event,
+            dt_util.as_utc(timestamp),
+            latest.path,
+            0,
+            latest.sha256,
+        )
+        self._insert(record, Path(latest.path).relative_to(self.root_dir))
+        return record
+
+    def _insert(self, record: BewardEventRecord, rel_path: Path) -> None:
+        """Add record to the index."""
+        with self._lock, self._connection() as db:
+            db.execute(
+                "INSERT INTO events (device, event, timestamp, path, size, sha256)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    record.device,
+                    record.event,
+                    record.timestamp.timestamp(),
+                    str(rel_path),
+                    record.size,
+                    record.sha256,
+                ),
+            )
+
+            key = (record.device, record.event)
+            latest = self._latest.get(key)
+            if latest is None or latest.timestamp <= record.timestamp:
+                self._latest[key] = record
+
+    def latest(self, device: str, event: str) -> BewardEventRecord | None:
+        """Return the most recent record of device event."""
+        key = (device, event)
+        if key not in self._latest:
+            with self._lock:
+                self._load_latest(key)
+
+        return self._latest[key]
+
+    def _load_latest(self, key: tuple[str, str]) -> None:
+        """Load the most recent record of device event from the index."""
+        db = self._connection()
+        row = db.execute(
+            "SELECT device, event, timestamp, path, size, sha256 FROM events"
+            " WHERE device = ? AND event = ? ORDER BY timestamp DESC LIMIT 1",
+            key,
+        ).fetchone()
+        self._latest[key] = self._record(row) if row else None
+
+    @callback
+    def cached_latest(self, device: str, event: str) -> BewardEventRecord | None:
+        """Return the most recent record of device event if it's loaded."""
+        return self._latest.get((device, event))
+
+    def query(
+        self,
+        device: str,
+        event: str,
+        start: datetime,
+        end: datetime,
+        limit: int | None = None,
+    ) -> list[BewardEventRecord]:
+        """Return records of device event between start and end timestamps."""
+        with self._lock:
+            db = self._connection()
+            rows = db.execute(
+                "SELECT device, event, timestamp, path, size, sha256 FROM events"
+                " WHERE device = ? AND event = ? AND timestamp BETWEEN ? AND ?"
+                " ORDER BY timestamp DESC LIMIT ?",
+                (
+                    device,
+                    event,
+                    dt_util.as_utc(start).timestamp(),
+                    dt_util.as_utc(end).timestamp(),
+                    -1 if limit is None else limit,
+                ),
+            ).fetchall()
+
+        return [self._record(row) for row in rows]
+
+    @callback
+    def _async_evict(self, now: datetime | None = None) -> None:  # noqa: ARG002
+        """Schedule eviction of outdated records."""
+        self.hass.async_add_executor_job(self.evict)
+
+    def evict(self) -> None:
+        """Delete records and images exceeding retention limits."""
+        # Retention of device set up later may be added while evicting
+        for device, retention in list(self._retention.items()):
+            try:
+                self._evict_device(device, retention)
+            except (OSError, sqlite3.Error):
+                _LOGGER.exception("Event history eviction of %s failed", device)
+
+    def _evict_device(self, device: str, retention: BewardRetention) -> None:
+        """Delete records of device exceeding retention limits."""
+        queries = []
+        if retention.max_age:
+            queries.append(
+                (
+                    "SELECT id, path FROM events WHERE device = ? AND timestamp < ?",
+                    (device, (dt_util.utcnow() - retention.max_age).timestamp()),
+                )
+            )
+        if retention.max_count:
+            queries.append(
+                (
+                    (
+                        "SELECT id, path FROM events WHERE device = ?"
+                        " ORDER BY timestamp DESC LIMIT -1 OFFSET ?"
+                    ),
+                    (device, retention.max_count),
+                )
+            )
+        if retention.max_size:
+            queries.append(
+                (
+                    (
+                        "SELECT id, path FROM (SELECT id, path, SUM(size)"
+                        " OVER (ORDER BY timestamp DESC) AS total"
+                        " FROM events WHERE device = ?) WHERE total > ?"
+                    ),
+                    (device, retention.max_size),
+                )
+            )
+        if not queries:
+            return
+
+        with self._lock:
+            if self._db is None:
+                return
+
+            rows = {}
+            for query, params in queries:
+                rows.update(self._db.execute(query, params).fetchall())
+            if not rows:
+                return
+
+            with self._db:
+                self._db.executemany(
+                    "DELETE FROM events WHERE id = ?", [(x,) for x in rows]
+                )
+
+            # Image can still be referenced by newer records
+            paths = [
+                path
+                for path in set(rows.values())
+                if self._db.execute(
+                    "SELECT 1 FROM events WHERE path = ? LIMIT 1", (path,)
+                ).fetchone()
+                is None
+            ]
+
+            for key in [x for x in self._latest if x[0] == device]:
+                self._load_latest(key)
+
+        for path in paths:
+            (self.root_dir / path).unlink(missing_ok=True)
+
+        _LOGGER.debug("Evicted %d event images of %s", len(rows), device)
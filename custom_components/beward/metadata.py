@@ -0,0 +1,168 @@
+"""
+Device metadata cache for Beward devices.
+
+For more details about this component, please refer to
+https://github.com/Limych/ha-beward
+"""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Final
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
+
+    from .client import BewardClient
+
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+import beward
+from beward import BewardCamera, BewardGeneric
+from beward.const import BEWARD_CAMERA, BEWARD_DOORBELL
+
+from .const import CONF_RTSP_PORT, CONF_STREAM, DEFAULT_PORT, DEFAULT_STREAM, DOMAIN
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+_STORAGE_VERSION: Final = 1
+_SAVE_DELAY: Final = 10  # seconds
+
+_DEVICE_CLASSES: Final = {
+    BEWARD_CAMERA: beward.BewardCamera,
+    BEWARD_DOORBELL: beward.BewardDoorbell,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class BewardDeviceMetadata:
+    """
+    Device properties which are queried from device on setup.
+
+    Only RTSP port is kept to resolve stream URIs as they contain credentials.
+    """
+
+    device_type: str | None
+    system_info: dict[str, str] = field(default_factory=dict)
+    rtsp_port: int | None = None
+
+    @classmethod
+    async def async_from_client(
+        cls, client: BewardClient, rtsp_port: int | None = None
+    ) -> BewardDeviceMetadata:
+        """Query metadata of device. Raise ValueError for unsupported models."""
+        system_info = await client.async_system_info()
+        model = system_info.get("DeviceModel")
+        device_type = BewardGeneric.get_device_type(model)
+        if device_type is None:
+            msg = f'Unknown device "{model}"'
+            raise ValueError(msg)
+
+        if not rtsp_port and issubclass(
+            _DEVICE_CLASSES.get(device_type, BewardGeneric), BewardCamera
+        ):
+            rtsp_port = await client.async_rtsp_port()
+
+        return cls(device_type, system_info, rtsp_port)
+
+    def create_device(self, device_config: ConfigType) -> BewardGeneric:
+        """Create device object without querying the device."""
+        device_class = _DEVICE_CLASSES.get(self.device_type, BewardGeneric)
+        kwargs: dict[str, Any] = {"port": device_config.get(CONF_PORT, DEFAULT_PORT)}
+        if issubclass(device_class, BewardCamera):
+            kwargs["rtsp_port"] = device_config.get(CONF_RTSP_PORT) or self.rtsp_port
+            kwargs["stream"] = device_config.get(CONF_STREAM, DEFAULT_STREAM)
+
+        device = device_class(
+            device_config.get(CONF_HOST),
+            device_config.get(CONF_USERNAME),
+            device_config.get(CONF_PASSWORD),
+            **kwargs,
+        )
+        # Library caches system info after the first query
+        device._sysinfo = dict(self.system_info)  # noqa: SLF001
+        if isinstance(device, BewardCamera):
+            # No requests are made as RTSP port is already known
+            device.obtain_uris()
+
+        return device
+
+
+def _fingerprint(device_config: ConfigType) -> str:
+    """Return the key which changes when device connection settings change."""
+    username = device_config.get(CONF_USERNAME)
+    host = device_config.get(CONF_HOST)
+    port = device_config.get(CONF_PORT, DEFAULT_PORT)
+    return f"{username}@{host}:{port}/{device_config.get(CONF_RTSP_PORT)}"
+
+
+class BewardMetadataCache:
+    """Persistent cache of metadata of config entry devices."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the cache."""
+        self._store: Store = Store(
+            hass, _STORAGE_VERSION, f"{DOMAIN}.{entry_id}.metadata"
+        )
+        self._data: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Load cached metadata."""
+        self._data = await self._store.async_load() or {}
+
+    async def async_save(self) -> None:
+        """Save cached metadata now instead of waiting for the delayed save."""
+        await self._store.async_save(self._data)
+
+    async def async_remove(self) -> None:
+        """Remove cached metadata."""
+        self._data = {}
+        await self._store.async_remove()
+
+    @callback
+    def device_ids(self) -> list[str]:
+        """Return IDs reported by cached devices."""
+        return [
+            device_id
+            for data in self._data.values()
+            if (
+                device_id := data.get("metadata", {})
+                .get("system_info", {})
+                .get("DeviceID")
+            )
+        ]
+
+    @callback
+    def get(self, index: int, device_config: ConfigType) -> BewardDeviceMetadata | None:
+        """Return cached metadata of device if connection settings are unchanged."""
+        data = self._data.get(str(index))
+        if data is None or data.get("fingerprint") != _fingerprint(device_config):
+            return None
+
+        try:
+            return BewardDeviceMetadata(**data["metadata"])
+        except (KeyError, TypeError):
+            _LOGGER.debug("Invalid cached metadata of device #%d", index + 1)
+            return None
+
+    @callback
+    def async_set(
+        self, index: int, device_config: ConfigType, metadata: BewardDeviceMetadata
+    ) -> bool:
+        """Update cached metadata of device. Return True if it was changed."""
+        if self.get(index, device_config) == metadata:
+            return False
+
+        self._data[str(index)] = {
+            "fingerprint": _fingerprint(device_config),
+            "metadata": asdict(metadata),
+        }
+        self._store.async_delay_save(lambda: self._data, _SAVE_DELAY)
+        return True
@@ -0,0 +1,168 @@
+"""
+Shared MJPEG streaming for Beward cameras.
+
+For more details about this component, please refer to
+https://github.com/Limych/ha-beward
+"""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from homeassistant.components.ffmpeg import FFmpegManager
+    from homeassistant.core import HomeAssistant
+
+import aiohttp
+from aiohttp import web
+from haffmpeg.camera import CameraMjpeg
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+_READ_CHUNK_SIZE: Final = 64 * 1024
+_CLIENT_BUFFER: Final = 2  # frames
+_GRACE_PERIOD: Final = 10  # seconds
+
+
+class BewardMjpegBroadcaster:
+    """
+    Fan out single ffmpeg MJPEG stream to any number of viewers.
+
+    Each viewer has its own small frame buffer. When viewer can't keep up,
+    its oldest frames are dropped instead of slowing down other viewers.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        ffmpeg_manager: FFmpegManager,
+        input_source: str,
+        extra_cmd: str | None = None,
+    ) -> None:
+        """Initialize the broadcaster."""
+        self.hass = hass
+        self._ffmpeg_manager = ffmpeg_manager
+        self._input_source = input_source
+        self._extra_cmd = extra_cmd
+
+        content_type = ffmpeg_manager.ffmpeg_stream_content_type
+        self._content_type = content_type
+        self._boundary = b"--" + content_type.split("boundary=")[-1].encode()
+
+        self._clients: set[asyncio.Queue[bytes | None]] = set()
+        self._task: asyncio.Task | None = None
+        self._unsub_stop = None
+
+    @property
+    def viewers(self) -> int:
+        """Return number of connected viewers."""
+        return len(self._clients)
+
+    async def async_handle(self, request: web.Request) -> web.StreamResponse:
+        """Stream frames to new viewer until it disconnects."""
+        queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=_CLIENT_BUFFER)
+        self._clients.add(queue)
+        self._async_cancel_stop()
+
+        if self._task is None or self._task.done():
+            self._task = self.hass.async_create_background_task(
+                self._async_run(), f"{DOMAIN} mjpeg {self._input_source}"
+            )
+
+        response = web.StreamResponse()
+        response.content_type = self._content_type
+
+        try:
+            await response.prepare(request)
+
+            while (frame := await queue.get()) is not None:
+                await response.write(frame)
+
+        except (aiohttp.ClientError, ConnectionResetError):
+            # Something went wrong or viewer disconnected
+            pass
+
+        finally:
+            self._clients.discard(queue)
+            if not self._clients:
+                self._async_schedule_stop()
+
+        return response
+
+    async def async_stop(self) -> None:
+        """Stop ffmpeg and disconnect all viewers."""
+        self._async_cancel_stop()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @callback
+    def _async_schedule_stop(self) -> None:
+        """Stop ffmpeg after grace period unless new viewer comes in."""
+        self._async_cancel_stop()
+
+        @callback
+        def _stop(now: datetime) -> None:  # noqa: ARG001
+            self._unsub_stop = None
+            if not self._clients and self._task is not None:
+                _LOGGER.debug("No more MJPEG viewers, stopping ffmpeg")
+                self._task.cancel()
+
+        self._unsub_stop = async_call_later(self.hass, _GRACE_PERIOD, _stop)
+
+    @callback
+    def _async_cancel_stop(self) -> None:
+        """Cancel scheduled stop."""
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+
+    @callback
+    def _async_publish(self, frame: bytes | None) -> None:
+        """Send frame to all viewers dropping the oldest frames of slow ones."""
+        for queue in self._clients:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(frame)
+
+    async def _async_run(self) -> None:
+        """Read ffmpeg output and split it into frames."""
+        # pylint: disable=no-value-for-parameter
+        stream = CameraMjpeg(self._ffmpeg_manager.binary)
+        await stream.open_camera(self._input_source, extra_cmd=self._extra_cmd)
+        _LOGGER.debug("Started shared ffmpeg MJPEG stream")
+
+        boundary = self._boundary
+        buffer = bytearray()
+        try:
+            stream_reader = await stream.get_reader()
+            while chunk := await stream_reader.read(_READ_CHUNK_SIZE):
+                buffer += chunk
+
+                start = buffer.find(boundary)
+                if start < 0:
+                    # Keep only tail which may contain the beginning of boundary
+                    del buffer[: -len(boundary)]
+                    continue
+                del buffer[:start]
+
+                while (end := buffer.find(boundary, len(boundary))) > 0:
+                    self._async_publish(bytes(buffer[:end]))
+                    del buffer[:end]
+
+        finally:
+            await stream.close()
+            _LOGGER.debug("Stopped shared ffmpeg MJPEG stream")
+            self._async_publish(None)
@@ -0,0 +1,97 @@
+"""
+Snapshot mosaic of many Beward devices.
+
+For more details about this component, please refer to
+https://github.com/Limych/ha-beward
+"""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import io
+import logging
+import math
+import threading
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+import numpy as np
+from homeassistant.components.camera.img_util import JPEG_QUALITY, TurboJPEGSingleton
+from PIL import Image
+
+from .thumbnail import decode_jpeg
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+
+class BewardMosaic:
+    """
+    Grid of camera images encoded as one JPEG.
+
+    Images are decoded at reduced size in DCT domain where possible. Only
+    tiles whose source image changed are decoded again, the rest of the
+    canvas is reused. Methods do blocking work and must be run in executor.
+    """
+
+    def __init__(
+        self, count: int, columns: int, tile_width: int, tile_height: int
+    ) -> None:
+        """Initialize the mosaic."""
+        self.columns = columns or max(math.ceil(math.sqrt(count)), 1)
+        self.rows = max(math.ceil(count / self.columns), 1)
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+
+        self._canvas = np.zeros(
+            (self.rows * tile_height, self.columns * tile_width, 3), dtype=np.uint8
+        )
+        self._sources: list[bytes | None] = [None] * count
+        self._jpeg: bytes | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        """Return number of tiles."""
+        return len(self._sources)
+
+    def update(self, images: Sequence[bytes | None]) -> bytes:
+        """Redraw tiles of changed images and return mosaic as JPEG."""
+        with self._lock:
+            changed = False
+            for index, image in enumerate(images[: len(self._sources)]):
+                if image is None or image is self._sources[index]:
+                    continue
+
+                # Broken image is not decoded again, tile keeps previous one
+                self._sources[index] = image
+                try:
+                    tile = decode_jpeg(image, self.tile_width, self.tile_height)
+                except (OSError, ValueError) as exc:
+                    _LOGGER.debug("Can't decode image of tile %d: %s", index, exc)
+                    continue
+
+                row, col = divmod(index, self.columns)
+                self._canvas[
+                    row * self.tile_height : (row + 1) * self.tile_height,
+                    col * self.tile_width : (col + 1) * self.tile_width,
+                ] = tile
+                changed = True
+
+            if changed or self._jpeg is None:
+                self._jpeg = self._encode()
+            return self._jpeg
+
+    def _encode(self) -> bytes:
+        """Encode canvas to JPEG."""
+        if turbo_jpeg := TurboJPEGSingleton.instance():
+            return turbo_jpeg.encode(self._canvas, quality=JPEG_QUALITY)
+
+        with io.BytesIO() as buffer:
+            Image.fromarray(self._canvas).save(
+                buffer, format="JPEG", quality=JPEG_QUALITY
+            )
+            return buffer.getvalue()
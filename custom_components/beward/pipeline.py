@@ -0,0 +1,257 @@
+"""
+Event snapshot pipeline for Beward devices.
+
+For more details about this component, please refer to
+https://github.com/Limych/ha-beward
+"""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant
+
+    from . import BewardController
+
+import homeassistant.util.dt as dt_util
+from homeassistant.core import callback
+
+from .const import (
+    DEFAULT_PIPELINE_QUEUE_SIZE,
+    DEFAULT_PIPELINE_WORKERS,
+    DOMAIN,
+    DOMAIN_PIPELINE,
+    BewardDeviceEvent,
+)
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+_BURST: Final = 3  # snapshots
+
+
+@callback
+def async_get_pipeline(hass: HomeAssistant, rate: float = 0) -> BewardEventPipeline:
+    """
+    Return running pipeline shared by all config entries, creating it if needed.
+
+    Rate is applied on creation only, as all entries share the same limit.
+    """
+    pipeline = hass.data.get(DOMAIN_PIPELINE)
+    if pipeline is None:
+        pipeline = BewardEventPipeline(hass, rate=rate)
+        pipeline.async_start()
+        hass.data[DOMAIN_PIPELINE] = pipeline
+    return pipeline
+
+
+@dataclass(slots=True)
+class BewardSnapshotJob:
+    """Request to capture an event snapshot."""
+
+    controller: BewardController
+    event: str
+    timestamp: datetime
+    received: datetime
+
+
+class BewardTokenBucket:
+    """Token bucket rate limiter."""
+
+    def __init__(self, rate: float, burst: float) -> None:
+        """Initialize the bucket. Rate is in tokens per second."""
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Add tokens accumulated since last update."""
+        elapsed = max(now - self._updated, 0)
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def delay(self, now: float) -> float:
+        """Return time in seconds until a token is available."""
+        self._refill(now)
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        """Consume one token."""
+        self._refill(now)
+        self._tokens -= 1
+
+
+class BewardEventPipeline:
+    """
+    Bounded asynchronous pipeline for event snapshots.
+
+    Only the latest pending snapshot of every device event is kept, older
+    ones are coalesced into it. Snapshots of the same device are processed
+    one at a time, dings before motions. Captures are rate limited by token
+    buckets of every device and of the whole pipeline. When too many
+    snapshots are pending, the oldest one is dropped.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        workers: int = DEFAULT_PIPELINE_WORKERS,
+        queue_size: int = DEFAULT_PIPELINE_QUEUE_SIZE,
+        rate: float = 0,
+        burst: float = _BURST,
+    ) -> None:
+        """Initialize the pipeline. Rate is in snapshots per minute, 0 is unlimited."""
+        self.hass = hass
+        self._workers = max(workers, 1)
+        self._queue_size = queue_size
+        self._pending: dict[tuple[str | None, str], BewardSnapshotJob] = {}
+        self._busy: set[str | None] = set()
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+        self._bucket = BewardTokenBucket(rate / 60, burst) if rate else None
+        self._device_buckets: dict[str | None, BewardTokenBucket | None] = {}
+
+        self.dropped = 0
+        self.coalesced = 0
+
+    @property
+    def skipped(self) -> int:
+        """Return number of snapshots which were not captured."""
+        return self.dropped + self.coalesced
+
+    @callback
+    def async_start(self) -> None:
+        """Start worker tasks."""
+        if self._tasks:
+            return
+
+        for index in range(self._workers):
+            self._tasks.append(
+                self.hass.async_create_background_task(
+                    self._async_worker(), f"{DOMAIN} event pipeline {index}"
+                )
+            )
+
+    async def async_stop(self) -> None:
+        """Stop worker tasks and discard pending jobs."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._pending.clear()
+        self._busy.clear()
+
+    @callback
+    def async_discard(self, controller: BewardController) -> None:
+        """Discard pending jobs of device."""
+        for key in [x for x in self._pending if x[0] == controller.unique_id]:
+            del self._pending[key]
+        self._device_buckets.pop(controller.unique_id, None)
+
+    @callback
+    def async_enqueue(
+        self, controller: BewardController, event: str, timestamp: datetime
+    ) -> None:
+        """Submit snapshot job of event received just now."""
+        key = (controller.unique_id, event)
+        if key in self._pending:
+            self.coalesced += 1
+            _LOGGER.debug(
+                'Pending "%s" snapshot of %s is replaced by newer one',
+                event,
+                controller.name,
+            )
+
+        elif len(self._pending) >= self._queue_size:
+            dropped = self._pending.pop(next(iter(self._pending)))
+            self.dropped += 1
+            _LOGGER.warning(
+                'Event pipeline is overloaded, dropped "%s" snapshot of %s',
+                dropped.event,
+                dropped.controller.name,
+            )
+
+        self._pending[key] = BewardSnapshotJob(
+            controller, event, timestamp, dt_util.utcnow()
+        )
+        self._wakeup.set()
+
+    def _device_bucket(self, controller: BewardController) -> BewardTokenBucket | None:
+        """Return token bucket of device."""
+        if controller.unique_id not in self._device_buckets:
+            rate = controller.snapshot_rate
+            self._device_buckets[controller.unique_id] = (
+                BewardTokenBucket(rate / 60, _BURST) if rate else None
+            )
+        return self._device_buckets[controller.unique_id]
+
+    def _job_delay(self, job: BewardSnapshotJob, now: float) -> float:
+        """Return time in seconds until job can be run."""
+        delay = 0.0
+        for bucket in (self._bucket, self._device_bucket(job.controller)):
+            if bucket is not None:
+                delay = max(delay, bucket.delay(now))
+        return delay
+
+    def _next_job(self) -> tuple[BewardSnapshotJob | None, float | None]:
+        """Take job ready to run or return time until one can be run."""
+        now = time.monotonic()
+        wait = None
+        jobs = sorted(
+            self._pending.items(), key=lambda x: x[1].event != BewardDeviceEvent.DING
+        )
+        for key, job in jobs:
+            if job.controller.unique_id in self._busy:
+                continue
+
+            delay = self._job_delay(job, now)
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+                continue
+
+            for bucket in (self._bucket, self._device_bucket(job.controller)):
+                if bucket is not None:
+                    bucket.take(now)
+            del self._pending[key]
+            self._busy.add(job.controller.unique_id)
+            return job, None
+
+        return None, wait
+
+    async def _async_worker(self) -> None:
+        """Process snapshot jobs one by one."""
+        while True:
+            job, wait = self._next_job()
+            if job is None:
+                self._wakeup.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                continue
+
+            try:
+                await job.controller.async_capture_event_image(
+                    job.event, job.timestamp, job.received
+                )
+            except Exception:
+                _LOGGER.exception(
+                    'Error capturing "%s" snapshot of %s',
+                    job.event,
+                    job.controller.name,
+                )
+            finally:
+                self._busy.discard(job.controller.unique_id)
+                self._wakeup.set()
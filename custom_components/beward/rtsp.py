@@ -0,0 +1,554 @@
+"""
+Local RTSP relay for Beward cameras.
+
+For more details about this component, please refer to
+https://github.com/Limych/ha-beward
+"""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import logging
+import re
+import secrets
+from contextlib import suppress
+from itertools import count
+from typing import TYPE_CHECKING, Final
+from urllib.parse import unquote, urlsplit
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+_RTSP_VERSION: Final = "RTSP/1.0"
+_USER_AGENT: Final = "Home Assistant Beward relay"
+_LOCAL_HOST: Final = "127.0.0.1"
+_DEFAULT_RTSP_PORT: Final = 554
+
+_TIMEOUT: Final = 10  # seconds
+_KEEPALIVE_INTERVAL: Final = 20  # seconds
+_STALL_TIMEOUT: Final = 30  # seconds
+_GRACE_PERIOD: Final = 10  # seconds
+_CLIENT_WRITE_LIMIT: Final = 4 * 1024 * 1024  # bytes
+
+_PUBLIC_METHODS: Final = "OPTIONS, DESCRIBE, SETUP, PLAY, TEARDOWN, GET_PARAMETER"
+
+
+class RtspError(Exception):
+    """RTSP protocol error."""
+
+
+async def _async_read_message(
+    reader: asyncio.StreamReader, prefix: bytes = b""
+) -> tuple[str, dict[str, str], bytes]:
+    """Read RTSP message and return its start line, headers and body."""
+    start_line = prefix + await reader.readline()
+    while start_line in (b"\r\n", b"\n"):
+        start_line = await reader.readline()
+    if not start_line:
+        msg = "Connection closed"
+        raise RtspError(msg)
+
+    headers = {}
+    while line := (await reader.readline()).strip():
+        name, _, value = line.decode("utf-8", "replace").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    body = b""
+    if length := int(headers.get("content-length", 0)):
+        body = await reader.readexactly(length)
+
+    return start_line.decode("utf-8", "replace").strip(), headers, body
+
+
+def _format_message(start_line: str, headers: dict, body: bytes = b"") -> bytes:
+    """Format RTSP message."""
+    if body:
+        headers["Content-Length"] = len(body)
+    lines = [start_line] + [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+
+def _md5(data: str) -> str:
+    """Return MD5 hex digest as required by RTSP digest authentication."""
+    return hashlib.md5(data.encode(), usedforsecurity=False).hexdigest()
+
+
+class _RtspUpstream:
+    """RTSP session to the device with interleaved RTP over TCP."""
+
+    def __init__(self, url: str) -> None:
+        """Initialize the session."""
+        parts = urlsplit(url)
+        self._username = unquote(parts.username) if parts.username else None
+        self._password = unquote(parts.password) if parts.password else ""
+        self._host = parts.hostname
+        self._port = parts.port or _DEFAULT_RTSP_PORT
+        self._url = parts._replace(netloc=f"{self._host}:{self._port}").geturl()
+
+        self._cseq = count(1)
+        self._session: str | None = None
+        self._challenge: dict[str, str] | None = None
+        self._nonce_count = count(1)
+
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._last_activity = 0.0
+
+        self.sdp: str = ""
+
+    async def async_connect(self) -> None:
+        """Connect to the device and start playing all tracks."""
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self._host, self._port), _TIMEOUT
+        )
+
+        headers, body = await self._async_request(
+            "DESCRIBE", self._url, {"Accept": "application/sdp"}
+        )
+        base = headers.get("content-base", headers.get("content-location", self._url))
+        self.sdp = body.decode("utf-8", "replace")
+
+        for index, control in enumerate(_track_controls(self.sdp)):
+            headers, _ = await self._async_request(
+                "SETUP",
+                _control_url(base, control),
+                {
+                    "Transport": "RTP/AVP/TCP;unicast;"
+                    f"interleaved={2 * index}-{2 * index + 1}"
+                },
+            )
+            self._session = headers.get("session", "").split(";")[0] or self._session
+
+        await self._async_request("PLAY", base, {"Range": "npt=0.000-"})
+
+    async def async_close(self) -> None:
+        """Close the session."""
+        if self._writer is None:
+            return
+
+        with suppress(OSError):
+            if not self._writer.is_closing():
+                self._writer.write(self._format_request("TEARDOWN", self._url))
+                self._writer.close()
+            await self._writer.wait_closed()
+        self._writer = None
+
+    async def async_read_packets(self, on_packet: Callable[[int, bytes], None]) -> None:
+        """Read interleaved packets until the connection breaks."""
+        loop = asyncio.get_running_loop()
+        reader = self._reader
+
+        keepalive = loop.create_task(self._async_keepalive())
+        try:
+            while True:
+                first = await reader.readexactly(1)
+                self._last_activity = loop.time()
+
+                if first == b"$":
+                    header = await reader.readexactly(3)
+                    data = await reader.readexactly(int.from_bytes(header[1:], "big"))
+                    on_packet(header[0], data)
+
+                else:
+                    # Response to keep-alive request
+                    await _async_read_message(reader, first)
+
+        finally:
+            keepalive.cancel()
+
+    async def _async_keepalive(self) -> None:
+        """Keep session alive and close it when the stream stalls."""
+        loop = asyncio.get_running_loop()
+        self._last_activity = loop.time()
+
+        while True:
+            await asyncio.sleep(_KEEPALIVE_INTERVAL)
+
+            if loop.time() - self._last_activity > _STALL_TIMEOUT:
+                _LOGGER.debug("RTSP stream from %s stalled", self._host)
+                self._writer.close()
+                return
+
+            self._writer.write(self._format_request("GET_PARAMETER", self._url))
+
+    def _format_request(
+        self, method: str, url: str, extra_headers: dict | None = None
+    ) -> bytes:
+        """Format request to the device."""
+        headers = {"CSeq": next(self._cseq), "User-Agent": _USER_AGENT}
+        if self._session:
+            headers["Session"] = self._session
+        if self._challenge is not None:
+            headers["Authorization"] = self._authorization(method, url)
+        if extra_headers:
+            headers.update(extra_headers)
+        return _format_message(f"{method} {url} {_RTSP_VERSION}", headers)
+
+    async def _async_request(
+        self, method: str, url: str, extra_headers: dict | None = None
+    ) -> tuple[dict[str, str], bytes]:
+        """Send request to the device and return response headers and body."""
+        for _ in range(2):
+            self._writer.write(self._format_request(method, url, extra_headers))
+            status_line, headers, body = await asyncio.wait_for(
+                _async_read_message(self._reader), _TIMEOUT
+            )
+
+            status = status_line.split(" ", 2)[1] if " " in status_line else ""
+            if status == "401" and self._challenge is None and self._username:
+                self._challenge = self._parse_challenge(
+                    headers.get("www-authenticate", "")
+                )
+                continue
+
+            if status != "200":
+                msg = f"{method} request failed: {status_line}"
+                raise RtspError(msg)
+
+            return headers, body
+
+        msg = f"{method} request failed: authorization rejected"
+        raise RtspError(msg)
+
+    @staticmethod
+    def _parse_challenge(header: str) -> dict[str, str]:
+        """Parse WWW-Authenticate header."""
+        scheme, _, params = header.partition(" ")
+        challenge = dict(re.findall(r'(\w+)="?([^",]*)"?', params))
+        challenge["scheme"] = scheme.lower()
+        return challenge
+
+    def _authorization(self, method: str, uri: str) -> str:
+        """Return value of Authorization header."""
+        challenge = self._challenge
+        if challenge["scheme"] == "basic":
+            credentials = f"{self._username}:{self._password}".encode()
+            return "Basic " + base64.b64encode(credentials).decode()
+
+        realm = challenge.get("realm", "")
+        nonce = challenge.get("nonce", "")
+        ha1 = _md5(f"{self._username}:{realm}:{self._password}")
+        ha2 = _md5(f"{method}:{uri}")
+
+        value = (
+            f'Digest username="{self._username}", realm="{realm}", '
+            f'nonce="{nonce}", uri="{uri}"'
+        )
+        if "auth" in challenge.get("qop", "").split(","):
+            nonce_count = f"{next(self._nonce_count):08x}"
+            cnonce = secrets.token_hex(8)
+            response = _md5(f"{ha1}:{nonce}:{nonce_count}:{cnonce}:auth:{ha2}")
+            value += f', qop=auth, nc={nonce_count}, cnonce="{cnonce}"'
+        else:
+            response = _md5(f"{ha1}:{nonce}:{ha2}")
+        value += f', response="{response}"'
+        if "opaque" in challenge:
+            value += f', opaque="{challenge["opaque"]}"'
+
+        return value
+
+
+def _track_controls(sdp: str) -> list[str]:
+    """Return control attributes of all media sections of SDP."""
+    controls = []
+    in_media = False
+    for line in sdp.splitlines():
+        if line.startswith("m="):
+            in_media = True
+            controls.append("")
+        elif in_media and line.startswith("a=control:"):
+            controls[-1] = line[len("a=control:") :]
+    return controls
+
+
+def _control_url(base: str, control: str) -> str:
+    """Return absolute URL for control attribute."""
+    if control.startswith("rtsp://"):
+        return control
+    if not control or control == "*":
+        return base
+    return base.rstrip("/") + "/" + control
+
+
+def _rewrite_sdp(sdp: str) -> str:
+    """Replace track controls of SDP by local ones."""
+    lines = []
+    track = -1
+    for line in sdp.splitlines():
+        if line.startswith("m="):
+            track += 1
+            lines.append(line)
+            lines.append(f"a=control:track{track}")
+        elif not line.startswith("a=control:"):
+            lines.append(line)
+        elif track < 0:
+            lines.append("a=control:*")
+    return "\r\n".join(lines) + "\r\n"
+
+
+class _RtspClient:
+    """Local consumer of the relay."""
+
+    _session_ids = count(1)
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        """Initialize the client."""
+        self.writer = writer
+        self.session = f"{secrets.token_hex(4)}{next(self._session_ids)}"
+        self.channels: dict[int, int] = {}
+        self.dropped = 0
+
+
+class BewardRtspRelay:
+    """
+    Re-serve single RTSP session of the device on a loopback port.
+
+    Any number of local consumers can connect to the relay. Packets are passed
+    as is, without any re-encoding. Only interleaved RTP over TCP is supported.
+    """
+
+    def __init__(self, hass: HomeAssistant, upstream_url: str, name: str) -> None:
+        """Initialize the relay."""
+        self.hass = hass
+        self.name = name
+        self._upstream_url = upstream_url
+
+        self._server: asyncio.Server | None = None
+        self._port = 0
+
+        self._upstream_task: asyncio.Task | None = None
+        self._upstream_ready: asyncio.Future[str] | None = None
+        self._clients: set[_RtspClient] = set()
+        self._playing: set[_RtspClient] = set()
+        self._unsub_stop = None
+
+    @property
+    def url(self) -> str | None:
+        """Return URL of the relay for local consumers."""
+        if self._server is None:
+            return None
+        return f"rtsp://{_LOCAL_HOST}:{self._port}/{DOMAIN}"
+
+    async def async_start(self) -> None:
+        """Start listening for local consumers."""
+        if self._server is not None:
+            return
+
+        self._server = await asyncio.start_server(
+            self._async_handle_client, _LOCAL_HOST, 0
+        )
+        self._port = self._server.sockets[0].getsockname()[1]
+        _LOGGER.debug("RTSP relay for %s is listening at %s", self.name, self.url)
+
+    async def async_stop(self) -> None:
+        """Disconnect everyone and stop listening."""
+        self._async_cancel_stop()
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+        for client in list(self._clients):
+            client.writer.close()
+
+        await self._async_stop_upstream()
+
+    async def _async_ensure_upstream(self) -> str:
+        """Connect to the device unless connected and return SDP for consumers."""
+        if self._upstream_ready is None:
+            self._upstream_ready = self.hass.loop.create_future()
+            self._upstream_task = self.hass.async_create_background_task(
+                self._async_run_upstream(self._upstream_ready),
+                f"{DOMAIN} rtsp relay {self.name}",
+            )
+        return await asyncio.shield(self._upstream_ready)
+
+    async def _async_stop_upstream(self) -> None:
+        """Disconnect from the device."""
+        if (task := self._upstream_task) is not None:
+            self._upstream_task = None
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _async_run_upstream(self, ready: asyncio.Future[str]) -> None:
+        """Hold session to the device and forward its packets."""
+        upstream = _RtspUpstream(self._upstream_url)
+        try:
+            await upstream.async_connect()
+            _LOGGER.debug("RTSP relay for %s connected to the device", self.name)
+            ready.set_result(_rewrite_sdp(upstream.sdp))
+            self._async_check_idle()
+
+            await upstream.async_read_packets(self._async_forward)
+
+        except (OSError, TimeoutError, RtspError, asyncio.IncompleteReadError) as exc:
+            _LOGGER.warning("RTSP relay for %s lost the device: %s", self.name, exc)
+            if not ready.done():
+                ready.set_exception(exc)
+
+        finally:
+            if not ready.done():
+                ready.set_exception(RtspError("Relay stopped"))
+
+            if self._upstream_ready is ready:
+                self._upstream_ready = None
+
+                # Consumers have to reconnect to get a new session, the others
+                # are answered with an error
+                for client in list(self._playing):
+                    client.writer.close()
+
+            await upstream.async_close()
+            _LOGGER.debug("RTSP relay for %s disconnected from the device", self.name)
+
+    @callback
+    def _async_forward(self, channel: int, data: bytes) -> None:
+        """Send packet of the device to every playing consumer."""
+        size = len(data).to_bytes(2, "big")
+        for client in self._playing:
+            if (client_channel := client.channels.get(channel)) is None:
+                continue
+
+            transport = client.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > _CLIENT_WRITE_LIMIT:
+                client.dropped += 1
+                continue
+
+            client.writer.write(b"$" + bytes((client_channel,)) + size)
+            client.writer.write(data)
+
+    @callback
+    def _async_check_idle(self) -> None:
+        """Schedule disconnect from the device when nobody is playing."""
+        if self._playing or self._upstream_task is None or self._upstream_task.done():
+            self._async_cancel_stop()
+            return
+        if self._unsub_stop is not None:
+            return
+
+        @callback
+        def _stop(now: datetime) -> None:  # noqa: ARG001
+            self._unsub_stop = None
+            if not self._playing and self._upstream_task is not None:
+                self._upstream_task.cancel()
+                self._upstream_task = None
+
+        self._unsub_stop = async_call_later(self.hass, _GRACE_PERIOD, _stop)
+
+    @callback
+    def _async_cancel_stop(self) -> None:
+        """Cancel scheduled disconnect."""
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+
+    async def _async_handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve local consumer."""
+        client = _RtspClient(writer)
+        self._clients.add(client)
+
+        try:
+            while True:
+                first = await reader.readexactly(1)
+                if first == b"$":
+                    # Skip RTCP reports of the consumer
+                    header = await reader.readexactly(3)
+                    await reader.readexactly(int.from_bytes(header[1:], "big"))
+                    continue
+
+                request, headers, _ = await _async_read_message(reader, first)
+                method, url, _ = [*request.split(" "), "", ""][:3]
+                if not await self._async_handle_request(client, method, url, headers):
+                    break
+
+        except (OSError, RtspError, asyncio.IncompleteReadError):
+            pass
+
+        finally:
+            self._clients.discard(client)
+            self._playing.discard(client)
+            writer.close()
+            if client.dropped:
+                _LOGGER.debug(
+                    "RTSP relay for %s dropped %d packets of slow consumer",
+                    self.name,
+                    client.dropped,
+                )
+            self._async_check_idle()
+
+    async def _async_handle_request(  # noqa: PLR0912
+        self, client: _RtspClient, method: str, url: str, headers: dict[str, str]
+    ) -> bool:
+        """Handle request of local consumer and return False to disconnect it."""
+        reply = {"CSeq": headers.get("cseq", "0"), "Server": _USER_AGENT}
+        status = "200 OK"
+        body = b""
+
+        if method == "OPTIONS":
+            reply["Public"] = _PUBLIC_METHODS
+
+        elif method == "DESCRIBE":
+            try:
+                sdp = await self._async_ensure_upstream()
+            except (OSError, TimeoutError, RtspError):
+                status = "503 Service Unavailable"
+            else:
+                reply["Content-Base"] = f"{self.url}/"
+                reply["Content-Type"] = "application/sdp"
+                body = sdp.encode()
+
+        elif method == "SETUP":
+            transport = headers.get("transport", "")
+            track = re.search(r"track(\d+)$", url)
+            if track is None:
+                status = "404 Not Found"
+            elif "TCP" not in transport.upper():
+                status = "461 Unsupported Transport"
+            else:
+                index = int(track.group(1))
+                interleaved = re.search(r"interleaved=(\d+)", transport)
+                channel = int(interleaved.group(1)) if interleaved else 2 * index
+                client.channels[2 * index] = channel
+                client.channels[2 * index + 1] = channel + 1
+                reply["Transport"] = (
+                    f"RTP/AVP/TCP;unicast;interleaved={channel}-{channel + 1}"
+                )
+                reply["Session"] = f"{client.session};timeout=60"
+
+        elif method == "PLAY":
+            if self._upstream_ready is None or not self._upstream_ready.done():
+                status = "455 Method Not Valid in This State"
+            else:
+                self._playing.add(client)
+                self._async_check_idle()
+                reply["Session"] = client.session
+                reply["Range"] = "npt=0.000-"
+
+        elif method == "TEARDOWN":
+            client.writer.write(_format_message(f"{_RTSP_VERSION} {status}", reply))
+            return False
+
+        elif method not in ("GET_PARAMETER", "SET_PARAMETER"):
+            status = "405 Method Not Allowed"
+            reply["Allow"] = _PUBLIC_METHODS
+
+        client.writer.write(_format_message(f"{_RTSP_VERSION} {status}", reply, body))
+        return True
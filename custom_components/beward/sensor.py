@@ -6,21 +6,20 @@
 from __future__ import annotations
 
 import logging
-from pathlib import Path
 from typing import TYPE_CHECKING, Final
 
 if TYPE_CHECKING:
     from datetime import datetime
 
+    from homeassistant.config_entries import ConfigEntry
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from homeassistant.helpers.typing import ConfigType
 
-    from . import BewardController
+    from . import BewardController, BewardEventUpdate
 
 import beward
 import homeassistant.util.dt as dt_util
 from homeassistant.components.sensor import ENTITY_ID_FORMAT, SensorEntity
-from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
 from homeassistant.const import CONF_SENSORS
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import Entity, generate_entity_id
@@ -28,8 +27,6 @@ from homeassistant.helpers.entity import Entity, generate_entity_id
 from .const import (
     CAT_CAMERA,
     CAT_DOORBELL,
-    DOMAIN,
-    DOMAIN_YAML,
     ICON_SENSOR,
     SENSOR_LAST_ACTIVITY,
     SENSOR_LAST_DING,
@@ -37,10 +34,16 @@ from .const import (
     SENSORS,
     BewardDeviceEvent,
 )
-from .entity import BewardEntity
+from .entity import BewardEntity, async_setup_device_entities
 
 _LOGGER: Final = logging.getLogger(__name__)
 
+_SENSOR_EVENTS: Final = {
+    SENSOR_LAST_ACTIVITY: (BewardDeviceEvent.MOTION, BewardDeviceEvent.DING),
+    SENSOR_LAST_MOTION: (BewardDeviceEvent.MOTION,),
+    SENSOR_LAST_DING: (BewardDeviceEvent.DING,),
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -48,27 +51,15 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> bool:
     """Set up sensors for a Beward device."""
-    entities = []
-
-    if entry.source == SOURCE_IMPORT:
-        config = hass.data[DOMAIN_YAML]
-        for index, device_config in enumerate(config):
-            controller: BewardController = hass.data[DOMAIN][entry.entry_id][index]
-            entities.extend(_setup_entities(controller, device_config))
-
-    else:
-        config = entry.data.copy()
-        config.update(entry.options)
-        _LOGGER.debug(hass.data[DOMAIN])
-        controller: BewardController = hass.data[DOMAIN][entry.entry_id][0]
-        entities.extend(_setup_entities(controller, config))
-
-    if entities:
-        async_add_entities(entities, update_before_add=True)
+    await async_setup_device_entities(
+        hass, entry, async_add_entities, _async_setup_entities
+    )
     return True
 
 
-def _setup_entities(controller: BewardController, config: ConfigType) -> list[Entity]:
+async def _async_setup_entities(
+    controller: BewardController, config: ConfigType
+) -> list[Entity]:
     """Set up entities for device."""
     category = None
     if isinstance(controller.device, beward.BewardDoorbell):
@@ -93,6 +84,7 @@ class BewardSensor(BewardEntity, SensorEntity):
         super().__init__(controller)
 
         self._sensor_type = sensor_type
+        self._events = _SENSOR_EVENTS[sensor_type]
 
         self._attr_unique_id = f"{self._controller.unique_id}-{sensor_type}"
         self._attr_name = f"{self._controller.name} {SENSORS[sensor_type][0]}"
@@ -102,19 +94,22 @@ class BewardSensor(BewardEntity, SensorEntity):
             ENTITY_ID_FORMAT, self._attr_name, hass=self.hass
         )
 
-    def _get_file_mtime(self, event: str) -> datetime | None:
-        """Return modification time of file or None."""
-        image_path = self._controller.history_image_path(event)
-        try:
-            return dt_util.utc_from_timestamp(Path(image_path).stat().st_mtime)
-        except OSError:
-            return None
-
     def _get_event_timestamp(self, event: str) -> datetime | None:
         """Return event's last timestamp or None."""
-        return self._controller.event_timestamp.get(event) or self._get_file_mtime(
-            event
-        )
+        return self._controller.event_timestamp.get(event)
+
+    async def async_update(self) -> None:
+        """Get the latest data and updates the state."""
+        self._update_callback(update_ha_state=False)
+
+    @callback
+    def _async_event_callback(self, update: BewardEventUpdate) -> None:
+        """Update the state from event payload."""
+        if update.event in self._events and update.state and update.timestamp:
+            state = dt_util.as_local(update.timestamp.replace(microsecond=0))
+            if self._attr_native_value is None or state > self._attr_native_value:
+                self._attr_native_value = state
+        self.async_write_ha_state()
 
     @callback
     def _update_callback(self, update_ha_state: bool = True) -> None:  # noqa: FBT001, FBT002
@@ -0,0 +1,262 @@
+"""
+Video stream reader for Beward cameras.
+
+For more details about this component, please refer to
+https://github.com/Limych/ha-beward
+"""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import io
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant
+
+    from .clip import BewardClipRecorder
+
+import av
+import homeassistant.util.dt as dt_util
+from homeassistant.components.camera.img_util import TurboJPEGSingleton
+from homeassistant.core import callback
+
+from .const import DOMAIN
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+_OPEN_TIMEOUT: Final = 10  # seconds
+_READ_TIMEOUT: Final = 10  # seconds
+_RECONNECT_DELAY: Final = 10  # seconds
+
+
+def encode_jpeg(frame: av.VideoFrame) -> bytes:
+    """Encode decoded video frame to JPEG."""
+    if turbo_jpeg := TurboJPEGSingleton.instance():
+        return turbo_jpeg.encode(frame.to_ndarray(format="bgr24"))
+
+    with io.BytesIO() as buffer:
+        frame.to_image().save(buffer, format="JPEG")
+        return buffer.getvalue()
+
+
+class BewardFrameBuffer:
+    """
+    Ring buffer of the most recent JPEG frames.
+
+    Frames are dropped from the head of the buffer once they get older than
+    the buffer duration or the buffer exceeds its frame count or memory limits.
+    """
+
+    def __init__(self, duration: float, max_frames: int, max_size: int) -> None:
+        """Initialize the buffer."""
+        self.duration = timedelta(seconds=duration)
+        self.max_frames = max_frames
+        self.max_size = max_size
+
+        self._frames: deque[tuple[datetime, bytes]] = deque()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def frame_interval(self) -> float:
+        """Return minimal interval between frames in seconds."""
+        return self.duration.total_seconds() / self.max_frames
+
+    def __len__(self) -> int:
+        """Return number of buffered frames."""
+        return len(self._frames)
+
+    @property
+    def size(self) -> int:
+        """Return total size of buffered frames in bytes."""
+        return self._size
+
+    def append(self, timestamp: datetime, image: bytes) -> None:
+        """Add new frame to the buffer."""
+        with self._lock:
+            self._frames.append((timestamp, image))
+            self._size += len(image)
+
+            oldest = timestamp - self.duration
+            while self._frames and (
+                len(self._frames) > self.max_frames
+                or self._size > self.max_size
+                or self._frames[0][0] < oldest
+            ):
+                self._size -= len(self._frames.popleft()[1])
+
+    def clear(self) -> None:
+        """Remove all frames from the buffer."""
+        with self._lock:
+            self._frames.clear()
+            self._size = 0
+
+    def latest(self) -> tuple[datetime, bytes] | None:
+        """Return the most recent frame."""
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+
+    def nearest(
+        self, timestamp: datetime, tolerance: timedelta
+    ) -> tuple[datetime, bytes] | None:
+        """Return frame nearest to timestamp within tolerance."""
+        with self._lock:
+            if not self._frames:
+                return None
+            frame = min(self._frames, key=lambda x: abs(x[0] - timestamp))
+
+        return frame if abs(frame[0] - timestamp) <= tolerance else None
+
+    def between(self, start: datetime, end: datetime) -> list[tuple[datetime, bytes]]:
+        """Return all frames taken between start and end timestamps."""
+        with self._lock:
+            return [x for x in self._frames if start <= x[0] <= end]
+
+
+class BewardStreamReader:
+    """
+    Keep decoder attached to RTSP stream of the device.
+
+    Only keyframes are decoded unless frame buffer is used. The most recent
+    keyframe is kept in memory and is encoded to JPEG on demand, at most once
+    per frame. With frame buffer every frame is decoded and frames are encoded
+    to the buffer at its frame rate. With clip recorder every packet is passed
+    to the recorder as is.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        frame_buffer: BewardFrameBuffer | None = None,
+        clip_recorder: BewardClipRecorder | None = None,
+    ) -> None:
+        """Initialize the reader."""
+        self.hass = hass
+        self.name = name
+        self.frame_buffer = frame_buffer
+        self.clip_recorder = clip_recorder
+
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+        self._keyframe: tuple[float, datetime, av.VideoFrame] | None = None
+        self._jpeg: tuple[av.VideoFrame, bytes] | None = None
+        self._jpeg_lock = threading.Lock()
+
+    @callback
+    def async_start(self, url: str) -> None:
+        """Start reading the stream in background thread."""
+        if self._thread is not None:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(url,),
+            name=f"{DOMAIN} stream reader {self.name}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    async def async_stop(self) -> None:
+        """Stop reading the stream."""
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        await self.hass.async_add_executor_job(self._thread.join, _READ_TIMEOUT)
+        self._thread = None
+        self._keyframe = None
+        if self.frame_buffer is not None:
+            self.frame_buffer.clear()
+
+    def jpeg(self, max_age: float) -> tuple[datetime, bytes] | None:
+        """Return capture time and JPEG of the latest frame not older than max_age."""
+        latest = self.frame_buffer.latest() if self.frame_buffer is not None else None
+        if latest and (dt_util.utcnow() - latest[0]).total_seconds() <= max_age:
+            return latest
+
+        keyframe = self._keyframe
+        if keyframe is None or time.monotonic() - keyframe[0] > max_age:
+            return None
+
+        frame = keyframe[2]
+        with self._jpeg_lock:
+            if self._jpeg is None or self._jpeg[0] is not frame:
+                self._jpeg = (frame, encode_jpeg(frame))
+            return keyframe[1], self._jpeg[1]
+
+    def _run(self, url: str) -> None:
+        """Read the stream and reconnect on errors until stopped."""
+        while not self._stop_event.is_set():
+            try:
+                self._read(url)
+            except (av.error.FFmpegError, OSError) as exc:
+                _LOGGER.debug("Error reading stream of %s: %s", self.name, exc)
+            except Exception:
+                # Reader thread must survive, or snapshots and clips would stop
+                _LOGGER.exception("Unexpected error reading stream of %s", self.name)
+
+            self._keyframe = None
+            self._stop_event.wait(_RECONNECT_DELAY)
+
+    def _read(self, url: str) -> None:
+        """Decode frames of the stream."""
+        container = av.open(
+            url,
+            options={"rtsp_transport": "tcp"},
+            timeout=(_OPEN_TIMEOUT, _READ_TIMEOUT),
+        )
+        _LOGGER.debug("Attached to stream of %s", self.name)
+
+        frame_buffer = self.frame_buffer
+        clip_recorder = self.clip_recorder
+        buffered = 0.0
+
+        try:
+            video = container.streams.video[0]
+            if frame_buffer is None:
+                video.codec_context.skip_frame = "NONKEY"
+            if clip_recorder is not None:
+                clip_recorder.attach(video)
+
+            for packet in container.demux(video):
+                if self._stop_event.is_set():
+                    return
+                if clip_recorder is not None:
+                    clip_recorder.add_packet(packet)
+                if frame_buffer is None and not packet.is_keyframe:
+                    continue
+
+                try:
+                    frames = packet.decode()
+                except av.error.InvalidDataError:
+                    continue
+
+                for frame in frames:
+                    now = time.monotonic()
+                    if frame.key_frame:
+                        self._keyframe = (now, dt_util.utcnow(), frame)
+                    if (
+                        frame_buffer is not None
+                        and now - buffered >= frame_buffer.frame_interval
+                    ):
+                        frame_buffer.append(dt_util.utcnow(), encode_jpeg(frame))
+                        buffered = now
+
+        finally:
+            if clip_recorder is not None:
+                clip_recorder.detach()
+            container.close()
+            _LOGGER.debug("Detached from stream of %s", self.name)
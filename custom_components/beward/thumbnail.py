@@ -0,0 +1,146 @@
+"""
+Downscaled camera images for Beward devices.
+
+For more details about this component, please refer to
+https://github.com/Limych/ha-beward
+"""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import io
+import math
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+import numpy as np
+from homeassistant.components.camera.img_util import (
+    JPEG_QUALITY,
+    SUPPORTED_SCALING_FACTORS,
+    TurboJPEGSingleton,
+    find_supported_scaling_factor,
+)
+from PIL import Image as PilImage
+
+_CACHE_SIZE: Final = 8  # images
+_HASH_SIZE: Final = 8  # bits per row and column
+_HASH_BLOCK: Final = 8  # pixels averaged per hash cell side
+
+
+def fit_pixels(pixels: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Resize pixel array to exact size by nearest neighbour sampling."""
+    rows = np.arange(height) * pixels.shape[0] // height
+    cols = np.arange(width) * pixels.shape[1] // width
+    return pixels[rows[:, np.newaxis], cols]
+
+
+def decode_jpeg(image: bytes, width: int, height: int) -> np.ndarray:
+    """
+    Decode JPEG image to pixel array of exact size.
+
+    Image is decoded at reduced size in DCT domain where possible. Order of
+    color channels depends on the decoder. Raises OSError or ValueError if
+    image can't be decoded.
+    """
+    if turbo_jpeg := TurboJPEGSingleton.instance():
+        img_width, img_height, _, _ = turbo_jpeg.decode_header(image)
+        scaling_factor = find_supported_scaling_factor(
+            img_width, img_height, width, height
+        )
+        pixels = turbo_jpeg.decode(image, scaling_factor=scaling_factor)
+
+    else:
+        with PilImage.open(io.BytesIO(image)) as img:
+            img.draft("RGB", (width, height))
+            pixels = np.asarray(img.convert("RGB"))
+
+    return fit_pixels(pixels, width, height)
+
+
+def perceptual_hash(image: bytes) -> int:
+    """
+    Return difference hash of JPEG image.
+
+    Hashes of similar images differ in a few bits only. Raises OSError or
+    ValueError if image can't be decoded.
+    """
+    pixels = decode_jpeg(
+        image, (_HASH_SIZE + 1) * _HASH_BLOCK, _HASH_SIZE * _HASH_BLOCK
+    )
+    # Average blocks, so noise of single pixels doesn't flip bits
+    gray = pixels.reshape(
+        _HASH_SIZE, _HASH_BLOCK, _HASH_SIZE + 1, _HASH_BLOCK, -1
+    ).mean(axis=(1, 3, 4))
+    bits = (gray[:, 1:] > gray[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def scale_jpeg(image: bytes, width: int, height: int) -> bytes:
+    """
+    Downscale JPEG image to the smallest size not less than requested one.
+
+    Image is decoded once at the best TurboJPEG scaling factor in DCT domain
+    and encoded once. As factors go down to 1/8 only, larger image is resized
+    after decoding. Image is returned as is if TurboJPEG is not available or
+    image is already small enough.
+    """
+    if not (turbo_jpeg := TurboJPEGSingleton.instance()):
+        return image
+
+    try:
+        img_width, img_height, _, _ = turbo_jpeg.decode_header(image)
+    except OSError:
+        return image
+
+    scaling_factor = find_supported_scaling_factor(img_width, img_height, width, height)
+    if scaling_factor is None:
+        return image
+
+    pixels = turbo_jpeg.decode(image, scaling_factor=scaling_factor)
+    if scaling_factor == SUPPORTED_SCALING_FACTORS[-1]:
+        ratio = max(width / pixels.shape[1], height / pixels.shape[0])
+        if ratio < 1:
+            size = (
+                math.ceil(pixels.shape[1] * ratio),
+                math.ceil(pixels.shape[0] * ratio),
+            )
+            with PilImage.fromarray(pixels) as img:
+                pixels = np.asarray(img.resize(size, PilImage.Resampling.BILINEAR))
+
+    return turbo_jpeg.encode(pixels, quality=JPEG_QUALITY)
+
+
+class BewardThumbnailCache:
+    """LRU cache of downscaled images keyed by source image and size."""
+
+    def __init__(self, hass: HomeAssistant, size: int = _CACHE_SIZE) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._size = size
+        self._cache: OrderedDict[tuple[bytes, int, int], bytes] = OrderedDict()
+
+    async def async_scale(
+        self, image: bytes, width: int | None, height: int | None
+    ) -> bytes:
+        """Return image downscaled to requested size."""
+        if not width or not height:
+            return image
+
+        # Hash of bytes is computed once and cached by Python
+        key = (image, width, height)
+        if (scaled := self._cache.get(key)) is not None:
+            self._cache.move_to_end(key)
+            return scaled
+
+        scaled = await self.hass.async_add_executor_job(
+            scale_jpeg, image, width, height
+        )
+        self._cache[key] = scaled
+        while len(self._cache) > self._size:
+            self._cache.popitem(last=False)
+        return scaled
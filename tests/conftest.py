@@ -21,6 +21,8 @@ from unittest.mock import patch
 import pytest
 from beward import Beward, BewardGeneric
 
+from custom_components.beward.alarms import BewardAlarmListener
+from custom_components.beward.metadata import BewardDeviceMetadata
 from tests.const import MOCK_HOST, MOCK_PASSWORD, MOCK_PORT, MOCK_USERNAME
 
 pytest_plugins = "pytest_homeassistant_custom_component"  # pylint: disable=invalid-name
@@ -70,12 +72,18 @@ def _bypass_get_data_fixture() -> None:
     """Skip calls to get data from API."""
     with (
         patch.object(BewardGeneric, "is_online", return_value=True),
-        patch.object(BewardGeneric, "listen_alarms"),
+        patch.object(BewardAlarmListener, "async_start"),
+        patch("custom_components.beward.BewardClient", autospec=True),
         patch.object(
             Beward,
             "factory",
             return_value=MockBewardDevice(),
         ),
+        patch.object(
+            BewardDeviceMetadata,
+            "async_from_client",
+            return_value=BewardDeviceMetadata(None, MockBewardDevice().system_info),
+        ),
     ):
         yield
 
@@ -85,5 +93,8 @@ def _bypass_get_data_fixture() -> None:
 @pytest.fixture(name="error_on_get_data")
 def _error_get_data_fixture() -> None:
     """Simulate error when retrieving data from API."""
-    with patch("beward.Beward.factory", side_effect=Exception):
+    with (
+        patch("beward.Beward.factory", side_effect=Exception),
+        patch.object(BewardDeviceMetadata, "async_from_client", side_effect=Exception),
+    ):
         yield
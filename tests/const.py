@@ -12,6 +12,27 @@ from homeassistant.const import (
 )
 
 from custom_components.beward import CONF_CAMERAS
+from custom_components.beward.const import (
+    CONF_CLIP_POST_ROLL,
+    CONF_CLIP_PRE_ROLL,
+    CONF_FRAME_BUFFER_DURATION,
+    CONF_FRAME_BUFFER_MAX_FRAMES,
+    CONF_FRAME_BUFFER_MAX_SIZE,
+    CONF_HISTORY_MAX_AGE,
+    CONF_HISTORY_MAX_COUNT,
+    CONF_HISTORY_MAX_SIZE,
+    CONF_MJPEG_MODE,
+    CONF_MOTION_MIN_ON_TIME,
+    CONF_MOTION_OFF_DELAY,
+    CONF_RECORD_CLIPS,
+    CONF_RTSP_RELAY,
+    CONF_SNAPSHOT_DEDUP,
+    CONF_SNAPSHOT_FRESH_TTL,
+    CONF_SNAPSHOT_MAX_STALE,
+    CONF_SNAPSHOT_RATE,
+    CONF_SNAPSHOT_REFRESH_CONCURRENCY,
+    CONF_SNAPSHOT_SOURCE,
+)
 
 MOCK_HOST: Final = "192.168.0.2"
 MOCK_PORT: Final = 81
@@ -29,6 +50,25 @@ MOCK_OPTIONS: Final = {
     CONF_CAMERAS: ["live", "last_motion"],
     CONF_BINARY_SENSORS: [],
     CONF_SENSORS: ["last_motion"],
+    CONF_RTSP_RELAY: False,
+    CONF_MJPEG_MODE: "ffmpeg",
+    CONF_SNAPSHOT_SOURCE: "cgi",
+    CONF_SNAPSHOT_FRESH_TTL: 1.0,
+    CONF_SNAPSHOT_MAX_STALE: 0.0,
+    CONF_SNAPSHOT_REFRESH_CONCURRENCY: 2,
+    CONF_SNAPSHOT_RATE: 0,
+    CONF_SNAPSHOT_DEDUP: "exact",
+    CONF_FRAME_BUFFER_DURATION: 0,
+    CONF_FRAME_BUFFER_MAX_FRAMES: 25,
+    CONF_FRAME_BUFFER_MAX_SIZE: 8,
+    CONF_HISTORY_MAX_AGE: 30,
+    CONF_HISTORY_MAX_COUNT: 1000,
+    CONF_HISTORY_MAX_SIZE: 500,
+    CONF_RECORD_CLIPS: False,
+    CONF_CLIP_PRE_ROLL: 5,
+    CONF_CLIP_POST_ROLL: 10,
+    CONF_MOTION_MIN_ON_TIME: 0,
+    CONF_MOTION_OFF_DELAY: 0,
 }
 MOCK_YAML_CONFIG = MOCK_CONFIG.copy()
 MOCK_YAML_CONFIG.update(MOCK_OPTIONS)
@@ -1,24 +1,82 @@
 # pylint: disable=protected-access,redefined-outer-name
 """Test beward setup process."""
 
-from homeassistant.config_entries import ConfigEntryState
+import asyncio
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, Mock, patch
+
+import homeassistant.util.dt as dt_util
+import pytest
+import voluptuous as vol
+from beward import BewardCamera, BewardGeneric
+from beward.const import BEWARD_DOORBELL
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntryState
+from homeassistant.const import CONF_HOST
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
+)
 from homeassistant.helpers.storage import STORAGE_DIR
 from homeassistant.setup import async_setup_component
+from homeassistant.util import slugify
 from pytest_homeassistant_custom_component.common import (
     MockConfigEntry,
     assert_setup_component,
 )
 
 from custom_components.beward import (
+    DEVICE_SCHEMA,
+    SETUP_SCHEMA,
     BewardController,
+    _async_revalidate_device,
+    _async_setup_device,
+    _async_setup_devices,
+    async_remove_entry,
+)
+from custom_components.beward.client import BewardClient
+from custom_components.beward.const import (
+    CONF_FRAME_BUFFER_MAX_FRAMES,
+    CONF_SETUP_CONCURRENCY,
+    CONF_SETUP_TIMEOUT,
+    CONF_SNAPSHOT_FRESH_TTL,
+    CONF_SNAPSHOT_MAX_STALE,
+    CONF_SNAPSHOT_REFRESH_CONCURRENCY,
+    CONF_SNAPSHOT_SOURCE,
+    DEFAULT_SETUP_TIMEOUT,
+    DOMAIN,
+    DOMAIN_PIPELINE,
+    DOMAIN_YAML,
+    DOMAIN_YAML_SETUP,
+    EVENT_PIPELINE,
+    SIGNAL_DEVICE_ADDED,
+    SNAPSHOT_SOURCE_CGI,
+    SNAPSHOT_SOURCE_STREAM,
+    UNDO_UPDATE_LISTENER,
+    BewardDeviceEvent,
+)
+from custom_components.beward.entity import async_setup_device_entities
+from custom_components.beward.history import BewardEventHistory
+from custom_components.beward.metadata import (
+    BewardDeviceMetadata,
+    BewardMetadataCache,
 )
-from custom_components.beward.const import DOMAIN, UNDO_UPDATE_LISTENER
+from custom_components.beward.stream import BewardFrameBuffer
 
-from .const import MOCK_CONFIG, MOCK_YAML_CONFIG
+from .const import (
+    MOCK_CONFIG,
+    MOCK_DEVICE_ID,
+    MOCK_DEVICE_NAME,
+    MOCK_HOST,
+    MOCK_YAML_CONFIG,
+)
 
 
-async def test_async_setup(hass: HomeAssistant):
+async def test_async_setup(hass: HomeAssistant, bypass_get_data):
     """Test a successful setup component."""
     assert DOMAIN not in hass.config.media_dirs
 
@@ -33,7 +91,7 @@ async def test_async_setup(hass: HomeAssistant):
     await hass.async_block_till_done()
 
 
-async def test_async_setup_2(hass: HomeAssistant):
+async def test_async_setup_2(hass: HomeAssistant, bypass_get_data):
     """Test a successful setup component."""
     test_path = "/test_path"
 
@@ -52,6 +110,21 @@ async def test_async_setup_2(hass: HomeAssistant):
     await hass.async_block_till_done()
 
 
+@pytest.mark.parametrize(
+    ("schema", "config", "option"),
+    [
+        (DEVICE_SCHEMA, MOCK_CONFIG, CONF_SNAPSHOT_REFRESH_CONCURRENCY),
+        (SETUP_SCHEMA, {}, CONF_SETUP_CONCURRENCY),
+        (DEVICE_SCHEMA, MOCK_CONFIG, CONF_FRAME_BUFFER_MAX_FRAMES),
+    ],
+)
+def test_limit_schema(schema: vol.Schema, config: dict, option: str):
+    """Test limits which are divisors or semaphore sizes can't be zero."""
+    assert schema({**config, option: 1})[option] == 1
+    with pytest.raises(vol.Invalid):
+        schema({**config, option: 0})
+
+
 # We can pass fixtures as defined in conftest.py to tell pytest to use the fixture
 # for a given test. We can also leverage fixtures and mocks that are available in
 # Home Assistant using the pytest_homeassistant_custom_component plugin.
@@ -99,6 +172,390 @@ async def test_setup_unload_and_reload_entry(hass: HomeAssistant, bypass_get_dat
     assert config_entry.entry_id not in hass.data[DOMAIN]
 
 
+async def test_pipeline_shared_by_entries(hass: HomeAssistant, bypass_get_data):
+    """Test all entries share one event pipeline, which stops with the last one."""
+    entries = [
+        MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id=f"test_{x}")
+        for x in range(2)
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    pipeline = hass.data[DOMAIN_PIPELINE]
+    assert all(
+        hass.data[DOMAIN][x.entry_id][EVENT_PIPELINE] is pipeline for x in entries
+    )
+
+    await hass.config_entries.async_unload(entries[0].entry_id)
+    assert hass.data[DOMAIN_PIPELINE] is pipeline
+    assert pipeline._tasks
+
+    await hass.config_entries.async_unload(entries[1].entry_id)
+    assert DOMAIN_PIPELINE not in hass.data
+    assert not pipeline._tasks
+
+
+async def test_event_image_served_from_memory(hass: HomeAssistant, tmp_path: Path):
+    """Test event images are read from disk only once."""
+    controller = BewardController(
+        hass, MOCK_DEVICE_ID, Mock(BewardCamera), MOCK_DEVICE_NAME
+    )
+    event = BewardDeviceEvent.MOTION
+    image_path = tmp_path / "old.jpg"
+    image_path.write_bytes(b"old")
+
+    assert await controller.async_event_image(event, str(image_path)) == b"old"
+    image_path.unlink()
+    assert await controller.async_event_image(event, str(image_path)) == b"old"
+    assert await controller.async_event_image(event, str(tmp_path / "none")) is None
+
+    with (
+        patch.object(
+            controller.client, "async_live_image", AsyncMock(return_value=b"new")
+        ),
+        patch.object(controller, "_cache_image") as cache_image,
+    ):
+        await controller.async_capture_event_image(event, dt_util.utcnow())
+
+    cache_image.assert_called_once_with(event, b"new")
+    new_path = controller.history_image_path(event)
+    assert await controller.async_event_image(event, new_path) == b"new"
+
+
+async def test_live_image_cache(hass: HomeAssistant, freezer: FrozenDateTimeFactory):
+    """Test live image is served from cache while it's fresh or slightly stale."""
+    controller = BewardController(
+        hass,
+        MOCK_DEVICE_ID,
+        Mock(BewardCamera),
+        MOCK_DEVICE_NAME,
+        config={CONF_SNAPSHOT_FRESH_TTL: 1, CONF_SNAPSHOT_MAX_STALE: 5},
+    )
+    images = iter([b"1", b"2", b"3"])
+
+    async def _live_image() -> bytes:
+        await asyncio.sleep(0)
+        return next(images)
+
+    live_image = AsyncMock(side_effect=_live_image)
+    with patch.object(controller.client, "async_live_image", live_image):
+        assert await controller.async_get_live_image() == b"1"
+
+        freezer.tick(0.5)
+        assert await controller.async_get_live_image() == b"1"
+        assert live_image.await_count == 1
+
+        # Stale image is served right away and refreshed in background
+        freezer.tick(1)
+        assert await controller.async_get_live_image() == b"1"
+        await hass.async_block_till_done()
+        assert live_image.await_count == 2
+        assert await controller.async_get_live_image() == b"2"
+
+        # Too old image is not served
+        freezer.tick(10)
+        assert await controller.async_get_live_image() == b"3"
+        assert live_image.await_count == 3
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [(SNAPSHOT_SOURCE_CGI, b"cgi"), (SNAPSHOT_SOURCE_STREAM, b"stream")],
+)
+async def test_live_image_source(hass: HomeAssistant, source: str, expected: bytes):
+    """Test stream keyframes are used only if stream is snapshot source."""
+    controller = BewardController(
+        hass,
+        MOCK_DEVICE_ID,
+        Mock(BewardCamera),
+        MOCK_DEVICE_NAME,
+        config={CONF_SNAPSHOT_SOURCE: source},
+    )
+    # Stream reader is started for frame buffer as well
+    controller._stream_reader = Mock(
+        jpeg=Mock(return_value=(dt_util.utcnow(), b"stream"))
+    )
+
+    with patch.object(
+        controller.client, "async_live_image", AsyncMock(return_value=b"cgi")
+    ):
+        assert await controller.async_get_live_image() == expected
+
+
+async def test_live_image_refresh_limit(hass: HomeAssistant):
+    """Test background refreshes of all devices are limited together."""
+    limiter = asyncio.Semaphore(1)
+    release = asyncio.Event()
+    running = 0
+    max_running = 0
+
+    async def _live_image() -> bytes:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await release.wait()
+        running -= 1
+        return b"new"
+
+    controllers = [
+        BewardController(
+            hass,
+            f"{MOCK_DEVICE_ID}_{index}",
+            Mock(BewardCamera),
+            MOCK_DEVICE_NAME,
+            config={CONF_SNAPSHOT_MAX_STALE: 10},
+        )
+        for index in range(2)
+    ]
+    for controller in controllers:
+        controller._frame = b"old"
+        controller._frame_time = dt_util.utcnow() - timedelta(seconds=2)
+
+    live_image = AsyncMock(side_effect=_live_image)
+    with patch.object(BewardClient, "async_live_image", live_image):
+        for controller in controllers:
+            assert await controller.async_get_live_image(limiter) == b"old"
+        await asyncio.sleep(0)
+        assert running == 1
+
+        release.set()
+        await hass.async_block_till_done()
+
+    assert max_running == 1
+    assert live_image.await_count == 2
+    assert [x._frame for x in controllers] == [b"new", b"new"]
+
+
+async def test_event_image_buffered(hass: HomeAssistant):
+    """Test buffered event frame is matched by receive time, not device clock."""
+    controller = BewardController(
+        hass, MOCK_DEVICE_ID, Mock(BewardCamera), MOCK_DEVICE_NAME
+    )
+    event = BewardDeviceEvent.MOTION
+    received = dt_util.utcnow()
+    frame_buffer = BewardFrameBuffer(30, 10, 1000)
+    frame_buffer.append(received - timedelta(seconds=5), b"old")
+    frame_buffer.append(received, b"event")
+    controller._stream_reader = Mock(frame_buffer=frame_buffer)
+
+    # Clock of device is one hour behind
+    timestamp = received - timedelta(hours=1)
+    with (
+        patch.object(controller.client, "async_live_image", AsyncMock()) as live,
+        patch.object(controller, "_cache_image") as cache_image,
+    ):
+        await controller.async_capture_event_image(event, timestamp, received)
+
+    live.assert_not_awaited()
+    cache_image.assert_called_once_with(event, b"event")
+
+
+async def test_event_state_persistence(hass: HomeAssistant, hass_storage: dict):
+    """Test event timestamps are persisted and restored without event states."""
+    controller = BewardController(
+        hass, MOCK_DEVICE_ID, Mock(BewardGeneric), MOCK_DEVICE_NAME
+    )
+    timestamp = dt_util.utcnow()
+    controller._async_handle_event(BewardDeviceEvent.MOTION, True, timestamp)  # noqa: FBT003
+    await controller.async_shutdown()
+
+    key = f"{DOMAIN}.{slugify(MOCK_DEVICE_ID)}"
+    assert hass_storage[key]["data"] == {
+        "event_timestamp": {BewardDeviceEvent.MOTION: timestamp.isoformat()}
+    }
+
+    # Event which was on at shutdown may be long over
+    controller = BewardController(
+        hass, MOCK_DEVICE_ID, Mock(BewardGeneric), MOCK_DEVICE_NAME
+    )
+    await controller._async_load_state()
+    assert controller.event_timestamp == {BewardDeviceEvent.MOTION: timestamp}
+    assert controller.event_state == {}
+
+
+async def test_remove_entry(hass: HomeAssistant, hass_storage: dict):
+    """Test persisted state of entry devices is removed with the entry."""
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    metadata_key = f"{DOMAIN}.{config_entry.entry_id}.metadata"
+    state_key = f"{DOMAIN}.{slugify(MOCK_DEVICE_ID)}"
+    hass_storage[metadata_key] = {
+        "version": 1,
+        "key": metadata_key,
+        "data": {
+            "0": {
+                "fingerprint": "",
+                "metadata": {
+                    "device_type": None,
+                    "system_info": {"DeviceID": MOCK_DEVICE_ID},
+                },
+            }
+        },
+    }
+    hass_storage[state_key] = {"version": 1, "key": state_key, "data": {}}
+
+    await async_remove_entry(hass, config_entry)
+    assert metadata_key not in hass_storage
+    assert state_key not in hass_storage
+
+
+async def test_frame_cache_shared(hass: HomeAssistant):
+    """Test one device fetch serves live camera and event snapshots."""
+    controller = BewardController(
+        hass, MOCK_DEVICE_ID, Mock(BewardCamera), MOCK_DEVICE_NAME
+    )
+    live_image = AsyncMock(return_value=b"frame")
+
+    with (
+        patch.object(controller.client, "async_live_image", live_image),
+        patch.object(controller, "_cache_image"),
+    ):
+        images = await asyncio.gather(
+            controller.async_get_live_image(), controller.async_get_live_image()
+        )
+        assert images == [b"frame", b"frame"]
+        assert live_image.await_count == 1
+
+        # Frame taken after the event is reused
+        await controller.async_capture_event_image(
+            BewardDeviceEvent.MOTION, dt_util.utcnow() - timedelta(seconds=1)
+        )
+        assert live_image.await_count == 1
+
+        # Event newer than cached frame needs a new one, which is then shared
+        await controller.async_capture_event_image(
+            BewardDeviceEvent.DING, dt_util.utcnow() + timedelta(seconds=10)
+        )
+        assert live_image.await_count == 2
+        assert await controller.async_get_live_image() == b"frame"
+        assert live_image.await_count == 2
+
+        # Cached frame is matched by receive time when device clock is ahead
+        await controller.async_capture_event_image(
+            BewardDeviceEvent.MOTION,
+            dt_util.utcnow() + timedelta(hours=1),
+            dt_util.utcnow(),
+        )
+        assert live_image.await_count == 2
+
+
+async def test_event_frame_keyframe_time(hass: HomeAssistant):
+    """Test stream keyframe taken before the event is not its snapshot."""
+    controller = BewardController(
+        hass,
+        MOCK_DEVICE_ID,
+        Mock(BewardCamera),
+        MOCK_DEVICE_NAME,
+        config={CONF_SNAPSHOT_SOURCE: SNAPSHOT_SOURCE_STREAM},
+    )
+    taken = dt_util.utcnow() - timedelta(seconds=3)
+
+    def _jpeg(max_age: float) -> tuple | None:
+        if (dt_util.utcnow() - taken).total_seconds() > max_age:
+            return None
+        return taken, b"keyframe"
+
+    controller._stream_reader = Mock(jpeg=Mock(side_effect=_jpeg), frame_buffer=None)
+    live_image = AsyncMock(return_value=b"cgi")
+
+    with (
+        patch.object(controller.client, "async_live_image", live_image),
+        patch.object(controller, "_cache_image") as cache_image,
+    ):
+        assert await controller.async_get_live_image() == b"keyframe"
+        assert controller._frame_time == taken
+        live_image.assert_not_awaited()
+
+        await controller.async_capture_event_image(
+            BewardDeviceEvent.MOTION, dt_util.utcnow()
+        )
+
+    live_image.assert_awaited_once()
+    cache_image.assert_called_once_with(BewardDeviceEvent.MOTION, b"cgi")
+
+
+async def test_event_image_history(hass: HomeAssistant, tmp_path: Path):
+    """Test event snapshots are saved to history and unchanged ones are reused."""
+    history = BewardEventHistory(hass, str(tmp_path))
+    await history.async_start()
+    controller = BewardController(
+        hass, MOCK_DEVICE_ID, Mock(BewardCamera), MOCK_DEVICE_NAME, history=history
+    )
+    event = BewardDeviceEvent.MOTION
+    updates = []
+    async_dispatcher_connect(hass, controller.media_signal(event), updates.append)
+    timestamps = [dt_util.utcnow() + timedelta(seconds=x) for x in (0, 10)]
+
+    with (
+        patch.object(
+            controller.client, "async_live_image", AsyncMock(return_value=b"image")
+        ),
+        patch.object(controller, "_cache_image") as cache_image,
+    ):
+        for timestamp in timestamps:
+            await controller.async_capture_event_image(event, timestamp)
+
+    cache_image.assert_not_called()
+    record = controller.last_event(event)
+    assert record.timestamp == timestamps[1]
+    assert [x.image_path for x in updates] == [record.path, record.path]
+    assert await hass.async_add_executor_job(Path(record.path).read_bytes) == b"image"
+    assert await controller.async_event_image(event, record.path) == b"image"
+
+    images = await hass.async_add_executor_job(lambda: list(tmp_path.rglob("*.jpg")))
+    assert len(images) == 1
+    await history.async_stop()
+
+
+async def test_unchanged_snapshot_not_saved(hass: HomeAssistant):
+    """Test unchanged event snapshot is not written again."""
+    controller = BewardController(
+        hass, MOCK_DEVICE_ID, Mock(BewardCamera), MOCK_DEVICE_NAME
+    )
+    event = BewardDeviceEvent.MOTION
+
+    with (
+        patch.object(
+            controller.client, "async_live_image", AsyncMock(return_value=b"same")
+        ) as live_image,
+        patch.object(controller, "_cache_image") as cache_image,
+    ):
+        for _ in range(2):
+            await controller.async_capture_event_image(
+                event, dt_util.utcnow() + timedelta(seconds=10)
+            )
+
+    assert live_image.await_count == 2
+    cache_image.assert_called_once_with(event, b"same")
+
+
+async def test_similar_snapshot_keeps_saved_image(hass: HomeAssistant):
+    """Test image of duplicate snapshot is not served instead of the saved one."""
+    controller = BewardController(
+        hass, MOCK_DEVICE_ID, Mock(BewardCamera), MOCK_DEVICE_NAME
+    )
+    event = BewardDeviceEvent.MOTION
+    image_path = controller.history_image_path(event)
+
+    with (
+        patch.object(
+            controller.client,
+            "async_live_image",
+            AsyncMock(side_effect=[b"saved", b"similar"]),
+        ),
+        patch.object(controller, "_is_duplicate_image", side_effect=[False, True]),
+        patch.object(controller, "_cache_image") as cache_image,
+    ):
+        for delay in (0, 10):
+            await controller.async_capture_event_image(
+                event, dt_util.utcnow() + timedelta(seconds=delay)
+            )
+
+    cache_image.assert_called_once_with(event, b"saved")
+    assert await controller.async_event_image(event, image_path) == b"saved"
+
+
 # ruff: noqa: ERA001
 # async def test_setup_entry_exception(hass: HomeAssistant, error_on_get_data):
 #     """Test ConfigEntryNotReady when API raises an exception during entry setup."""
@@ -109,3 +566,198 @@ async def test_setup_unload_and_reload_entry(hass: HomeAssistant, bypass_get_dat
 #     # an error.
 #     with pytest.raises(ConfigEntryNotReady):
 #         assert await async_setup_entry(hass, config_entry)
+
+
+async def test_setup_devices_concurrently(hass: HomeAssistant):
+    """Test devices are set up concurrently and unavailable ones are retried."""
+    config_entry = MockConfigEntry(domain=DOMAIN, source=SOURCE_IMPORT, data={})
+    hass.data[DOMAIN] = {config_entry.entry_id: {}}
+    hass.data[DOMAIN_YAML] = [{CONF_HOST: f"192.168.0.{x}"} for x in range(3)]
+    hass.data[DOMAIN_YAML_SETUP] = {CONF_SETUP_CONCURRENCY: 2, CONF_SETUP_TIMEOUT: 5}
+
+    running = 0
+    max_running = 0
+    failures = {2: 1}
+    controllers = [Mock(BewardController) for _ in range(3)]
+
+    async def _setup_device(
+        device_config: dict, *, setup_timeout: float, index: int
+    ) -> BewardController:
+        nonlocal running, max_running
+        assert setup_timeout == 5
+        assert device_config[CONF_HOST] == f"192.168.0.{index}"
+
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0)
+        running -= 1
+
+        if failures.get(index):
+            failures[index] -= 1
+            raise ConfigEntryNotReady
+        return controllers[index]
+
+    added = []
+    async_dispatcher_connect(
+        hass, SIGNAL_DEVICE_ADDED.format(config_entry.entry_id), added.append
+    )
+
+    with patch("custom_components.beward._RETRY_MIN_DELAY", 0):
+        retries = await _async_setup_devices(hass, config_entry, _setup_device)
+
+        assert max_running == 2
+        assert len(retries) == 1
+        data = hass.data[DOMAIN][config_entry.entry_id]
+        assert data == {0: controllers[0], 1: controllers[1]}
+
+        # Device is added when background retry succeeds
+        await retries[0]
+        assert data[2] is controllers[2]
+        assert added == [2]
+
+
+async def test_setup_devices_error(hass: HomeAssistant):
+    """Test started devices are shut down when setup of another one fails."""
+    config_entry = MockConfigEntry(domain=DOMAIN, source=SOURCE_IMPORT, data={})
+    hass.data[DOMAIN] = {config_entry.entry_id: {}}
+    hass.data[DOMAIN_YAML] = [MOCK_CONFIG, MOCK_CONFIG]
+    hass.data[DOMAIN_YAML_SETUP] = {CONF_SETUP_CONCURRENCY: 2, CONF_SETUP_TIMEOUT: 5}
+    controller = Mock(BewardController)
+
+    async def _setup_device(
+        _: dict, *, setup_timeout: float, index: int
+    ) -> BewardController:
+        assert setup_timeout == 5
+        if index:
+            await asyncio.sleep(0)
+            raise RuntimeError
+        return controller
+
+    with pytest.raises(RuntimeError):
+        await _async_setup_devices(hass, config_entry, _setup_device)
+
+    controller.async_shutdown.assert_awaited_once()
+    assert hass.data[DOMAIN][config_entry.entry_id] == {}
+
+
+async def test_setup_device_start_error(hass: HomeAssistant):
+    """Test device is shut down when it fails to start."""
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG)
+    metadata = BewardMetadataCache(hass, config_entry.entry_id)
+    cached = BewardDeviceMetadata(BEWARD_DOORBELL, {"DeviceID": MOCK_DEVICE_ID}, 554)
+
+    with (
+        patch(
+            "custom_components.beward._async_probe_device",
+            AsyncMock(return_value=(Mock(BewardCamera, host=MOCK_HOST), cached)),
+        ),
+        patch.object(BewardController, "async_start", side_effect=RuntimeError),
+        patch.object(BewardController, "async_shutdown") as shutdown,
+        pytest.raises(RuntimeError),
+    ):
+        await _async_setup_device(
+            hass,
+            config_entry,
+            MOCK_CONFIG,
+            pipeline=Mock(),
+            history=Mock(),
+            metadata=metadata,
+            revalidate_limiter=asyncio.Semaphore(1),
+            setup_timeout=5,
+        )
+
+    shutdown.assert_awaited_once()
+
+
+async def test_setup_device_timeout(hass: HomeAssistant):
+    """Test hanging device setup is aborted after timeout."""
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG)
+    metadata = Mock(get=Mock(return_value=None))
+
+    async def _probe_device(*_: Any) -> None:
+        await asyncio.Event().wait()
+
+    with (
+        patch("custom_components.beward._async_probe_device", _probe_device),
+        pytest.raises(ConfigEntryNotReady, match="Timed out"),
+    ):
+        await _async_setup_device(
+            hass,
+            config_entry,
+            MOCK_CONFIG,
+            pipeline=Mock(),
+            history=Mock(),
+            metadata=metadata,
+            revalidate_limiter=asyncio.Semaphore(1),
+            setup_timeout=0.01,
+        )
+
+
+async def test_revalidate_reload_once(hass: HomeAssistant):
+    """Test changed metadata reloads entry only once."""
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG)
+    actual = BewardDeviceMetadata(BEWARD_DOORBELL, {"DeviceID": MOCK_DEVICE_ID}, 554)
+    probe_device = AsyncMock(return_value=(Mock(), actual))
+
+    with (
+        patch("custom_components.beward._async_probe_device", probe_device),
+        patch.object(hass.config_entries, "async_schedule_reload") as reload,
+    ):
+        # Reloaded entry creates new cache which revalidates device again
+        for _ in range(2):
+            metadata = BewardMetadataCache(hass, config_entry.entry_id)
+            await metadata.async_load()
+            await _async_revalidate_device(
+                hass,
+                config_entry,
+                MOCK_CONFIG,
+                metadata=metadata,
+                limiter=asyncio.Semaphore(1),
+                setup_timeout=5,
+                index=0,
+            )
+
+    assert probe_device.await_count == 2
+    reload.assert_called_once_with(config_entry.entry_id)
+
+
+async def test_device_added_entities(hass: HomeAssistant):
+    """Test entities of device connected later are added on signal."""
+    config_entry = MockConfigEntry(domain=DOMAIN, source=SOURCE_IMPORT, data={})
+    hass.data[DOMAIN] = {config_entry.entry_id: {0: Mock(BewardController)}}
+    hass.data[DOMAIN_YAML] = [MOCK_CONFIG, MOCK_CONFIG]
+
+    add_entities = Mock()
+    setup_entities = AsyncMock(side_effect=lambda controller, _: [controller])
+    await async_setup_device_entities(hass, config_entry, add_entities, setup_entities)
+    add_entities.assert_called_once_with(
+        [hass.data[DOMAIN][config_entry.entry_id][0]], update_before_add=True
+    )
+
+    controller = hass.data[DOMAIN][config_entry.entry_id][1] = Mock(BewardController)
+    for _ in range(2):
+        async_dispatcher_send(
+            hass, SIGNAL_DEVICE_ADDED.format(config_entry.entry_id), 1
+        )
+        await hass.async_block_till_done()
+
+    assert add_entities.call_count == 2
+    add_entities.assert_called_with([controller], update_before_add=True)
+
+
+async def test_setup_ui_device_retried(hass: HomeAssistant):
+    """Test unavailable device of UI entry is retried in background."""
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG)
+    hass.data[DOMAIN] = {config_entry.entry_id: {}}
+    setup_device = AsyncMock(side_effect=ConfigEntryNotReady)
+
+    retries = await _async_setup_devices(hass, config_entry, setup_device)
+    assert len(retries) == 1
+    assert hass.data[DOMAIN][config_entry.entry_id] == {}
+    assert setup_device.call_args.kwargs == {
+        "setup_timeout": DEFAULT_SETUP_TIMEOUT,
+        "index": 0,
+    }
+
+    retries[0].cancel()
+    await asyncio.gather(*retries, return_exceptions=True)
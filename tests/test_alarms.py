@@ -0,0 +1,171 @@
+"""Test beward alarm stream listener."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from homeassistant.core import HomeAssistant
+
+import asyncio
+from datetime import datetime
+from http import HTTPStatus
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import aiohttp
+import homeassistant.util.dt as dt_util
+import pytest
+from beward.const import ALARM_MOTION, ALARM_ONLINE
+
+from custom_components.beward.alarms import BewardAlarmListener, parse_alarm
+
+from .const import MOCK_HOST
+
+
+def test_parse_alarm():
+    """Test parsing of alarm stream lines."""
+    timestamp, alarm, state = parse_alarm("2024-05-17;12:34:56;MotionDetection;1;0")
+    assert timestamp.replace(tzinfo=None) == datetime(2024, 5, 17, 12, 34, 56)  # noqa: DTZ001
+    assert timestamp.tzinfo == dt_util.DEFAULT_TIME_ZONE
+    assert alarm == "MotionDetection"
+    assert state is True
+
+    assert parse_alarm("2024-05-17;12:34:56;SensorAlarm;0;")[2] is False
+    assert parse_alarm("garbage") is None
+    assert parse_alarm("2024-05-17;xx:34:56;MotionDetection;1;0") is None
+
+
+@pytest.fixture
+def client(hass: HomeAssistant) -> Mock:
+    """Generate client of test device."""
+    return Mock(hass=hass, device=Mock(host=MOCK_HOST, params={}))
+
+
+async def test_reconnect_backoff(client: Mock):
+    """Test stream is reopened with backoff and device goes offline on failure."""
+    handler = Mock()
+    listener = BewardAlarmListener(client, [ALARM_MOTION], handler)
+    blocked = asyncio.Event()
+
+    async def _open() -> None:
+        listener._set_online(state=True)
+
+    async def _block() -> None:
+        blocked.set()
+        await asyncio.Event().wait()
+
+    steps = iter(
+        [
+            aiohttp.ClientError,
+            TimeoutError,
+            aiohttp.ClientError,
+            aiohttp.ClientError,
+            _open,
+            aiohttp.ClientError,
+            RuntimeError,
+            _block,
+        ]
+    )
+
+    async def _listen() -> None:
+        step = next(steps)
+        if isinstance(step, type):
+            raise step
+        await step()
+
+    delays = []
+
+    with (
+        patch.object(listener, "_async_listen", _listen),
+        patch("custom_components.beward.alarms._RETRY_MIN_DELAY", 0.01),
+        patch("custom_components.beward.alarms._RETRY_MAX_DELAY", 0.04),
+        patch(
+            "custom_components.beward.alarms.random.uniform",
+            side_effect=lambda _, upper: delays.append(upper) or 0,
+        ),
+    ):
+        listener.async_start()
+        await asyncio.wait_for(blocked.wait(), 5)
+
+        # Backoff is reset once stream was opened, unexpected errors are retried
+        assert delays == [0.01, 0.02, 0.04, 0.04, 0.01, 0.02]
+        assert [x.args[1:] for x in handler.call_args_list] == [
+            (ALARM_ONLINE, True),
+            (ALARM_ONLINE, False),
+        ]
+        assert not listener.online
+
+        await listener.async_stop()
+
+
+async def test_listen_handler_error(client: Mock):
+    """Test failing handler doesn't break the alarm stream."""
+    handler = Mock(side_effect=[None, ValueError, None])
+    listener = BewardAlarmListener(client, [ALARM_MOTION], handler)
+
+    async def _content() -> AsyncIterator[bytes]:
+        yield b"2024-05-17;12:34:56;MotionDetection;1;0\r\n"
+        yield b"\r\n"
+        yield b"2024-05-17;12:34:57;MotionDetection;0;0\r\n"
+
+    response = Mock(status=HTTPStatus.OK, content=_content())
+    client.session.get.return_value = MagicMock()
+    client.session.get.return_value.__aenter__.return_value = response
+
+    await listener._async_listen()
+    assert listener.online
+    assert [x.args[1:] for x in handler.call_args_list] == [
+        (ALARM_ONLINE, True),
+        (ALARM_MOTION, True),
+        (ALARM_MOTION, False),
+    ]
+
+
+async def test_idle_probe(client: Mock):
+    """Test silent stream is reopened and device goes offline only if it's silent."""
+    handler = Mock()
+    listener = BewardAlarmListener(client, [ALARM_MOTION], handler)
+    blocked = asyncio.Event()
+
+    async def _silent() -> AsyncIterator[bytes]:
+        raise TimeoutError
+        yield b""  # pragma: no cover
+
+    async def _block() -> AsyncIterator[bytes]:
+        blocked.set()
+        await asyncio.Event().wait()
+        yield b""  # pragma: no cover
+
+    streams = iter([_silent(), _silent(), _block()])
+
+    def _get(*_: Any, **__: Any) -> MagicMock:
+        context = MagicMock()
+        context.__aenter__.return_value = Mock(
+            status=HTTPStatus.OK, content=next(streams)
+        )
+        return context
+
+    client.session.get.side_effect = _get
+    client.async_is_online = AsyncMock(side_effect=[True, False])
+
+    with (
+        patch("custom_components.beward.alarms._RETRY_MIN_DELAY", 0.01),
+        patch("custom_components.beward.alarms.random.uniform", return_value=0),
+    ):
+        listener.async_start()
+        await asyncio.wait_for(blocked.wait(), 5)
+
+    # Responding device is not reported offline when its stream is reopened
+    assert client.async_is_online.await_count == 2
+    assert [x.args[1:] for x in handler.call_args_list] == [
+        (ALARM_ONLINE, True),
+        (ALARM_ONLINE, False),
+        (ALARM_ONLINE, True),
+    ]
+
+    await listener.async_stop()
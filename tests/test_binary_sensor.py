@@ -0,0 +1,52 @@
+# pylint: disable=protected-access,redefined-outer-name
+"""Test beward binary sensors."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+from unittest.mock import Mock
+
+import homeassistant.util.dt as dt_util
+from beward import BewardDoorbell
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNAVAILABLE
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from custom_components.beward import BewardController, BewardEventUpdate
+from custom_components.beward.binary_sensor import BewardBinarySensor
+from custom_components.beward.const import BewardDeviceEvent
+
+from .const import MOCK_DEVICE_ID, MOCK_DEVICE_NAME
+
+
+async def test_binary_sensor_event_signal(hass: HomeAssistant):
+    """Test binary sensor state is written from event signal payload."""
+    controller = BewardController(
+        hass, MOCK_DEVICE_ID, Mock(BewardDoorbell), MOCK_DEVICE_NAME
+    )
+    sensor = BewardBinarySensor(controller, BewardDeviceEvent.MOTION)
+    await sensor.async_added_to_hass()
+
+    def _send(event: str, state: bool) -> None:  # noqa: FBT001
+        async_dispatcher_send(
+            hass,
+            controller.event_signal(event),
+            BewardEventUpdate(event, state, dt_util.utcnow()),
+        )
+
+    _send(BewardDeviceEvent.MOTION, True)  # noqa: FBT003
+    assert hass.states.get(sensor.entity_id).state == STATE_ON
+
+    _send(BewardDeviceEvent.MOTION, False)  # noqa: FBT003
+    assert hass.states.get(sensor.entity_id).state == STATE_OFF
+
+    # Availability changes are delivered to every entity
+    controller._available = False
+    _send(BewardDeviceEvent.ONLINE, False)  # noqa: FBT003
+    assert hass.states.get(sensor.entity_id).state == STATE_UNAVAILABLE
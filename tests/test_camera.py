@@ -0,0 +1,316 @@
+# pylint: disable=protected-access,redefined-outer-name
+"""Test beward cameras."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+import asyncio
+from http import HTTPStatus
+from unittest.mock import AsyncMock, Mock, patch
+
+import aiohttp
+import pytest
+from aiohttp import hdrs
+from aiohttp.test_utils import make_mocked_request
+from beward import BewardCamera
+from homeassistant.components.ffmpeg import DATA_FFMPEG
+from homeassistant.config_entries import SOURCE_IMPORT
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.beward import BewardController, BewardMediaUpdate
+from custom_components.beward.camera import (
+    BewardFileCamera,
+    BewardLiveCamera,
+    BewardMosaicCamera,
+    _refresh_limiter,
+)
+from custom_components.beward.const import (
+    ATTR_CLIP,
+    CAMERA_LAST_MOTION,
+    CONF_MJPEG_MODE,
+    CONF_MOSAIC_COLUMNS,
+    CONF_MOSAIC_INTERVAL,
+    CONF_MOSAIC_TILE_HEIGHT,
+    CONF_MOSAIC_TILE_WIDTH,
+    CONF_SNAPSHOT_REFRESH_CONCURRENCY,
+    DEFAULT_SNAPSHOT_REFRESH_CONCURRENCY,
+    DOMAIN,
+    DOMAIN_YAML,
+    MJPEG_MODE_PASSTHROUGH,
+    BewardDeviceEvent,
+)
+
+from .const import (
+    MOCK_CONFIG,
+    MOCK_DEVICE_ID,
+    MOCK_DEVICE_NAME,
+    MOCK_HOST,
+    MOCK_PASSWORD,
+    MOCK_PORT,
+    MOCK_USERNAME,
+)
+
+
+@pytest.fixture
+def controller(hass: HomeAssistant):
+    """Generate test controller."""
+    device = Mock(BewardCamera)
+    return BewardController(hass, MOCK_DEVICE_ID, device, MOCK_DEVICE_NAME)
+
+
+async def test_live_image_single_flight(
+    hass: HomeAssistant, controller: BewardController
+):
+    """Test concurrent callers of live camera share one device request."""
+    camera = BewardLiveCamera(controller, {}, asyncio.Semaphore(1))
+    release = asyncio.Event()
+
+    async def _live_image() -> bytes:
+        await release.wait()
+        return b"image"
+
+    live_image = AsyncMock(side_effect=_live_image)
+    with patch.object(controller.client, "async_live_image", live_image):
+        tasks = [hass.async_create_task(camera.async_camera_image()) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == [b"image"] * 3
+    assert live_image.await_count == 1
+
+
+async def test_live_image_single_flight_error(
+    hass: HomeAssistant, controller: BewardController
+):
+    """Test concurrent callers of live camera share one failed device request."""
+    camera = BewardLiveCamera(controller, {}, asyncio.Semaphore(1))
+
+    async def _live_image() -> bytes:
+        await asyncio.sleep(0)
+        raise TimeoutError
+
+    live_image = AsyncMock(side_effect=_live_image)
+
+    with patch.object(controller.client, "async_live_image", live_image):
+        images = await asyncio.gather(*(camera.async_camera_image() for _ in range(3)))
+
+    assert images == [None] * 3
+    assert live_image.await_count == 1
+
+
+async def test_live_image_sync_size(hass: HomeAssistant, controller: BewardController):
+    """Test sync camera image is requested at given size."""
+    camera = BewardLiveCamera(controller, {}, asyncio.Semaphore(1))
+    camera.hass = hass
+
+    with patch.object(
+        camera, "async_camera_image", AsyncMock(return_value=b"image")
+    ) as camera_image:
+        assert (
+            await hass.async_add_executor_job(camera.camera_image, 80, 45) == b"image"
+        )
+
+    camera_image.assert_awaited_once_with(80, 45)
+
+
+def _passthrough_camera(hass: HomeAssistant) -> BewardLiveCamera:
+    """Generate live camera of real device with MJPEG passthrough."""
+    device = BewardCamera(
+        MOCK_HOST, MOCK_USERNAME, MOCK_PASSWORD, rtsp_port=554, port=MOCK_PORT
+    )
+    controller = BewardController(hass, MOCK_DEVICE_ID, device, MOCK_DEVICE_NAME)
+    return BewardLiveCamera(
+        controller, {CONF_MJPEG_MODE: MJPEG_MODE_PASSTHROUGH}, asyncio.Semaphore(1)
+    )
+
+
+async def test_mjpeg_passthrough_url(hass: HomeAssistant):
+    """Test native MJPEG stream URL of device has credentials."""
+    camera = _passthrough_camera(hass)
+    assert camera._mjpeg_url == (
+        f"http://{MOCK_USERNAME}:{MOCK_PASSWORD}@{MOCK_HOST}:{MOCK_PORT}"
+        "/cgi-bin/video_cgi?channel=0"
+    )
+
+    camera = BewardLiveCamera(camera._controller, {}, asyncio.Semaphore(1))
+    assert camera._mjpeg_url is None
+
+
+async def test_mjpeg_passthrough_fallback(hass: HomeAssistant):
+    """Test MJPEG stream falls back to shared ffmpeg when device can't serve it."""
+    hass.data[DATA_FFMPEG] = Mock()
+    camera = _passthrough_camera(hass)
+    camera.hass = hass
+    request = make_mocked_request("GET", "/")
+    session = Mock()
+
+    with (
+        patch(
+            "custom_components.beward.camera.async_get_clientsession",
+            return_value=session,
+        ),
+        patch(
+            "custom_components.beward.camera.async_aiohttp_proxy_stream",
+            return_value="proxied",
+        ) as proxy_stream,
+        patch(
+            "custom_components.beward.camera.BewardMjpegBroadcaster"
+        ) as broadcaster_class,
+        patch.object(
+            camera._controller,
+            "async_get_stream_source",
+            AsyncMock(return_value="rtsp://camera"),
+        ),
+    ):
+        broadcaster_class.return_value.async_handle = AsyncMock(return_value="ffmpeg")
+
+        session.get = AsyncMock(
+            return_value=Mock(
+                status=HTTPStatus.OK,
+                headers={hdrs.CONTENT_TYPE: "multipart/x-mixed-replace"},
+            )
+        )
+        assert await camera.handle_async_mjpeg_stream(request) == "proxied"
+        proxy_stream.assert_called_once()
+        broadcaster_class.assert_not_called()
+
+        # Failed request is retried next time
+        session.get = AsyncMock(side_effect=aiohttp.ClientError)
+        assert await camera.handle_async_mjpeg_stream(request) == "ffmpeg"
+        assert await camera.handle_async_mjpeg_stream(request) == "ffmpeg"
+        assert session.get.await_count == 2
+
+        # Device without native MJPEG stream is not asked again
+        session.get = AsyncMock(
+            return_value=Mock(
+                status=HTTPStatus.OK, headers={hdrs.CONTENT_TYPE: "image/jpeg"}
+            )
+        )
+        assert await camera.handle_async_mjpeg_stream(request) == "ffmpeg"
+        assert await camera.handle_async_mjpeg_stream(request) == "ffmpeg"
+        assert session.get.await_count == 1
+
+    # All viewers of fallback stream share one broadcaster
+    broadcaster_class.assert_called_once()
+    assert broadcaster_class.call_args.args[2] == "-rtsp_transport tcp -i rtsp://camera"
+
+
+async def test_mjpeg_broadcaster_shared(hass: HomeAssistant):
+    """Test viewers arriving at once share one broadcaster."""
+    hass.data[DATA_FFMPEG] = Mock()
+    camera = BewardLiveCamera(
+        BewardController(
+            hass,
+            MOCK_DEVICE_ID,
+            Mock(BewardCamera, rtsp_live_video_url="rtsp://camera"),
+            MOCK_DEVICE_NAME,
+        ),
+        {},
+        asyncio.Semaphore(1),
+    )
+    camera.hass = hass
+    request = make_mocked_request("GET", "/")
+
+    async def _stream_source() -> str:
+        await asyncio.sleep(0)
+        return "rtsp://camera"
+
+    with (
+        patch.object(
+            camera._controller, "async_get_stream_source", side_effect=_stream_source
+        ),
+        patch(
+            "custom_components.beward.camera.BewardMjpegBroadcaster"
+        ) as broadcaster_class,
+    ):
+        broadcaster_class.return_value.async_handle = AsyncMock(return_value="ffmpeg")
+        assert await asyncio.gather(
+            camera.handle_async_mjpeg_stream(request),
+            camera.handle_async_mjpeg_stream(request),
+        ) == ["ffmpeg", "ffmpeg"]
+
+    broadcaster_class.assert_called_once()
+
+
+def test_refresh_limiter():
+    """Test refresh limit is the largest one of entry devices."""
+    assert _refresh_limiter([])._value == DEFAULT_SNAPSHOT_REFRESH_CONCURRENCY
+    assert (
+        _refresh_limiter(
+            [
+                {CONF_SNAPSHOT_REFRESH_CONCURRENCY: 1},
+                {CONF_SNAPSHOT_REFRESH_CONCURRENCY: 3},
+            ]
+        )._value
+        == 3
+    )
+
+
+async def test_mosaic_all_entries(hass: HomeAssistant):
+    """Test mosaic has tiles of all loaded entries and no image until it's built."""
+    config = {
+        CONF_MOSAIC_COLUMNS: 0,
+        CONF_MOSAIC_TILE_WIDTH: 160,
+        CONF_MOSAIC_TILE_HEIGHT: 90,
+        CONF_MOSAIC_INTERVAL: 1,
+    }
+    yaml_entry = MockConfigEntry(domain=DOMAIN, source=SOURCE_IMPORT, data={})
+    ui_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG)
+    for entry in (yaml_entry, ui_entry, MockConfigEntry(domain=DOMAIN, data={})):
+        entry.add_to_hass(hass)
+
+    controllers = [
+        Mock(BewardController, async_refresh_live_image=Mock(return_value=x))
+        for x in (b"yaml", b"ui")
+    ]
+    hass.data[DOMAIN_YAML] = [MOCK_CONFIG, MOCK_CONFIG]
+    hass.data[DOMAIN] = {
+        yaml_entry.entry_id: {0: controllers[0]},
+        ui_entry.entry_id: {0: controllers[1]},
+    }
+    camera = BewardMosaicCamera(yaml_entry, config, asyncio.Semaphore(1))
+    camera.hass = hass
+
+    with patch("custom_components.beward.camera.BewardMosaic") as mosaic_class:
+        mosaic_class.return_value.update.return_value = None
+        assert await camera.async_camera_image(80, 45) is None
+
+    mosaic_class.assert_called_once_with(3, 0, 160, 90)
+    mosaic_class.return_value.update.assert_called_once_with([b"yaml", None, b"ui"])
+    assert camera._thumbnails is None
+
+
+async def test_file_camera_media_signal(
+    hass: HomeAssistant, controller: BewardController
+):
+    """Test event camera switches to media from signal payload."""
+    camera = BewardFileCamera(controller, CAMERA_LAST_MOTION)
+    camera.hass = hass
+    camera.entity_id = "camera.last_motion"
+    await camera.async_added_to_hass()
+
+    async_dispatcher_send(
+        hass,
+        controller.media_signal(BewardDeviceEvent.MOTION),
+        BewardMediaUpdate(BewardDeviceEvent.MOTION, image_path="/media/motion.jpg"),
+    )
+    assert camera._file_path == "/media/motion.jpg"
+    assert ATTR_CLIP not in hass.states.get(camera.entity_id).attributes
+
+    async_dispatcher_send(
+        hass,
+        controller.media_signal(BewardDeviceEvent.MOTION),
+        BewardMediaUpdate(BewardDeviceEvent.MOTION, clip_path="/media/motion.mp4"),
+    )
+    assert camera._file_path == "/media/motion.jpg"
+    assert hass.states.get(camera.entity_id).attributes[ATTR_CLIP] == (
+        f"media-source://media_source/{DOMAIN}/motion.mp4"
+    )
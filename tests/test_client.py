@@ -0,0 +1,102 @@
+# pylint: disable=protected-access,redefined-outer-name
+"""Test beward asyncio client."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from pytest_homeassistant_custom_component.test_util.aiohttp import (
+        AiohttpClientMocker,
+    )
+
+import pytest
+from beward import BewardCamera
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+
+from custom_components.beward.client import BewardClient, async_get_session
+from custom_components.beward.const import DOMAIN_HTTP_SESSION
+
+from .const import MOCK_HOST, MOCK_PASSWORD, MOCK_PORT, MOCK_USERNAME
+
+_BASE_URL = f"http://{MOCK_HOST}:{MOCK_PORT}/cgi-bin"
+
+
+@pytest.fixture
+async def client(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker):
+    """Generate test client which uses mocked HTTP session."""
+    session = hass.data[DOMAIN_HTTP_SESSION] = aioclient_mock.create_session(hass.loop)
+    device = BewardCamera(MOCK_HOST, MOCK_USERNAME, MOCK_PASSWORD, port=MOCK_PORT)
+    yield BewardClient(hass, device)
+    await session.close()
+
+
+async def test_system_info(client: BewardClient, aioclient_mock: AiohttpClientMocker):
+    """Test key=value response is parsed."""
+    aioclient_mock.get(
+        f"{_BASE_URL}/systeminfo_cgi",
+        text="DeviceID=1234\r\nDeviceModel=DS06M\r\ngarbage\r\nEmpty=\r\n",
+    )
+
+    assert await client.async_system_info() == {
+        "DeviceID": "1234",
+        "DeviceModel": "DS06M",
+        "Empty": "",
+    }
+    assert await client.async_is_online()
+
+
+@pytest.mark.parametrize(
+    ("response", "expected"),
+    [
+        ({"text": "RtspPort=8554"}, 8554),
+        ({"text": "RtspPort=none"}, 554),
+        ({"exc": TimeoutError}, 554),
+        ({"status": HTTPStatus.NOT_FOUND}, 554),
+    ],
+)
+async def test_rtsp_port(
+    client: BewardClient,
+    aioclient_mock: AiohttpClientMocker,
+    response: dict,
+    expected: int,
+):
+    """Test RTSP port falls back to default one when device can't report it."""
+    aioclient_mock.get(f"{_BASE_URL}/rtsp_cgi", **response)
+
+    assert await client.async_rtsp_port() == expected
+
+
+async def test_live_image(client: BewardClient, aioclient_mock: AiohttpClientMocker):
+    """Test response of other content type is not an image."""
+    aioclient_mock.get(
+        f"{_BASE_URL}/images_cgi",
+        content=b"image",
+        headers={"Content-Type": "image/jpeg"},
+    )
+    assert await client.async_live_image() == b"image"
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(
+        f"{_BASE_URL}/images_cgi",
+        text="Unauthorized",
+        headers={"Content-Type": "text/html"},
+    )
+    assert await client.async_live_image() is None
+
+
+async def test_session_closed(hass: HomeAssistant):
+    """Test shared session is closed with Home Assistant."""
+    session = async_get_session(hass)
+    assert async_get_session(hass) is session
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+
+    assert session.closed
+    assert DOMAIN_HTTP_SESSION not in hass.data
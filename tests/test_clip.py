@@ -0,0 +1,142 @@
+# pylint: disable=protected-access,redefined-outer-name
+"""Test beward event clip recording."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+from unittest.mock import Mock, patch
+
+import av
+import numpy as np
+import pytest
+
+from custom_components.beward.clip import BewardClipRecorder
+
+_GOP_SIZE = 3
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Iterator[tuple[av.video.stream.VideoStream, list]]:
+    """Generate H.264 stream with keyframe on every third packet."""
+    path = tmp_path / "source.mp4"
+    with av.open(str(path), "w", format="mp4") as output:
+        stream = output.add_stream(
+            "libx264",
+            rate=10,
+            options={"g": str(_GOP_SIZE), "bf": "0", "sc_threshold": "0"},
+        )
+        stream.width = 64
+        stream.height = 48
+        stream.pix_fmt = "yuv420p"
+        rng = np.random.default_rng(0)
+        for _ in range(9):
+            frame = av.VideoFrame.from_ndarray(
+                rng.integers(0, 255, (48, 64, 3), np.uint8), format="rgb24"
+            )
+            output.mux(stream.encode(frame))
+        output.mux(stream.encode())
+
+    with av.open(str(path)) as container:
+        stream = container.streams.video[0]
+        packets = [x for x in container.demux(stream) if x.size]
+        yield stream, packets
+
+
+@pytest.fixture
+def clock() -> Iterator[Mock]:
+    """Mock monotonic clock of recorder."""
+    with patch("custom_components.beward.clip.time") as mock_time:
+        mock_time.monotonic.return_value = 0
+        yield mock_time.monotonic
+
+
+def _recorder(tmp_path: Path, pre_roll: float, post_roll: float) -> BewardClipRecorder:
+    """Generate test recorder."""
+    return BewardClipRecorder(
+        "test",
+        pre_roll,
+        post_roll,
+        10 * 1024 * 1024,
+        clip_path=lambda event: str(tmp_path / "clips" / f"{event}.mp4"),
+        on_saved=Mock(),
+    )
+
+
+def _assert_clip(path: str, packets: list[av.Packet]) -> list[av.Packet]:
+    """Check saved clip consists of packets."""
+    with av.open(path) as container:
+        clip = [x for x in container.demux(container.streams.video[0]) if x.size]
+
+    # Last packet is lost as packet duration is read-only in PyAV before 11.0
+    assert len(clip) >= len(packets) - 1
+    assert [bytes(x) for x in clip] == [bytes(x) for x in packets[: len(clip)]]
+    assert clip[0].is_keyframe
+    assert clip[0].pts == 0
+    return clip
+
+
+def test_clip_remux(tmp_path: Path, source: tuple, clock: Mock):
+    """Test clip starts from buffered keyframe and lasts for post-roll time."""
+    stream, packets = source
+    recorder = _recorder(tmp_path, pre_roll=2, post_roll=1.5)
+    recorder.attach(stream)
+
+    for index, packet in enumerate(packets[:7]):
+        clock.return_value = index
+        recorder.add_packet(packet)
+    recorder.trigger("motion")
+
+    for index, packet in enumerate(packets[7:], 7):
+        clock.return_value = index
+        recorder.add_packet(packet)
+
+    # Packets 3..8: GOP in pre-roll time and the post-roll ones
+    clip_path = str(tmp_path / "clips" / "motion.mp4")
+    recorder._on_saved.assert_called_once_with("motion", clip_path)
+    clip = _assert_clip(clip_path, packets[3:])
+    assert [x.is_keyframe for x in clip[:4]] == [True, False, False, True]
+    assert [str(x) for x in tmp_path.joinpath("clips").iterdir()] == [clip_path]
+
+
+def test_clip_trigger(tmp_path: Path, source: tuple, clock: Mock):
+    """Test repeated trigger extends clip and pending clip is saved on detach."""
+    stream, packets = source
+    recorder = _recorder(tmp_path, pre_roll=0, post_roll=2)
+
+    # Nothing is recorded without stream
+    recorder.trigger("motion")
+    assert recorder._clips == []
+
+    recorder.attach(stream)
+    recorder.add_packet(packets[0])
+    recorder.trigger("motion")
+
+    clock.return_value = 1
+    recorder.trigger("motion")
+    for index in range(1, 3):
+        clock.return_value = index
+        recorder.add_packet(packets[index])
+    recorder._on_saved.assert_not_called()
+
+    clock.return_value = 3
+    recorder.add_packet(packets[3])
+    clip_path = str(tmp_path / "clips" / "motion.mp4")
+    recorder._on_saved.assert_called_once_with("motion", clip_path)
+    _assert_clip(clip_path, packets[:4])
+
+    # Pending clip starts from the last GOP without pre-roll
+    recorder.trigger("ding")
+    for index in range(4, 6):
+        clock.return_value = index
+        recorder.add_packet(packets[index])
+    recorder.detach()
+    assert recorder._on_saved.call_count == 2
+    _assert_clip(str(tmp_path / "clips" / "ding.mp4"), packets[3:6])
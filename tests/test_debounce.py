@@ -0,0 +1,98 @@
+"""Test beward event debouncing."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+import homeassistant.util.dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.beward.debounce import BewardEventDebouncer
+
+
+async def test_debouncer_merges_flaps(hass: HomeAssistant):
+    """Test flaps within off delay are merged into one event."""
+    calls = []
+    debouncer = BewardEventDebouncer(hass, 0, 5, lambda state, _: calls.append(state))
+
+    now = dt_util.utcnow()
+    debouncer.async_update(True, now)  # noqa: FBT003
+    for _ in range(3):
+        debouncer.async_update(False, now)  # noqa: FBT003
+        debouncer.async_update(True, now)  # noqa: FBT003
+    debouncer.async_update(False, now)  # noqa: FBT003
+
+    assert calls == [True]
+    assert debouncer.suppressed == 6
+
+    async_fire_time_changed(hass, now + timedelta(seconds=6))
+    await hass.async_block_till_done()
+    assert calls == [True, False]
+
+
+async def test_debouncer_min_on_time(hass: HomeAssistant):
+    """Test event stays on for minimum time."""
+    calls = []
+    debouncer = BewardEventDebouncer(hass, 10, 0, lambda state, _: calls.append(state))
+
+    now = dt_util.utcnow()
+    debouncer.async_update(True, now)  # noqa: FBT003
+    debouncer.async_update(False, now)  # noqa: FBT003
+    debouncer.async_update(False, now)  # noqa: FBT003
+    assert calls == [True]
+    assert debouncer.suppressed == 1
+
+    async_fire_time_changed(hass, now + timedelta(seconds=11))
+    await hass.async_block_till_done()
+    assert calls == [True, False]
+    assert debouncer.state is False
+
+
+@pytest.mark.parametrize(("min_on_time", "off_delay"), [(10, 3), (3, 10)])
+async def test_debouncer_longest_delay(
+    hass: HomeAssistant, min_on_time: float, off_delay: float
+):
+    """Test off is delayed by the longest of min on time and off delay."""
+    calls = []
+    debouncer = BewardEventDebouncer(
+        hass, min_on_time, off_delay, lambda state, _: calls.append(state)
+    )
+
+    now = dt_util.utcnow()
+    debouncer.async_update(True, now)  # noqa: FBT003
+    debouncer.async_update(False, now)  # noqa: FBT003
+
+    async_fire_time_changed(hass, now + timedelta(seconds=5))
+    await hass.async_block_till_done()
+    assert calls == [True]
+
+    async_fire_time_changed(hass, now + timedelta(seconds=11))
+    await hass.async_block_till_done()
+    assert calls == [True, False]
+
+
+async def test_debouncer_flush(hass: HomeAssistant):
+    """Test pending off is reported on flush."""
+    calls = []
+    debouncer = BewardEventDebouncer(hass, 10, 0, lambda *args: calls.append(args))
+
+    now = dt_util.utcnow()
+    debouncer.async_update(True, now)  # noqa: FBT003
+    debouncer.async_update(False, now + timedelta(seconds=1))  # noqa: FBT003
+    debouncer.async_flush()
+    assert calls == [(True, now), (False, now + timedelta(seconds=1))]
+    assert debouncer.state is False
+
+    # Nothing is left to report
+    debouncer.async_flush()
+    async_fire_time_changed(hass, now + timedelta(seconds=11))
+    await hass.async_block_till_done()
+    assert len(calls) == 2
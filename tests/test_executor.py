@@ -0,0 +1,73 @@
+"""Test beward executor."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+import asyncio
+import threading
+
+import pytest
+
+from custom_components.beward.executor import BewardExecutor, async_get_executor
+
+
+async def test_executor_timeouts():
+    """Test calls are counted and queued calls are dropped on timeout."""
+    executor = BewardExecutor(1)
+    release = threading.Event()
+    try:
+        assert await executor.async_run(pow, 2, 3) == 8
+
+        with pytest.raises(ZeroDivisionError):
+            await executor.async_run(divmod, 1, 0)
+
+        # Occupy the only worker, so next calls wait in the queue
+        blocker = asyncio.ensure_future(
+            executor.async_run(release.wait, 5, call_timeout=None)
+        )
+        while executor.metrics["running"] == 0:  # noqa: ASYNC110
+            await asyncio.sleep(0.01)
+
+        results = await asyncio.gather(
+            *(executor.async_run(pow, 2, 3, call_timeout=0.1) for _ in range(3)),
+            return_exceptions=True,
+        )
+        assert all(isinstance(x, TimeoutError) for x in results)
+
+        release.set()
+        assert await blocker is True
+
+        assert executor.metrics == {
+            "workers": 1,
+            "queued": 0,
+            "running": 0,
+            "max_queued": 3,
+            "completed": 2,
+            "failed": 1,
+            "timed_out": 3,
+        }
+
+    finally:
+        release.set()
+        executor.shutdown(wait=True)
+
+
+async def test_executor_shared(hass: HomeAssistant, caplog: pytest.LogCaptureFixture):
+    """Test executor is shared and can't be resized once created."""
+    executor = async_get_executor(hass, 2)
+    assert executor.workers == 2
+    assert async_get_executor(hass) is executor
+    assert "workers are used after restart" not in caplog.text
+
+    assert async_get_executor(hass, 3) is executor
+    assert executor.workers == 2
+    assert "workers are used after restart" in caplog.text
+
+    executor.shutdown(wait=True)
@@ -0,0 +1,151 @@
+# pylint: disable=protected-access,redefined-outer-name
+"""Test beward event history."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import sqlite3
+from datetime import timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+import homeassistant.util.dt as dt_util
+import pytest
+
+from custom_components.beward.const import BewardDeviceEvent
+from custom_components.beward.history import BewardEventHistory
+
+from .const import MOCK_DEVICE_ID
+
+
+async def test_history_query_and_eviction(hass: HomeAssistant, tmp_path: Path):
+    """Test event images are indexed and evicted by retention limits."""
+    history = BewardEventHistory(hass, str(tmp_path))
+    await history.async_start()
+
+    now = dt_util.utcnow()
+    for i in range(10):
+        await hass.async_add_executor_job(
+            history.add,
+            MOCK_DEVICE_ID,
+            BewardDeviceEvent.MOTION,
+            now - timedelta(days=i),
+            b"x" * 100,
+        )
+
+    latest = history.cached_latest(MOCK_DEVICE_ID, BewardDeviceEvent.MOTION)
+    assert latest.timestamp == now
+    assert await hass.async_add_executor_job(Path(latest.path).is_file)
+    assert history.cached_latest(MOCK_DEVICE_ID, BewardDeviceEvent.DING) is None
+
+    records = await hass.async_add_executor_job(
+        history.query,
+        MOCK_DEVICE_ID,
+        BewardDeviceEvent.MOTION,
+        now - timedelta(days=3, hours=12),
+        now,
+    )
+    assert len(records) == 4
+    assert records[0].path == latest.path
+
+    history.set_retention(MOCK_DEVICE_ID, 8, 6, 450 / 1024 / 1024)
+    await hass.async_add_executor_job(history.evict)
+
+    records = await hass.async_add_executor_job(
+        history.query,
+        MOCK_DEVICE_ID,
+        BewardDeviceEvent.MOTION,
+        now - timedelta(days=30),
+        now,
+    )
+    assert len(records) == 4
+    images = await hass.async_add_executor_job(lambda: list(tmp_path.rglob("*.jpg")))
+    assert len(images) == 4
+
+    await history.async_stop()
+
+
+async def test_history_references(hass: HomeAssistant, tmp_path: Path):
+    """Test references share image which is deleted with the last of them."""
+    history = BewardEventHistory(hass, str(tmp_path))
+    await history.async_start()
+
+    now = dt_util.utcnow()
+    assert (
+        await hass.async_add_executor_job(
+            history.add_reference, MOCK_DEVICE_ID, BewardDeviceEvent.MOTION, now
+        )
+        is None
+    )
+
+    record = await hass.async_add_executor_job(
+        history.add,
+        MOCK_DEVICE_ID,
+        BewardDeviceEvent.MOTION,
+        now - timedelta(days=2),
+        b"x" * 100,
+    )
+    reference = await hass.async_add_executor_job(
+        history.add_reference, MOCK_DEVICE_ID, BewardDeviceEvent.MOTION, now
+    )
+    assert reference.path == record.path
+    assert reference.size == 0
+    assert reference.sha256 == record.sha256
+    assert history.cached_latest(MOCK_DEVICE_ID, BewardDeviceEvent.MOTION) == reference
+
+    history.set_retention(MOCK_DEVICE_ID, 1, 0, 0)
+    await hass.async_add_executor_job(history.evict)
+    assert await hass.async_add_executor_job(Path(record.path).is_file)
+
+    history.set_retention(MOCK_DEVICE_ID, 0, 1, 0)
+    await hass.async_add_executor_job(
+        history.add,
+        MOCK_DEVICE_ID,
+        BewardDeviceEvent.MOTION,
+        now + timedelta(seconds=1),
+        b"y" * 100,
+    )
+    await hass.async_add_executor_job(history.evict)
+    assert not await hass.async_add_executor_job(Path(record.path).is_file)
+
+    await history.async_stop()
+
+
+async def test_history_closed(hass: HomeAssistant, tmp_path: Path):
+    """Test closed history rejects new images without writing them."""
+    history = BewardEventHistory(hass, str(tmp_path))
+    await history.async_start()
+    await history.async_stop()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        await hass.async_add_executor_job(
+            history.add,
+            MOCK_DEVICE_ID,
+            BewardDeviceEvent.MOTION,
+            dt_util.utcnow(),
+            b"image",
+        )
+    images = await hass.async_add_executor_job(lambda: list(tmp_path.rglob("*.jpg")))
+    assert images == []
+
+
+async def test_history_retention_added(hass: HomeAssistant, tmp_path: Path):
+    """Test device retention can be set while records are evicted."""
+    history = BewardEventHistory(hass, str(tmp_path))
+    history.set_retention(MOCK_DEVICE_ID, 1, 1, 1)
+    evicted = []
+
+    def _evict_device(device: str, retention: Any) -> None:
+        evicted.append(device)
+        history.set_retention(f"{MOCK_DEVICE_ID}_{len(evicted)}", 1, 1, 1)
+
+    with patch.object(history, "_evict_device", side_effect=_evict_device):
+        history.evict()
+
+    assert evicted == [MOCK_DEVICE_ID]
@@ -0,0 +1,67 @@
+"""Test beward device metadata cache."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+from datetime import timedelta
+
+import homeassistant.util.dt as dt_util
+from beward import BewardDoorbell
+from beward.const import BEWARD_DOORBELL
+from homeassistant.const import CONF_PORT
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.beward.metadata import (
+    _SAVE_DELAY,
+    BewardDeviceMetadata,
+    BewardMetadataCache,
+)
+
+from .const import MOCK_CONFIG
+
+MOCK_METADATA = BewardDeviceMetadata(
+    BEWARD_DOORBELL, {"DeviceID": "mock_device", "DeviceModel": "DS06M"}, 554
+)
+
+
+async def test_metadata_cache(hass: HomeAssistant):
+    """Test metadata is cached until connection settings change."""
+    cache = BewardMetadataCache(hass, "test")
+    await cache.async_load()
+    assert cache.get(0, MOCK_CONFIG) is None
+
+    assert cache.async_set(0, MOCK_CONFIG, MOCK_METADATA)
+    assert not cache.async_set(0, MOCK_CONFIG, MOCK_METADATA)
+    assert cache.get(0, MOCK_CONFIG) == MOCK_METADATA
+    assert cache.get(1, MOCK_CONFIG) is None
+
+    config = {**MOCK_CONFIG, CONF_PORT: 8080}
+    assert cache.get(0, config) is None
+
+    # Save is delayed to batch updates of all devices
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=_SAVE_DELAY))
+    await hass.async_block_till_done()
+
+    cache = BewardMetadataCache(hass, "test")
+    await cache.async_load()
+    assert cache.get(0, MOCK_CONFIG) == MOCK_METADATA
+
+    await cache.async_remove()
+    assert cache.get(0, MOCK_CONFIG) is None
+
+
+def test_create_device():
+    """Test device is created from metadata without requests."""
+    device = MOCK_METADATA.create_device(MOCK_CONFIG)
+
+    assert isinstance(device, BewardDoorbell)
+    assert device.system_info == MOCK_METADATA.system_info
+    assert device.rtsp_port == 554
+    assert device.rtsp_live_video_url.endswith(":554/av0_0")
@@ -0,0 +1,157 @@
+# pylint: disable=protected-access,redefined-outer-name
+"""Test beward shared MJPEG streaming."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from aiohttp import web
+    from homeassistant.core import HomeAssistant
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock, patch
+
+import homeassistant.util.dt as dt_util
+import pytest
+from aiohttp.test_utils import make_mocked_request
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.beward.mjpeg import _GRACE_PERIOD, BewardMjpegBroadcaster
+
+_BOUNDARY = b"--ffmpeg"
+
+
+def _frame(data: bytes) -> bytes:
+    """Return MJPEG stream part with data."""
+    return _BOUNDARY + b"\r\nContent-Type: image/jpeg\r\n\r\n" + data + b"\r\n"
+
+
+def _written(request: web.Request) -> list[bytes]:
+    """Return frames written to viewer."""
+    return [call.args[0] for call in request._payload_writer.write.call_args_list]
+
+
+async def _async_settle() -> None:
+    """Let all ready tasks run."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def ffmpeg_stream():
+    """Mock ffmpeg MJPEG stream, its output is fed by test."""
+    stream = Mock(open_camera=AsyncMock(), close=AsyncMock())
+    stream.reader = asyncio.StreamReader()
+    stream.get_reader = AsyncMock(return_value=stream.reader)
+    with patch("custom_components.beward.mjpeg.CameraMjpeg", return_value=stream):
+        yield stream
+
+
+@pytest.fixture
+def broadcaster(hass: HomeAssistant):
+    """Generate test broadcaster."""
+    ffmpeg_manager = Mock(
+        binary="ffmpeg",
+        ffmpeg_stream_content_type="multipart/x-mixed-replace;boundary=ffmpeg",
+    )
+    return BewardMjpegBroadcaster(hass, ffmpeg_manager, "-i rtsp://camera")
+
+
+def _viewer(broadcaster: BewardMjpegBroadcaster) -> tuple[web.Request, asyncio.Task]:
+    """Connect new viewer to broadcaster."""
+    request = make_mocked_request("GET", "/")
+    return request, asyncio.create_task(broadcaster.async_handle(request))
+
+
+async def test_fan_out(broadcaster: BewardMjpegBroadcaster, ffmpeg_stream):
+    """Test all viewers share one ffmpeg stream."""
+    viewers = [_viewer(broadcaster) for _ in range(2)]
+    await _async_settle()
+    assert broadcaster.viewers == 2
+
+    ffmpeg_stream.reader.feed_data(_frame(b"1") + _frame(b"2") + _BOUNDARY)
+    await _async_settle()
+    for request, _ in viewers:
+        assert _written(request) == [_frame(b"1"), _frame(b"2")]
+
+    # End of stream disconnects all viewers
+    ffmpeg_stream.reader.feed_eof()
+    await asyncio.gather(*(task for _, task in viewers))
+    assert broadcaster.viewers == 0
+    ffmpeg_stream.open_camera.assert_awaited_once()
+    ffmpeg_stream.close.assert_awaited_once()
+
+    await broadcaster.async_stop()
+
+
+async def test_slow_viewer(broadcaster: BewardMjpegBroadcaster, ffmpeg_stream):
+    """Test slow viewer loses its oldest frames without delaying others."""
+    fast, fast_task = _viewer(broadcaster)
+    slow, slow_task = _viewer(broadcaster)
+    release = asyncio.Event()
+
+    async def _write(data: bytes) -> None:
+        await release.wait()
+
+    slow._payload_writer.write = Mock(side_effect=_write)
+    await _async_settle()
+
+    frames = [_frame(str(x).encode()) for x in range(5)]
+    for frame in frames:
+        ffmpeg_stream.reader.feed_data(frame)
+        await _async_settle()
+    ffmpeg_stream.reader.feed_data(_BOUNDARY)
+    await _async_settle()
+    assert _written(fast) == frames
+
+    release.set()
+    ffmpeg_stream.reader.feed_eof()
+    await asyncio.gather(fast_task, slow_task)
+    assert _written(slow) == [frames[0], frames[3], frames[4]]
+
+    await broadcaster.async_stop()
+
+
+async def test_grace_stop(
+    hass: HomeAssistant, broadcaster: BewardMjpegBroadcaster, ffmpeg_stream
+):
+    """Test ffmpeg is stopped only when no viewer comes in grace period."""
+    now = dt_util.utcnow()
+    _, task = _viewer(broadcaster)
+    await _async_settle()
+    ffmpeg_task = broadcaster._task
+
+    # Disconnected viewer is not left waiting for frames
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert broadcaster.viewers == 0
+
+    async_fire_time_changed(hass, now + timedelta(seconds=_GRACE_PERIOD / 2))
+    await _async_settle()
+    assert not ffmpeg_task.done()
+
+    # New viewer reuses running ffmpeg and cancels its stop
+    _, task = _viewer(broadcaster)
+    await _async_settle()
+    assert broadcaster._task is ffmpeg_task
+
+    async_fire_time_changed(hass, now + timedelta(seconds=_GRACE_PERIOD * 2))
+    await _async_settle()
+    assert not ffmpeg_task.done()
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    async_fire_time_changed(hass, now + timedelta(seconds=_GRACE_PERIOD * 4))
+    await _async_settle()
+    assert ffmpeg_task.done()
+    ffmpeg_stream.close.assert_awaited_once()
+
+    await broadcaster.async_stop()
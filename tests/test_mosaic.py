@@ -0,0 +1,55 @@
+# pylint: disable=protected-access,redefined-outer-name
+"""Test beward snapshot mosaic."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+import io
+from unittest.mock import patch
+
+from PIL import Image
+
+from custom_components.beward.mosaic import BewardMosaic
+
+
+def _jpeg(color: int, size: tuple[int, int] = (1280, 720)) -> bytes:
+    """Generate single color JPEG image."""
+    with io.BytesIO() as buffer:
+        Image.new("RGB", size, (color, color, color)).save(buffer, format="JPEG")
+        return buffer.getvalue()
+
+
+def _pixel(jpeg: bytes, xy: tuple[int, int]) -> int:
+    """Return brightness of pixel of JPEG image."""
+    with Image.open(io.BytesIO(jpeg)) as img:
+        return img.convert("L").getpixel(xy)
+
+
+def test_mosaic():
+    """Test tiles are drawn in grid and redrawn only when image changed."""
+    mosaic = BewardMosaic(5, 0, 160, 90)
+    assert (mosaic.columns, mosaic.rows) == (3, 2)
+
+    images = [_jpeg(255), None, _jpeg(255, (640, 480)), b"garbage", None]
+    jpeg = mosaic.update(images)
+
+    with Image.open(io.BytesIO(jpeg)) as img:
+        assert img.size == (480, 180)
+    assert _pixel(jpeg, (80, 45)) > 250
+    assert _pixel(jpeg, (240, 45)) < 5
+    assert _pixel(jpeg, (400, 45)) > 250
+    assert _pixel(jpeg, (80, 135)) < 5
+
+    with patch("custom_components.beward.mosaic.decode_jpeg") as decode:
+        assert mosaic.update(images) is jpeg
+        decode.assert_not_called()
+
+    assert mosaic.count == 5
+    assert BewardMosaic(0, 0, 160, 90).update([])
+
+    images[0] = _jpeg(0)
+    jpeg = mosaic.update(images)
+    assert _pixel(jpeg, (80, 45)) < 5
+    assert _pixel(jpeg, (400, 45)) > 250
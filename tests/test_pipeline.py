@@ -0,0 +1,123 @@
+# pylint: disable=protected-access,redefined-outer-name
+"""Test beward event pipeline."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+import asyncio
+from unittest.mock import Mock
+
+import homeassistant.util.dt as dt_util
+
+from custom_components.beward.const import BewardDeviceEvent
+from custom_components.beward.pipeline import (
+    BewardEventPipeline,
+    BewardTokenBucket,
+    async_get_pipeline,
+)
+
+from .const import MOCK_DEVICE_ID, MOCK_DEVICE_NAME
+
+
+def _mock_controller(calls: list) -> Mock:
+    """Generate mock controller which records captured events."""
+    controller = Mock()
+    controller.unique_id = MOCK_DEVICE_ID
+    controller.name = MOCK_DEVICE_NAME
+    controller.snapshot_rate = 0
+
+    async def capture(event, timestamp, received) -> None:
+        assert received >= timestamp
+        calls.append((event, timestamp))
+
+    controller.async_capture_event_image = capture
+    return controller
+
+
+async def _async_wait_idle(pipeline: BewardEventPipeline) -> None:
+    """Wait until all pending snapshots are processed."""
+    while pipeline._pending or pipeline._busy:  # noqa: ASYNC110
+        await asyncio.sleep(0)
+
+
+async def test_pipeline_dings_first(hass: HomeAssistant):
+    """Test the latest snapshot of every event is processed, dings first."""
+    calls = []
+    controller = _mock_controller(calls)
+    pipeline = BewardEventPipeline(hass, workers=3)
+
+    events = [
+        (BewardDeviceEvent.MOTION, dt_util.utcnow()),
+        (BewardDeviceEvent.DING, dt_util.utcnow()),
+        (BewardDeviceEvent.MOTION, dt_util.utcnow()),
+    ]
+    for event, timestamp in events:
+        pipeline.async_enqueue(controller, event, timestamp)
+
+    pipeline.async_start()
+    await _async_wait_idle(pipeline)
+    await pipeline.async_stop()
+
+    assert calls == events[1:]
+    assert pipeline.coalesced == 1
+    assert pipeline.dropped == 0
+    assert pipeline.skipped == 1
+
+
+async def test_pipeline_drops_oldest(hass: HomeAssistant):
+    """Test the oldest pending snapshot is dropped when queue is full."""
+    calls = []
+    controllers = [_mock_controller(calls) for _ in range(3)]
+    for index, controller in enumerate(controllers):
+        controller.unique_id = f"{MOCK_DEVICE_ID}_{index}"
+    pipeline = BewardEventPipeline(hass, workers=1, queue_size=2)
+
+    timestamps = [dt_util.utcnow() for _ in range(3)]
+    for controller, timestamp in zip(controllers, timestamps, strict=True):
+        pipeline.async_enqueue(controller, BewardDeviceEvent.MOTION, timestamp)
+
+    assert pipeline.dropped == 1
+
+    pipeline.async_start()
+    await _async_wait_idle(pipeline)
+    await pipeline.async_stop()
+
+    assert [x[1] for x in calls] == timestamps[1:]
+
+
+async def test_pipeline_shared(hass: HomeAssistant):
+    """Test pipeline is shared and pending jobs of removed device are discarded."""
+    pipeline = async_get_pipeline(hass, rate=30)
+    assert async_get_pipeline(hass) is pipeline
+    assert pipeline._bucket.rate == 0.5
+
+    calls = []
+    controllers = [_mock_controller(calls) for _ in range(2)]
+    controllers[1].unique_id = f"{MOCK_DEVICE_ID}_1"
+    for controller in controllers:
+        pipeline.async_enqueue(controller, BewardDeviceEvent.MOTION, dt_util.utcnow())
+    pipeline.async_discard(controllers[0])
+
+    await _async_wait_idle(pipeline)
+    await pipeline.async_stop()
+    assert len(calls) == 1
+
+
+def test_token_bucket():
+    """Test token bucket allows bursts and then limits rate."""
+    bucket = BewardTokenBucket(rate=0.5, burst=2)
+
+    for _ in range(2):
+        assert bucket.delay(100) == 0
+        bucket.take(100)
+
+    assert bucket.delay(100) == 2
+    assert bucket.delay(101) == 1
+    assert bucket.delay(102) == 0
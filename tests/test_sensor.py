@@ -11,19 +11,22 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
 
+from datetime import timedelta
 from unittest.mock import Mock, patch
 
 import homeassistant.util.dt as dt_util
 import pytest
 from beward import BewardDoorbell
 from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 
-from custom_components.beward import BewardController
+from custom_components.beward import BewardController, BewardEventUpdate
 from custom_components.beward.const import (
     ICON_SENSOR,
     SENSOR_LAST_ACTIVITY,
     SENSOR_LAST_DING,
     SENSOR_LAST_MOTION,
+    BewardDeviceEvent,
 )
 from custom_components.beward.sensor import BewardSensor
 
@@ -95,3 +98,38 @@ async def test_last_ding_sensor(hass: HomeAssistant, controller: BewardControlle
     with patch.object(sensor, "_get_event_timestamp", return_value=mock_ts):
         sensor._update_callback(update_ha_state=True)
         assert sensor.state == mock_ts_local.isoformat()
+
+
+async def test_sensor_event_signal(hass: HomeAssistant, controller: BewardController):
+    """Test sensor state is written from event signal payload."""
+    sensor = BewardSensor(controller, SENSOR_LAST_MOTION)
+    await sensor.async_added_to_hass()
+    mock_ts = dt_util.utcnow()
+
+    async_dispatcher_send(
+        hass,
+        controller.event_signal(BewardDeviceEvent.MOTION),
+        BewardEventUpdate(BewardDeviceEvent.MOTION, True, mock_ts),  # noqa: FBT003
+    )
+    state = hass.states.get(sensor.entity_id)
+    assert state.state == mock_ts.replace(microsecond=0).isoformat()
+
+    # Older event doesn't move timestamp back
+    async_dispatcher_send(
+        hass,
+        controller.event_signal(BewardDeviceEvent.MOTION),
+        BewardEventUpdate(
+            BewardDeviceEvent.MOTION,
+            True,  # noqa: FBT003
+            mock_ts - timedelta(minutes=1),
+        ),
+    )
+    assert hass.states.get(sensor.entity_id).state == state.state
+
+    # Entity is not subscribed to other events
+    async_dispatcher_send(
+        hass,
+        controller.event_signal(BewardDeviceEvent.DING),
+        BewardEventUpdate(BewardDeviceEvent.DING, True, mock_ts),  # noqa: FBT003
+    )
+    assert hass.states.get(sensor.entity_id).last_updated == state.last_updated
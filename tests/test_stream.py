@@ -0,0 +1,173 @@
+# pylint: disable=protected-access,redefined-outer-name
+"""Test beward stream reader helpers."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from homeassistant.core import HomeAssistant
+
+import threading
+import time
+from datetime import timedelta
+from unittest.mock import MagicMock, Mock, patch
+
+import homeassistant.util.dt as dt_util
+
+from custom_components.beward.stream import BewardFrameBuffer, BewardStreamReader
+
+_URL = "rtsp://camera/av0_0"
+
+
+def _reader_threads() -> list[threading.Thread]:
+    """Return alive threads of stream readers."""
+    return [
+        x for x in threading.enumerate() if x.name.startswith("beward stream reader")
+    ]
+
+
+def _packet(keyframe: bool) -> Mock:  # noqa: FBT001
+    """Generate video packet which decodes to one frame."""
+    return Mock(
+        is_keyframe=keyframe, decode=Mock(return_value=[Mock(key_frame=keyframe)])
+    )
+
+
+def test_frame_buffer_limits():
+    """Test frame buffer drops the oldest frames."""
+    now = dt_util.utcnow()
+
+    buffer = BewardFrameBuffer(duration=10, max_frames=3, max_size=100)
+    for i in range(5):
+        buffer.append(now + timedelta(seconds=i), bytes([i]) * 10)
+    assert len(buffer) == 3
+    assert buffer.size == 30
+    assert buffer.latest()[1] == bytes([4]) * 10
+
+    buffer.append(now + timedelta(seconds=5), b"x" * 90)
+    assert len(buffer) == 2
+    assert buffer.size == 100
+
+    buffer.append(now + timedelta(seconds=20), b"y")
+    assert len(buffer) == 1
+
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.size == 0
+    assert buffer.latest() is None
+
+
+def test_frame_buffer_nearest():
+    """Test lookup of frame nearest to the event."""
+    now = dt_util.utcnow()
+    tolerance = timedelta(seconds=1)
+
+    buffer = BewardFrameBuffer(duration=10, max_frames=10, max_size=1000)
+    assert buffer.nearest(now, tolerance) is None
+
+    for i in range(5):
+        buffer.append(now + timedelta(seconds=i), bytes([i]))
+
+    assert buffer.nearest(now + timedelta(seconds=2.3), tolerance)[1] == b"\x02"
+    assert buffer.nearest(now + timedelta(seconds=10), tolerance) is None
+    assert [x[1] for x in buffer.between(now, now + timedelta(seconds=1))] == [
+        b"\x00",
+        b"\x01",
+    ]
+
+
+async def test_stream_reader(hass: HomeAssistant):
+    """Test reader keeps the latest keyframe until it's stopped."""
+    reader = BewardStreamReader(hass, "test")
+    received = threading.Event()
+    packets = [_packet(keyframe=False), _packet(keyframe=True)]
+
+    def _demux(video: Mock) -> Iterator[Mock]:
+        yield from packets
+        received.set()
+        reader._stop_event.wait(10)
+        yield _packet(keyframe=True)
+
+    container = MagicMock()
+    container.demux = _demux
+    with (
+        patch("custom_components.beward.stream.av.open", return_value=container),
+        patch(
+            "custom_components.beward.stream.encode_jpeg", return_value=b"jpeg"
+        ) as encode_jpeg,
+    ):
+        reader.async_start(_URL)
+        reader.async_start(_URL)
+        assert await hass.async_add_executor_job(received.wait, 10)
+        assert len(_reader_threads()) == 1
+
+        # Only keyframes are decoded, JPEG is encoded once per frame
+        assert container.streams.video[0].codec_context.skip_frame == "NONKEY"
+        packets[0].decode.assert_not_called()
+        taken, image = reader.jpeg(10)
+        assert image == b"jpeg"
+        assert reader.jpeg(10) == (taken, b"jpeg")
+        assert dt_util.utcnow() - taken < timedelta(seconds=10)
+        encode_jpeg.assert_called_once_with(packets[1].decode.return_value[0])
+
+        # Stale keyframe is not served
+        with patch("custom_components.beward.stream.time") as mock_time:
+            mock_time.monotonic.return_value = time.monotonic() + 11
+            assert reader.jpeg(10) is None
+
+        await reader.async_stop()
+
+    assert not _reader_threads()
+    container.close.assert_called_once()
+    assert reader.jpeg(10) is None
+
+
+async def test_stream_reader_unexpected_error(hass: HomeAssistant):
+    """Test reader thread reconnects after unexpected error."""
+    reader = BewardStreamReader(hass, "test")
+    reopened = threading.Event()
+    opened = 0
+
+    def _open(*args: Any, **kwargs: Any) -> Mock:
+        nonlocal opened
+        opened += 1
+        if opened == 1:
+            raise ZeroDivisionError
+        reopened.set()
+        raise OSError
+
+    with (
+        patch("custom_components.beward.stream._RECONNECT_DELAY", 0),
+        patch("custom_components.beward.stream.av.open", side_effect=_open),
+    ):
+        reader.async_start(_URL)
+        assert await hass.async_add_executor_job(reopened.wait, 10)
+        await reader.async_stop()
+
+    assert not _reader_threads()
+
+
+async def test_stream_reader_stops_while_reconnecting(hass: HomeAssistant):
+    """Test reader thread exits at once when stopped between reconnects."""
+    reader = BewardStreamReader(hass, "test")
+    opened = threading.Event()
+
+    def _open(*args: Any, **kwargs: Any) -> Mock:
+        opened.set()
+        raise OSError
+
+    with patch("custom_components.beward.stream.av.open", side_effect=_open):
+        reader.async_start(_URL)
+        assert await hass.async_add_executor_job(opened.wait, 10)
+
+        started = time.monotonic()
+        await reader.async_stop()
+        assert time.monotonic() - started < 5
+
+    assert not _reader_threads()
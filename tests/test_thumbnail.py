@@ -0,0 +1,129 @@
+# pylint: disable=protected-access,redefined-outer-name
+"""Test beward downscaled images."""
+
+#  Copyright (c) 2019-2024, Andrey "Limych" Khrolenok <andrey@khrolenok.ru>
+#  Creative Commons BY-NC-SA 4.0 International Public License
+#  (see LICENSE.md or https://creativecommons.org/licenses/by-nc-sa/4.0/)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+import io
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from custom_components.beward.thumbnail import (
+    BewardThumbnailCache,
+    perceptual_hash,
+    scale_jpeg,
+)
+
+
+def _mock_turbo_jpeg(width: int, height: int) -> Mock:
+    """Mock TurboJPEG decoding image of given size."""
+
+    def decode(_image: bytes, scaling_factor: tuple[int, int]) -> np.ndarray:
+        num, denom = scaling_factor
+        return np.zeros(
+            (-(-height * num // denom), -(-width * num // denom), 3), np.uint8
+        )
+
+    return Mock(
+        decode_header=Mock(return_value=(width, height, 0, 0)),
+        decode=Mock(side_effect=decode),
+        encode=Mock(return_value=b"scaled"),
+    )
+
+
+@pytest.mark.parametrize(
+    ("width", "height", "scaling_factor", "shape"),
+    [
+        (960, 540, (1, 2), (540, 960, 3)),
+        (240, 135, (1, 8), (135, 240, 3)),
+        (120, 60, (1, 8), (68, 120, 3)),
+    ],
+)
+def test_scale_jpeg(width, height, scaling_factor, shape):
+    """Test image is decoded and encoded once at best scaling factor."""
+    turbo_jpeg = _mock_turbo_jpeg(1920, 1080)
+
+    with patch(
+        "custom_components.beward.thumbnail.TurboJPEGSingleton.instance",
+        return_value=turbo_jpeg,
+    ):
+        assert scale_jpeg(b"image", width, height) == b"scaled"
+
+    turbo_jpeg.decode.assert_called_once_with(b"image", scaling_factor=scaling_factor)
+    turbo_jpeg.encode.assert_called_once()
+    assert turbo_jpeg.encode.call_args.args[0].shape == shape
+
+
+def test_scale_jpeg_unscaled():
+    """Test image is returned as is if it can not be scaled."""
+    turbo_jpeg = _mock_turbo_jpeg(640, 360)
+
+    with patch(
+        "custom_components.beward.thumbnail.TurboJPEGSingleton.instance",
+        return_value=turbo_jpeg,
+    ):
+        assert scale_jpeg(b"image", 600, 340) == b"image"
+        turbo_jpeg.decode_header.side_effect = OSError
+        assert scale_jpeg(b"image", 100, 100) == b"image"
+
+    turbo_jpeg.decode.assert_not_called()
+
+    with patch(
+        "custom_components.beward.thumbnail.TurboJPEGSingleton.instance",
+        return_value=False,
+    ):
+        assert scale_jpeg(b"image", 100, 100) == b"image"
+
+
+async def test_thumbnail_cache(hass: HomeAssistant):
+    """Test scaled images are cached by source image and size."""
+    cache = BewardThumbnailCache(hass, size=2)
+    image = b"0123456789abcdef"
+    scale = Mock(side_effect=lambda content, width, _height: content[:width])
+
+    with patch("custom_components.beward.thumbnail.scale_jpeg", scale):
+        assert await cache.async_scale(image, None, None) is image
+        assert scale.call_count == 0
+
+        assert await cache.async_scale(image, 8, 8) == b"01234567"
+        calls = scale.call_count
+        assert await cache.async_scale(image, 8, 8) == b"01234567"
+        assert scale.call_count == calls
+
+        await cache.async_scale(image, 4, 4)
+        await cache.async_scale(image, 2, 2)
+        calls = scale.call_count
+        await cache.async_scale(image, 8, 8)
+        assert scale.call_count > calls
+
+
+def _jpeg(pixels: np.ndarray, quality: int = 90) -> bytes:
+    """Encode pixel array to JPEG image."""
+    with io.BytesIO() as buffer:
+        Image.fromarray(pixels).save(buffer, format="JPEG", quality=quality)
+        return buffer.getvalue()
+
+
+def test_perceptual_hash():
+    """Test similar images have close perceptual hashes."""
+    gradient = (np.add.outer(np.arange(720), np.arange(1280)) % 256).astype(np.uint8)
+    pixels = np.stack([gradient] * 3, axis=2)
+    noisy = np.clip(
+        pixels + np.random.default_rng(1).integers(-6, 7, pixels.shape), 0, 255
+    ).astype(np.uint8)
+    changed = pixels.copy()
+    changed[200:500, 400:800] = 30
+
+    base = perceptual_hash(_jpeg(pixels))
+    assert (base ^ perceptual_hash(_jpeg(noisy, 60))).bit_count() <= 3
+    assert (base ^ perceptual_hash(_jpeg(changed))).bit_count() > 3